@@ -0,0 +1,84 @@
+'''
+Load test: WebSocket display broadcast fan-out
+
+Connects a number of websocket clients to a BroadcastServer, publishes a
+series of countdown changes and reports how long it takes for each change
+to reach every client.
+'''
+
+import asyncio
+import resource
+import sys
+import time
+
+from meeting_timer.broadcast import BroadcastServer
+from meeting_timer.timer_engine import seconds_to_display
+
+HANDSHAKE = (b'GET /ws HTTP/1.1\r\nHost: bench\r\nUpgrade: websocket\r\n'
+             b'Connection: Upgrade\r\nSec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n'
+             b'Sec-WebSocket-Version: 13\r\n\r\n')
+
+
+async def client(address, messages, received):
+    '''Websocket client recording the arrival time of each message'''
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(HANDSHAKE)
+    await reader.readuntil(b'\r\n\r\n')
+    for i in range(messages + 1):
+        _, length = await reader.readexactly(2)
+        await reader.readexactly(length)
+        received[i].append(time.perf_counter())
+    writer.close()
+
+
+async def run(server, clients, changes, interval):
+    state = {'title': 'Load test', 'time': seconds_to_display(changes), 'speaker': 'Speaker',
+             'foreground': 'green', 'background': 'black'}
+    server.publish(state, state.keys())
+
+    # connect in batches to stay within the listen backlog
+    received = [[] for _ in range(changes + 1)]
+    tasks = []
+    for i in range(clients):
+        tasks.append(asyncio.ensure_future(client(server.address, changes, received)))
+        if i % 100 == 99:
+            await asyncio.sleep(0.05)
+    while server.clients < clients:
+        await asyncio.sleep(0.01)
+
+    # one change per interval, like the countdown
+    published = []
+    for remaining in range(changes - 1, -1, -1):
+        state['time'] = seconds_to_display(remaining)
+        published.append(time.perf_counter())
+        server.publish(state, {'time'})
+        await asyncio.sleep(interval)
+    await asyncio.wait_for(asyncio.gather(*tasks), 30)
+    return published, received[1:]
+
+
+def main(clients=500, changes=50, interval_ms=20):
+    # each client needs two sockets in this process
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, clients*2 + 100)), hard))
+
+    server = BroadcastServer(('localhost', 0))
+    server.start()
+    try:
+        published, received = asyncio.run(run(server, clients, changes, interval_ms / 1000))
+    finally:
+        server.close()
+
+    # time until the last client received each change
+    latencies = sorted((max(times) - sent) * 1000 for sent, times in zip(published, received))
+    print(f'clients:               {clients}')
+    print(f'changes:               {changes}')
+    print(f'messages serialised:   {server.messages}')
+    print(f'clients dropped:       {server.clients_dropped}')
+    print(f'fan-out latency mean:  {sum(latencies)/len(latencies):.3f} ms')
+    print(f'fan-out latency p95:   {latencies[int(len(latencies)*0.95)]:.3f} ms')
+    print(f'fan-out latency max:   {latencies[-1]:.3f} ms')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,70 @@
+'''
+Benchmark: colour parsing
+
+Compares the previous per-call regular expression colour conversion with
+the memoized parser, for the colours converted on every webcam frame and
+display update, and the cost of parsing a colour the first time.
+'''
+
+import re
+import sys
+import time
+
+from meeting_timer import support
+
+HTML_CODE_RE3 = r'^#?([a-f0-9])([a-f0-9])([a-f0-9])$'
+HTML_CODE_RE6 = r'^#?([a-f0-9]{2})([a-f0-9]{2})([a-f0-9]{2})$'
+
+
+def legacy_colour_to_html(colour, default="#ffffff"):
+    '''The previous colour_to_html()'''
+    colour = str(colour).lower().replace(' ', '').replace('-', '').strip()
+    if colour in support._named_html_colours:
+        colour = support._named_html_colours[colour]
+    if not re.match(HTML_CODE_RE3, colour) and not re.match(HTML_CODE_RE6, colour):
+        colour = default
+    elif not colour.startswith('#'):
+        colour = f'#{colour}'
+    return colour
+
+
+def legacy_colour_to_tuple(colour, default="#ffffff"):
+    '''The previous colour_to_tuple()'''
+    colour = str(legacy_colour_to_html(colour, default)).lower()
+    match = re.match(HTML_CODE_RE6, colour)
+    if match:
+        match = match.groups()
+    else:
+        match = map(lambda h: f'{h}{h}', re.match(HTML_CODE_RE3, colour).groups())
+    return tuple(map(lambda h: int(h, 16), match))
+
+
+def measure(func, colours, iterations):
+    '''Seconds per conversion'''
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for colour in colours:
+            func(colour)
+    return (time.perf_counter() - start) / (iterations * len(colours))
+
+
+def main(iterations=20000):
+    colours = ['green', 'orange', 'red', 'black', '#ffa500', 'ABC']
+
+    for label, func, legacy in (('colour_to_tuple', support.colour_to_tuple, legacy_colour_to_tuple),
+                                ('colour_to_html', support.colour_to_html, legacy_colour_to_html)):
+        legacy_time = measure(legacy, colours, iterations)
+        new_time = measure(func, colours, iterations)
+        print(f'{label} (regex):    {legacy_time*1e9:8.1f} ns')
+        print(f'{label} (memoized): {new_time*1e9:8.1f} ns  ({legacy_time/new_time:.0f}x)')
+
+    # first conversion of each colour (cache cleared every time)
+    functions = ['rgb(255, 165, 0)', 'rgba(0,128,0,0.5)', 'hsl(39deg 100% 50%)', '#ffa50080']
+    def uncached(colour):
+        support.parse_colour.cache_clear()
+        support.parse_colour(colour)
+    print(f'parse (uncached):          {measure(uncached, colours + functions, iterations // 10)*1e6:8.2f} us')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,42 @@
+'''
+Benchmark: renders per logical display state change
+
+Counts how many times display observers (i.e. the webcam renderer) are
+called for each Application.next() compared with the number of Tk variable
+writes it makes.
+'''
+
+import sys
+import time
+
+from meeting_timer.application import Application
+
+
+def main(iterations=200):
+    app = Application()
+    app.master.withdraw()
+    app.init_state()
+    app.master.update()
+
+    writes = []
+    for key in ('title', 'time', 'speaker', 'foreground', 'background'):
+        app.settings.display.get(key).trace('w', lambda *_: writes.append(1))
+    renders = []
+    app.display_state.subscribe(lambda state, changed: renders.append(changed))
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        app.settings.next.title.set(f'Session {i}')
+        app.next()
+        app.master.update()
+    elapsed = time.perf_counter() - start
+    app.master.destroy()
+
+    print(f'next() calls:          {iterations}')
+    print(f'variable writes:       {len(writes)} ({len(writes)/iterations:.2f} per next)')
+    print(f'renders:               {len(renders)} ({len(renders)/iterations:.2f} per next)')
+    print(f'time per next():       {elapsed/iterations*1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+'''
+Benchmark: loopback device discovery with many video nodes
+
+Builds a fake /sys/class/video4linux and /dev with 16 video nodes (two of
+them v4l2loopback devices) and compares trying to open every /dev/video*
+node, as the webcam output used to, with discovery from sysfs and with the
+device remembered from the previous run.  Real capture cards take far
+longer to open (and configure) than the plain files used here.
+'''
+
+import glob
+import os
+import sys
+import tempfile
+import time
+
+from meeting_timer import loopback
+
+
+def make_nodes(root, count, loopback_nodes):
+    '''Fake sysfs and /dev trees'''
+    sysfs = os.path.join(root, 'sys')
+    dev = os.path.join(root, 'dev')
+    os.makedirs(dev)
+    for i in range(count):
+        os.makedirs(os.path.join(sysfs, f'video{i}'))
+        if i in loopback_nodes:
+            open(os.path.join(sysfs, f'video{i}', 'max_openers'), 'w').close()
+        open(os.path.join(dev, f'video{i}'), 'w').close()
+    return sysfs, dev
+
+
+def measure(func, iterations):
+    '''Seconds per call'''
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main(iterations=200, count=16):
+    with tempfile.TemporaryDirectory() as root:
+        sysfs, dev = make_nodes(root, count, (count - 2, count - 1))
+        cache = os.path.join(root, 'cache', 'device')
+
+        # previous approach: open and configure each node until one works
+        def probe_all():
+            for path in sorted(glob.glob(os.path.join(dev, 'video*'))):
+                try:
+                    loopback.LoopbackDevice(path, 1280, 720).close()
+                    return path
+                except Exception:
+                    pass
+
+        probe_time = measure(probe_all, iterations)
+        scan_time = measure(lambda: loopback.discover_loopback(None, '', sysfs, dev), iterations)
+        loopback.discover_loopback(None, cache, sysfs, dev)
+        cached_time = measure(lambda: loopback.discover_loopback(None, cache, sysfs, dev), iterations)
+
+    print(f'video nodes:         {count}')
+    print(f'open every node:     {probe_time*1e6:8.1f} us')
+    print(f'sysfs scan:          {scan_time*1e6:8.1f} us')
+    print(f'cached device:       {cached_time*1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,63 @@
+'''
+Benchmark: colour changes with palette-indexed frames
+
+Compares re-drawing the text of a frame (what a colour change used to
+cost) with colouring the cached coverage mask through a palette, and the
+RGB to YUYV conversion of the loopback output with colouring the mask
+straight into YUYV.
+'''
+
+import sys
+import time
+
+import numpy as np
+
+from meeting_timer.loopback import YUYVConverter
+from meeting_timer.renderer import FrameRenderer, colourise, get_palette
+
+
+def measure(func, iterations):
+    '''Seconds per call'''
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main(iterations=50, width=1280, height=720):
+    colours = ['green', 'orange', 'red']
+    text = ('My Webinar', '00:59', 'Welcome')
+    renderer = FrameRenderer(width, height)
+    mask = renderer.render_mask(*text).copy()
+    palettes = [get_palette(colour, 'black') for colour in colours]
+
+    # previously a colour change cleared the frame, drew all the text again
+    # and blended it into the frame in RGB
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    count = [0]
+    def redraw():
+        count[0] += 1
+        fg = np.array(palettes[count[0] % len(palettes)].foreground, dtype=np.int32)
+        bg = np.zeros(3, dtype=np.int32)
+        frame[:] = bg
+        coverage = renderer.render_mask(*(t + ' ' * (count[0] % 2) for t in text))
+        frame[:] = bg + (coverage[..., None].astype(np.int32) * (fg - bg) + 127) // 255
+    def recolour():
+        count[0] += 1
+        colourise(mask, palettes[count[0] % len(palettes)])
+    redraw_time = measure(redraw, iterations)
+    recolour_time = measure(recolour, iterations)
+    print(f'resolution:          {width}x{height}')
+    print(f'redraw and blend:    {redraw_time*1000:8.2f} ms')
+    print(f'recolour (palette):  {recolour_time*1000:8.2f} ms  ({redraw_time/recolour_time:.1f}x)')
+
+    converter = YUYVConverter(width, height)
+    frame = colourise(mask, palettes[0])
+    convert_time = measure(lambda: converter.convert(frame), iterations)
+    direct_time = measure(lambda: converter.colourise(mask, palettes[0]), iterations)
+    print(f'YUYV from RGB:       {convert_time*1000:8.2f} ms')
+    print(f'YUYV from mask:      {direct_time*1000:8.2f} ms  ({convert_time/direct_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,71 @@
+'''
+Benchmark: webcam frame latency at several resolutions
+
+Measures the time from a display state being submitted (as
+WebcamOutput._update_webcam does) to the rendered frame being published,
+for countdown ticks (only the time changes) and for full redraws (new
+title and speaker).  4K is also measured rasterised at full size rather
+than scaled up.
+'''
+
+import sys
+import time
+
+from meeting_timer.frame_cache import FrameCache
+from meeting_timer.render_worker import FrameBuffer, RenderWorker
+
+RESOLUTIONS = ((640, 360), (1280, 720), (1920, 1080), (3840, 2160))
+
+
+def wait_for_frame(buffer, version):
+    '''Wait for a frame newer than version to be published'''
+    while True:
+        buffer.swap()
+        if buffer.version != version:
+            return buffer.version
+        time.sleep(0.0001)
+
+
+def frame_latency(width, height, frames, scale=None):
+    '''
+    Mean seconds from submitting a state to its frame being published
+
+    @param scale: int, rasterise at 1/scale of the size (default automatic)
+    @return: (tick, redraw) seconds
+    '''
+    buffer = FrameBuffer()
+    worker = RenderWorker(FrameCache(), width, height, buffer, scale=scale)
+    version = 0
+    results = []
+    try:
+        for redraw in (False, True):
+            elapsed = 0.0
+            for i in range(frames + 1):
+                state = {'title': f'Session {i}' if redraw else 'My Webinar',
+                         'time': f'{59 - i // 60 % 60:02d}:{59 - i % 60:02d}',
+                         'speaker': f'Speaker {i}' if redraw else 'Welcome',
+                         'foreground': 'green', 'background': 'black'}
+                start = time.perf_counter()
+                worker.submit(state)
+                version = wait_for_frame(buffer, version)
+                # (the first frame includes starting up)
+                if i > 0:
+                    elapsed += time.perf_counter() - start
+            results.append(elapsed / frames)
+    finally:
+        worker.stop()
+    return tuple(results)
+
+
+def main(frames=20):
+    for width, height in RESOLUTIONS:
+        tick, redraw = frame_latency(width, height, frames)
+        print(f'{width}x{height} tick:   {tick*1000:8.2f} ms')
+        print(f'{width}x{height} redraw: {redraw*1000:8.2f} ms')
+    tick, redraw = frame_latency(3840, 2160, frames, scale=1)
+    print(f'3840x2160 unscaled tick:   {tick*1000:8.2f} ms')
+    print(f'3840x2160 unscaled redraw: {redraw*1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,87 @@
+'''
+Benchmark: settings access and per-tick overhead
+
+Compares reading a nested setting through the previous SettingsWrapper
+tree of Tk variables (a copy is kept here as the baseline) with the slotted
+Settings model, and measures the time
+and memory allocations of a countdown tick that changes the display.
+'''
+
+import collections.abc
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+
+from meeting_timer.application import Application
+from meeting_timer.settings import Settings
+
+
+class _SettingsWrapper(object):
+    '''
+    The previous settings model: wraps each sub-section when it is accessed
+    '''
+    
+    def __init__(self, settings):
+        self.settings = settings
+    
+    def __getattr__(self, key):
+        return self.get(key)
+    
+    def get(self, key):
+        result = self.settings[key]
+        if isinstance(result, collections.abc.Mapping):
+            result = _SettingsWrapper(result)
+        return result
+
+
+def measure(func, iterations):
+    '''Seconds per call and peak bytes allocated during a call'''
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    func()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(iterations=100000):
+    root = tk.Tk()
+
+    # previous model: Tk variables behind a wrapper allocated per section access
+    legacy = _SettingsWrapper({
+        'display': {'foreground': tk.StringVar(root, value='green')},
+        'colour': {'warning': tk.StringVar(root, value='orange')},
+    })
+    settings = Settings()
+
+    legacy_time, legacy_bytes = measure(lambda: legacy.display.foreground.get(), iterations)
+    new_time, new_bytes = measure(lambda: settings.display.foreground.get(), iterations)
+    print(f'access (wrapper + Tk): {legacy_time*1e9:8.1f} ns  {legacy_bytes:5d} bytes allocated')
+    print(f'access (slotted):      {new_time*1e9:8.1f} ns  {new_bytes:5d} bytes allocated')
+
+    # a tick where the display time changes
+    now = [0.0]
+    app = Application(root)
+    app.init_state()
+    app.engine._clock = lambda: now[0]
+    app.engine.duration = 10**9
+    app.engine.start()
+    def tick():
+        now[0] += 1
+        app.update_timer(now[0])
+        app.display_state.flush()
+    tick_time, tick_bytes = measure(tick, iterations // 10)
+    print(f'tick:                  {tick_time*1e6:8.2f} us  {tick_bytes:5d} bytes allocated')
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
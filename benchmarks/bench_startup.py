@@ -0,0 +1,114 @@
+'''
+Benchmark: startup time
+
+Measures the import time of meeting_timer.application (with
+python -X importtime) and, where a display is available, the time from
+starting python to the control window being drawn and to the webcam output
+being ready.  The budgets are enforced by tests/test_startup.py.
+'''
+
+import os
+import subprocess
+import sys
+import time
+
+# import time budget for meeting_timer.application (ms)
+IMPORT_BUDGET_MS = 150
+
+# python start to control window drawn (ms)
+WINDOW_BUDGET_MS = 1000
+
+# modules that must not be imported before the windows are shown
+DEFERRED_MODULES = ('numpy', 'PIL', 'pyfakewebcam', 'asyncio', 'meeting_timer.renderer')
+
+FIRST_WINDOW_SCRIPT = '''
+import sys
+from meeting_timer.application import Application
+app = Application()
+def camera_ready():
+    if app.camera is None:
+        app.master.after(5, camera_ready)
+        return
+    print('camera', flush=True)
+    app.quit()
+def shown():
+    print('window', flush=True)
+    camera_ready()
+# (twice, to run after the idle callbacks that draw the windows)
+app.master.after_idle(app.master.after_idle, shown)
+app.main(['meeting-timer'])
+'''
+
+
+def _environment():
+    '''Environment for child pythons that can import meeting_timer'''
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [src, env.get('PYTHONPATH')]))
+    return env
+
+
+def import_time(repeat=3):
+    '''
+    Cumulative import time of meeting_timer.application (best of repeat runs)
+
+    @return: float, milliseconds
+    '''
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import meeting_timer.application'],
+                                env=_environment(), capture_output=True, text=True, check=True)
+        last = result.stderr.strip().splitlines()[-1]
+        cumulative = int(last.split('|')[1]) / 1000
+        best = cumulative if best is None else min(best, cumulative)
+    return best
+
+
+def imported_modules():
+    '''Modules imported by meeting_timer.application'''
+    result = subprocess.run([sys.executable, '-c', 'import sys, meeting_timer.application; print("\\n".join(sys.modules))'],
+                            env=_environment(), capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def first_window_time(timeout=30):
+    '''
+    Time from starting python to the control window being drawn and to the
+    webcam output being ready
+
+    @return: (window, camera) seconds, or None if there is no display
+    '''
+    start = time.perf_counter()
+    child = subprocess.Popen([sys.executable, '-c', FIRST_WINDOW_SCRIPT], env=_environment(),
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    times = {}
+    try:
+        for line in child.stdout:
+            times[line.strip()] = time.perf_counter() - start
+            if time.perf_counter() - start > timeout:
+                break
+    finally:
+        child.kill()
+        child.wait()
+    if 'window' not in times:
+        return None
+    return times['window'], times.get('camera')
+
+
+def main(repeat=3):
+    imports = import_time(repeat)
+    print(f'import time:         {imports:8.1f} ms  (budget {IMPORT_BUDGET_MS} ms)')
+    deferred = sorted(set(DEFERRED_MODULES) & imported_modules())
+    print(f'deferred imports:    {"ok" if not deferred else "imported " + ", ".join(deferred)}')
+    result = first_window_time()
+    if result is None:
+        print('first window:        n/a (no display)')
+        return
+    window, camera = result
+    print(f'first window:        {window*1000:8.1f} ms  (budget {WINDOW_BUDGET_MS} ms)')
+    if camera is not None:
+        print(f'webcam ready:        {camera*1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
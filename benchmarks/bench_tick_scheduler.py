@@ -0,0 +1,36 @@
+'''
+Benchmark: timer tick jitter and wakeup counts
+
+Runs a countdown on the Tk event loop for a number of seconds and reports
+how many times the timer woke up and how late each tick fired after its
+second boundary.
+'''
+
+import sys
+import time
+
+from meeting_timer.application import Application
+
+
+def main(seconds=10):
+    app = Application()
+    app.init_state()
+    app.duration = seconds + 60
+    app.start()
+
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        app.master.tk.dooneevent(0)
+    stats = app.scheduler.stats
+    app.master.destroy()
+
+    print(f'run time:              {seconds} s')
+    print(f'wakeups:               {stats.wakeups} (100 ms polling: {seconds * 10})')
+    print(f'early wakeups:         {stats.early_wakeups}')
+    print(f'lateness mean:         {stats.lateness_mean*1000:.3f} ms')
+    print(f'lateness max:          {stats.lateness_max*1000:.3f} ms')
+    print(f'jitter (stddev):       {stats.jitter*1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
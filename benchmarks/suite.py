@@ -0,0 +1,201 @@
+'''
+Benchmark suite: timer, render, settings and colour hot paths
+
+Runs without a display (the event loop is a HeadlessLoop) and saves the
+results as JSON so runs on different commits can be compared:
+
+    python -m benchmarks.suite -o results.json
+    python -m benchmarks.suite --compare baseline.json
+
+All results are times, lower is better.  With --compare the exit status is
+1 if any result is slower than the baseline by more than the threshold.
+'''
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from meeting_timer import support
+from meeting_timer.agenda import AgendaItem
+from meeting_timer.application import Application
+from meeting_timer.headless import HeadlessLoop
+from meeting_timer.settings import Settings
+
+# resolutions of the render benchmarks
+RESOLUTIONS = ((640, 360), (1280, 720), (1920, 1080), (3840, 2160))
+
+# agenda length of the huge settings file
+HUGE_AGENDA = 20000
+
+
+def measure(func, iterations):
+    '''Seconds per call'''
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def bench_tick(scale):
+    '''Cost of a countdown tick that changes the display, without and with metrics'''
+    results = {}
+    for name, metrics in (('tick.update_us', None), ('tick.update_metrics_us', 60.0)):
+        now = [0.0]
+        app = Application(HeadlessLoop())
+        app.init_state()
+        app.create_metrics(argparse.Namespace(metrics=metrics))
+        app.engine._clock = lambda: now[0]
+        app.engine.duration = 10**9
+        app.engine.start()
+        def tick():
+            now[0] += 1
+            app.update_timer(now[0])
+            app.display_state.flush()
+        results[name] = measure(tick, 2000 * scale) * 1e6
+    return results
+
+
+def bench_render(scale):
+    '''Time from a display state change to the webcam frame being ready'''
+    from benchmarks.bench_render import frame_latency
+    results = {}
+    for width, height in RESOLUTIONS:
+        tick, redraw = frame_latency(width, height, 10 * scale)
+        results[f'render.{width}x{height}.tick_ms'] = tick * 1000
+        results[f'render.{width}x{height}.redraw_ms'] = redraw * 1000
+    return results
+
+
+def bench_settings(scale):
+    '''Reading and writing small and huge settings files'''
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size, agenda in (('small', []),
+                             ('huge', [AgendaItem(f'Session {i}', f'Speaker {i}', 600, 60) for i in range(HUGE_AGENDA)])):
+            filename = os.path.join(tmpdir, f'{size}.mt')
+            settings = Settings()
+            settings.agenda.load(agenda)
+            iterations = 200 * scale if size == 'small' else scale
+            results[f'settings.{size}.write_ms'] = measure(lambda: settings.write(filename), iterations) * 1000
+            results[f'settings.{size}.read_ms'] = measure(lambda: settings.read(filename), iterations) * 1000
+    return results
+
+
+def bench_colours(scale):
+    '''Colour conversion throughput'''
+    colours = ['green', 'orange', 'red', 'black', '#ffa500', 'rgba(0, 128, 0, 0.5)']
+    iterations = 20000 * scale
+    def convert(func):
+        for colour in colours:
+            func(colour)
+    def parse():
+        support.parse_colour.cache_clear()
+        for colour in colours:
+            support.parse_colour(colour)
+    return {
+        'colours.to_tuple_ns': measure(lambda: convert(support.colour_to_tuple), iterations) / len(colours) * 1e9,
+        'colours.to_html_ns': measure(lambda: convert(support.colour_to_html), iterations) / len(colours) * 1e9,
+        'colours.parse_ns': measure(parse, iterations // 20) / len(colours) * 1e9,
+    }
+
+
+BENCHMARKS = {
+    'tick': bench_tick,
+    'render': bench_render,
+    'settings': bench_settings,
+    'colours': bench_colours,
+}
+
+
+def metadata():
+    '''Where and when the results were measured'''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.node(),
+    }
+
+
+def run(names=None, scale=1):
+    '''
+    Run benchmarks
+
+    @param names: iterable of BENCHMARKS names (default all)
+    @param scale: int, multiplies the iterations
+    @return: dict {'meta': metadata(), 'results': {name: value}}
+    '''
+    results = {}
+    for name in names or BENCHMARKS:
+        results.update(BENCHMARKS[name](scale))
+    return {'meta': metadata(), 'results': results}
+
+
+def compare(current, baseline, threshold=0.1):
+    '''
+    Compare results with a baseline
+
+    @param current: dict, run() output
+    @param baseline: dict, run() output
+    @param threshold: float, fraction slower than the baseline that counts as
+                      a regression
+    @return: list of (name, baseline, current, change, regressed) for the
+             results in both
+    '''
+    rows = []
+    for name, value in sorted(current['results'].items()):
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        change = value / base - 1 if base else 0.0
+        rows.append((name, base, value, change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('benchmarks', nargs='*', metavar='BENCHMARK',
+                        help=f'benchmarks to run ({", ".join(BENCHMARKS)}; default all)')
+    parser.add_argument('-o', '--output', metavar='FILE', help='save the results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='compare with results saved earlier')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='fraction slower than the baseline that fails --compare (default 0.1)')
+    parser.add_argument('--scale', type=int, default=1, help='multiply the iterations (default 1)')
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmark: {", ".join(sorted(unknown))}')
+
+    current = run(args.benchmarks, args.scale)
+    for name, value in sorted(current['results'].items()):
+        print(f'{name:34s} {value:12.3f}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f'\ncompared with {baseline["meta"].get("commit") or args.compare}:')
+        regressions = 0
+        for name, base, value, change, regressed in compare(current, baseline, args.threshold):
+            regressions += regressed
+            print(f'{name:34s} {base:12.3f} -> {value:12.3f}  {change:+7.1%}{"  REGRESSION" if regressed else ""}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,6 +15,7 @@ setup(
     url="https://github.com/andrewjrobinson/meeting_timer",
     package_dir={'': 'src'},
     packages=find_packages(where='src'),
+    package_data={'meeting_timer': ['static/*.html']},
     license="MIT",
     classifiers=[
         "Programming Language :: Python :: 3",
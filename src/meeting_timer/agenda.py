@@ -0,0 +1,205 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import collections
+import collections.abc
+
+
+def parse_duration(value):
+    '''
+    Convert a duration in seconds or [H:]MM:SS notation to seconds
+    '''
+    if isinstance(value, str) and ':' in value:
+        seconds = 0
+        for part in value.strip().split(':'):
+            seconds = seconds*60 + int(part or 0)
+        return seconds
+    return int(value)
+
+
+class AgendaItem(collections.namedtuple('AgendaItem', ('title', 'speaker', 'duration', 'warning'))):
+    '''
+    One session of an agenda
+    '''
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, values, default_duration=540, default_warning=60):
+        '''
+        Construct from a dictionary of (possibly string) values
+        '''
+        return cls(str(values.get('title') or ''),
+                   str(values.get('speaker') or ''),
+                   parse_duration(values.get('duration') or default_duration),
+                   parse_duration(values.get('warning') or default_warning))
+
+    def to_dict(self):
+        '''Convert to a dictionary of basic python types'''
+        return dict(self._asdict())
+
+## end class AgendaItem() ##
+
+
+class Agenda(object):
+    '''
+    Ordered list of sessions and the position of the one on display
+    
+    The items can be any sequence (i.e. a list or a lazily parsed file) so
+    moving around the agenda, including jumping to an item, is O(1)
+    regardless of its length.  Observers are called as callback(agenda)
+    whenever the items, the position or the loading progress change.
+    '''
+
+    def __init__(self, items=()):
+        '''
+        Constructor
+        
+        @param items: sequence of AgendaItem
+        '''
+        self._items = []
+        self._index = -1
+        self._observers = []
+        self.progress = None
+        self.load(items)
+
+    def subscribe(self, callback):
+        '''Register an observer, callable(agenda)'''
+        self._observers.append(callback)
+
+    def unsubscribe(self, callback):
+        '''Remove an observer'''
+        self._observers.remove(callback)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    @property
+    def items(self):
+        '''The sequence of items'''
+        return self._items
+
+    @property
+    def index(self):
+        '''Index of the item on display, -1 before the first item'''
+        return self._index
+
+    @property
+    def current(self):
+        '''Item on display (or None)'''
+        if 0 <= self._index < len(self._items):
+            return self._items[self._index]
+        return None
+
+    def peek(self, offset=1):
+        '''Item offset places from the one on display (or None)'''
+        index = self._index + offset
+        if 0 <= index < len(self._items):
+            return self._items[index]
+        return None
+
+    def window(self, start, count):
+        '''
+        Items start to start+count (fewer at the end of the agenda)
+        '''
+        start = max(0, start)
+        return [self._items[i] for i in range(start, min(start + count, len(self._items)))]
+
+    def load(self, items):
+        '''
+        Replace the items and go back to before the first one
+        '''
+        if not isinstance(items, collections.abc.Sequence):
+            items = list(items)
+        if hasattr(self._items, 'close') and self._items is not items:
+            self._items.close()
+        self._items = items
+        self._index = -1
+        self.progress = None
+        self._emit()
+
+    def set_progress(self, fraction):
+        '''
+        Report progress loading new items
+        
+        @param fraction: float, 0 to 1 (or None when not loading)
+        '''
+        self.progress = fraction
+        self._emit()
+
+    def append(self, item):
+        '''Add an item to the end of the agenda'''
+        if not isinstance(self._items, list):
+            items = self._items
+            self._items = list(items)
+            if hasattr(items, 'close'):
+                items.close()
+        self._items.append(item)
+        self._emit()
+
+    def advance(self):
+        '''
+        Move to the next item
+        
+        @return: AgendaItem, the new current item or None at the end
+        '''
+        if self._index + 1 >= len(self._items):
+            return None
+        self._index += 1
+        self._emit()
+        return self._items[self._index]
+
+    def rewind(self):
+        '''
+        Move to the previous item
+        
+        @return: AgendaItem, the new current item or None at the start
+        '''
+        if self._index <= 0:
+            return None
+        self._index -= 1
+        self._emit()
+        return self._items[self._index]
+
+    def jump(self, index):
+        '''
+        Move to an item
+        
+        @return: AgendaItem, the new current item
+        '''
+        if not 0 <= index < len(self._items):
+            raise IndexError(f'agenda item {index} out of range')
+        self._index = index
+        self._emit()
+        return self._items[index]
+
+    def _emit(self):
+        '''Notify observers'''
+        for callback in list(self._observers):
+            callback(self)
+
+## end class Agenda() ##
@@ -0,0 +1,196 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import array
+import collections
+import collections.abc
+import csv
+import json
+import os
+import threading
+
+from meeting_timer.agenda import AgendaItem
+
+# parsed items kept per file
+PARSE_CACHE_SIZE = 256
+
+# bytes indexed between progress reports
+PROGRESS_BYTES = 1024*1024
+
+UTF8_BOM = b'\xef\xbb\xbf'
+
+
+class AgendaFile(collections.abc.Sequence):
+    '''
+    Agenda items of a CSV or JSON lines file, parsed on demand
+    
+    The file is kept open and only the offset of each line is kept in
+    memory; a line is read and parsed when its item is first used.  (The file
+    is not memory-mapped: scheduling tools rewrite their exports in place and
+    touching a mapping past the new end of the file kills the process.)  CSV files need a
+    header row naming the title, speaker, duration and warning columns, JSON
+    lines files hold one object with those keys per line.  Either way each
+    item must be on a single line.
+    '''
+
+    def __init__(self, path, progress=None):
+        '''
+        Constructor, indexes the file (use AgendaLoader to do this in the
+        background)
+        
+        @param path: string, .csv or .jsonl file
+        @param progress: callable(fraction), called while indexing
+        '''
+        self.path = path
+        self.format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        self._offsets = array.array('q')
+        self._columns = None
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        
+        self._file = open(path, 'rb')
+        try:
+            self._index(progress)
+        except:
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('agenda item index out of range')
+        with self._lock:
+            item = self._cache.get(index)
+            if item is not None:
+                self._cache.move_to_end(index)
+                return item
+            item = self._parse(index)
+            self._cache[index] = item
+            if len(self._cache) > PARSE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return item
+
+    def close(self):
+        '''Close the file'''
+        self._file.close()
+
+    def _index(self, progress):
+        '''Record the offset of each non-empty line'''
+        f = self._file
+        size = os.fstat(f.fileno()).st_size
+        start = len(UTF8_BOM) if f.read(len(UTF8_BOM)) == UTF8_BOM else 0
+        f.seek(start)
+        if self.format == 'csv':
+            start = self._read_header()
+        next_report = PROGRESS_BYTES
+        offsets = self._offsets
+        for line in f:
+            if line.strip():
+                offsets.append(start)
+            start += len(line)
+            if progress is not None and start >= next_report:
+                progress(start / size)
+                next_report += PROGRESS_BYTES
+        # end of the last line
+        offsets.append(start + 1)
+        if progress is not None:
+            progress(1.0)
+
+    def _read_header(self):
+        '''Read the CSV column names, returns the offset after the header'''
+        header = next(csv.reader([self._file.readline().decode('utf-8')]), [])
+        self._columns = [name.strip().lower() for name in header]
+        if 'title' not in self._columns and 'speaker' not in self._columns:
+            raise ValueError(f'{self.path}: CSV header must name title and/or speaker columns')
+        return self._file.tell()
+
+    def _parse(self, index):
+        '''Read and parse the item on a line (lock held)'''
+        self._file.seek(self._offsets[index])
+        # (a file rewritten since it was indexed gives short or invalid lines)
+        data = self._file.readline()
+        try:
+            line = data.decode('utf-8').strip()
+            if self.format == 'csv':
+                values = dict(zip(self._columns, next(csv.reader([line]))))
+            else:
+                values = json.loads(line)
+            return AgendaItem.from_dict(values)
+        except (ValueError, TypeError, AttributeError):
+            # keep the rest of the agenda usable
+            return AgendaItem.from_dict({'title': f'(invalid line: {data[:40]!r})'})
+
+## end class AgendaFile() ##
+
+
+class AgendaLoader(object):
+    '''
+    Indexes an agenda file on a background thread
+    
+    The callbacks are called through dispatch (i.e. Dispatcher.call) so they
+    run on the event loop thread.
+    '''
+
+    def __init__(self, path, dispatch, done, error, progress=None):
+        '''
+        Constructor, starts loading
+        
+        @param path: string, .csv or .jsonl file
+        @param dispatch: callable(func, *args), runs func on the event loop
+        @param done: callable(AgendaFile)
+        @param error: callable(exception)
+        @param progress: callable(fraction)
+        '''
+        self.path = path
+        self._dispatch = dispatch
+        self._done = done
+        self._error = error
+        self._progress = progress
+        self._thread = threading.Thread(target=self._run, name='meeting-timer-agenda', daemon=True)
+        self._thread.start()
+
+    def join(self, timeout=None):
+        '''Wait for loading to finish'''
+        self._thread.join(timeout)
+
+    def _run(self):
+        '''Background thread'''
+        progress = None
+        if self._progress is not None:
+            progress = lambda fraction: self._dispatch(self._progress, fraction)
+        try:
+            agenda_file = AgendaFile(self.path, progress)
+        except (OSError, ValueError) as e:
+            self._dispatch(self._error, e)
+        else:
+            self._dispatch(self._done, agenda_file)
+
+## end class AgendaLoader() ##
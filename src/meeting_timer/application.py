@@ -22,16 +22,88 @@
 # SOFTWARE.
 #
 
+import argparse
+import contextlib
+import json
+import logging
+import os
+import signal
+import threading
 import time
 import tkinter as tk
 import tkinter.filedialog
 
-from meeting_timer.display_window import DisplayWindow
+from meeting_timer import webcam_output
+from meeting_timer.agenda import AgendaItem
+from meeting_timer.autosave import AutoSaver
+from meeting_timer.control import ControlServer, default_socket_path
+from meeting_timer.dispatcher import Dispatcher
+from meeting_timer.display_state import DisplayStateBus, DISPLAY_KEYS
+from meeting_timer.metrics import Metrics
 from meeting_timer.settings import Settings
-from meeting_timer.main_window import MainWindow
-from meeting_timer.webcam_output import WebcamOutput
-import os
-from meeting_timer.settings_window import SettingsWindow
+from meeting_timer.tick_scheduler import TickScheduler
+from meeting_timer.timer_engine import TimerEngine, seconds_to_display
+from meeting_timer.tracing import Tracer, traced
+
+logger = logging.getLogger(__name__)
+
+# files opened as an agenda (rather than settings)
+AGENDA_EXTENSIONS = ('.csv', '.jsonl')
+
+# countdown frames of the next session to render ahead of switching to it
+PRELOAD_FRAMES = 3
+
+# default seconds between metrics log lines
+METRICS_LOG_INTERVAL = 60.0
+
+
+def parse_args(argv):
+    '''
+    Parse command line arguments (excluding the program name)
+    '''
+    parser = argparse.ArgumentParser(prog='meeting-timer',
+                                     description='Keep your meetings or webinars running on time.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='meeting timer settings file (.mt)')
+    parser.add_argument('--agenda', metavar='FILE', default=None,
+                        help='load the agenda from a CSV or JSON lines file')
+    parser.add_argument('--headless', action='store_true',
+                        help='run the countdown on the webcam output only, without any windows')
+    parser.add_argument('--device', metavar='DEVICE', default=None,
+                        help='v4l2loopback device to send the webcam output to '
+                             '(default: the one used last, or the first found)')
+    parser.add_argument('--record', metavar='FILE', default=None,
+                        help='also record the webcam output to FILE (.y4m is uncompressed)')
+    parser.add_argument('--stream', metavar='[HOST:]PORT', type=parse_address, default=None,
+                        help='also serve raw RGB webcam frames over TCP')
+    parser.add_argument('--http', metavar='[HOST:]PORT', type=parse_address, default=None,
+                        help='serve the display to web browsers (and push changes over WebSocket)')
+    parser.add_argument('--control', metavar='SOCKET', nargs='?', const=default_socket_path(), default=None,
+                        help='accept commands from "meeting-timer ctl" on a unix socket '
+                             '(default: %(const)s)')
+    parser.add_argument('--autosave', action='store_true',
+                        help='save changes to the settings file automatically')
+    parser.add_argument('--watch', action='store_true',
+                        help='reload the settings file when another program changes it')
+    parser.add_argument('--metrics', metavar='SECONDS', type=float, nargs='?',
+                        const=METRICS_LOG_INTERVAL, default=None,
+                        help='record tick, render and file timings, served at /stats (with --http) and '
+                             'by "meeting-timer ctl stats", and logged every SECONDS (default %(const)g, 0 never)')
+    parser.add_argument('--trace', metavar='FILE', default=None,
+                        help='record a timeline of commands, display updates and webcam frames and write it '
+                             'to FILE (Chrome trace format) on exit or SIGUSR1')
+    return parser.parse_args(argv)
+
+
+def parse_address(text):
+    '''
+    Parse a [HOST:]PORT command line value, the host defaults to localhost
+    '''
+    host, _, port = text.rpartition(':')
+    try:
+        return (host or 'localhost', int(port))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid address: {text}')
 
 
 class Application(object):
@@ -39,38 +111,45 @@ class Application(object):
     Main state management for the application
     '''
     
-    def __init__(self):
+    def __init__(self, master=None):
         '''
         Constructor
+        
+        @param master: event loop/root window, default is a new tk.Tk()
         '''
         # setup tkinter
-        self.master = tk.Tk()
+        if master is None:
+            master = tk.Tk()
+        self.master = master
+        self.camera = None
+        self.broadcast = None
+        self.control = None
+        self.autosave = None
+        self.reloader = None
+        self.metrics = None
+        self.tracer = None
+        self._prerender_pending = False
+        self._closed = False
     
     def main(self, argv):
         '''
         Main entry point into application
         '''
         
+        # (modules only needed later are imported where they are used, to
+        # get the windows up quickly)
+        from meeting_timer.display_window import DisplayWindow
+        from meeting_timer.main_window import MainWindow
+        
         # parse cli arguments
-        filename = None
-        if len(argv) > 1:
-            filename = argv[1]
+        args = parse_args(argv[1:])
         
         # construct state
-        self.settings = Settings(filename)
-        
-        # internal variables
-        self.start_time = None
-        self.pause_time = None
-        self.duration = self.settings.initial.duration.get()
-        self.warning = self.settings.initial.warning.get()
-        self._last_colour = ''
-        self._last_time = ''
-        
-        # copy initial values onto display
-        self.settings.display.title.set(self.settings.initial.title.get())
-        self.settings.display.time.set(self.settings.initial.time.get())
-        self.settings.display.speaker.set(self.settings.initial.speaker.get())
+        self.create_tracer(args)
+        self.init_state(args.filename)
+        self.create_metrics(args)
+        if args.agenda is not None:
+            self.import_agenda(args.agenda)
         
         ## create output devices ##
         # display window
@@ -78,56 +157,274 @@ class Application(object):
         self.display_window.title('Meeting Timer')
         self.display_window.geometry(f'{self.settings.initial.width.get()}x{self.settings.initial.height.get()}')
         self.display_app = DisplayWindow(self.display_window, app=self)
-        # webcam
-        self.camera = WebcamOutput(self)
+        # browser displays and remote control
+        self.create_broadcast(args)
+        self.create_control(args)
+        self.create_autosave(args)
+        self.create_reloader(args)
         
-        # schedule display update
-        self.master.after(100, self.update_timer)
+        # schedule display updates
+        self.scheduler.reschedule()
         
         # create main window
         self.master.title('Meeting Timer - Control')
-        self.master.geometry("240x600")
+        self.master.geometry("240x720")
         app = MainWindow(master=self.master, app=self)
         
+        # the webcam follows once the windows are shown
+        self.master.after_idle(self.load_output, args)
+        
         # start event loop
         app.mainloop()
     
     
-    def update_timer(self):
+    def load_output(self, args):
         '''
-        Timer function that updates display at ~10fps
+        Import the webcam output modules on a background thread, then create
+        and start the output on the event loop
         '''
-        
-        if self.start_time is not None:
-            
-            # calculate time remaining
-            if self.pause_time is not None:
-                elapsed = self.pause_time - self.start_time
-            else:
-                elapsed = time.time() - self.start_time
-            remaining = int(self.duration - elapsed)
-            
-            # update display colour
-            colour = self.settings.colour.primary.get()
-            if remaining <= self.warning:
-                colour = self.settings.colour.warning.get()
-            if colour != self._last_colour:
-                self.settings.display.foreground.set(colour)
-            self._last_colour = colour
-            
-            # update display text
-            if int(remaining) <= 0:
-                self.stop()
+        def load():
+            try:
+                webcam_output.load()
+            finally:
+                self.dispatcher.call(self._output_loaded, args)
+        threading.Thread(target=load, name='meeting-timer-startup', daemon=True).start()
+    
+    def _output_loaded(self, args):
+        '''Create the webcam output (event loop)'''
+        if self._closed:
+            return
+        self.create_output(args)
+        self.camera.start(self.master)
+        self._prerender_countdown()
+    
+    def create_output(self, args):
+        '''
+        Construct the webcam output and the extra frame sinks from the
+        command line
+        '''
+        self.camera = webcam_output.WebcamOutput(self, device=args.device, metrics=self.metrics,
+                                                 tracer=self.tracer)
+        if (args.record or args.stream) and self.camera.bus is None:
+            logger.warning('numpy and Pillow are required to record or stream frames')
+            return
+        # (a sink that cannot be opened must not stop the webcam or the others)
+        if args.record:
+            try:
+                self.camera.record(args.record)
+            except (OSError, ImportError) as e:
+                logger.error('Unable to record to %s: %s', args.record, e)
+        if args.stream:
+            try:
+                sink = self.camera.stream(args.stream)
+            except OSError as e:
+                logger.error('Unable to stream frames on %s:%d: %s', *args.stream, e)
             else:
-                time_text = self._seconds_to_display(remaining)
-                if time_text != self._last_time:
-                    self.settings.display.time.set(time_text)
+                logger.info('Streaming frames on %s:%d', *sink.address)
+    
+    def create_broadcast(self, args):
+        '''
+        Start the web browser display server if requested on the command line
+        '''
+        if args.http is None:
+            return
+        from meeting_timer.broadcast import BroadcastServer
+        self.broadcast = BroadcastServer(args.http, self.stats)
+        self.broadcast.start()
+        self.broadcast.publish(self.display_state.state, DISPLAY_KEYS)
+        self.display_state.subscribe(self.broadcast.publish)
+        logger.info('Serving display on http://%s:%d/', *self.broadcast.address)
+    
+    def create_control(self, args):
+        '''
+        Start the control socket if requested on the command line
+        '''
+        if args.control is None:
+            return
+        commands = {
+            'start': self.start,
+            'pause': self.pause,
+            'next': self.next,
+            'previous': self.previous,
+            'jump': lambda index: self.jump(int(index) - 1),
+            'stop': self.stop,
+            'add60': self.add60,
+            'minus60': self.minus60,
+            'add': lambda seconds: self.add(int(seconds)),
+            'status': self.status,
+            'stats': lambda: json.dumps(self.stats(), separators=(',', ':')),
+            'ping': lambda: None,
+        }
+        self.control = ControlServer(args.control, commands, self._commit_control,
+                                     self.master.tk.createfilehandler,
+                                     self.master.tk.deletefilehandler)
+        logger.info('Control socket %s', self.control.path)
+    
+    def create_autosave(self, args):
+        '''
+        Save settings changes automatically if requested on the command line
+        '''
+        if args.autosave:
+            self.autosave = AutoSaver(self.settings, self.master.after, self.master.after_cancel,
+                                      metrics=self.metrics)
+    
+    def create_reloader(self, args):
+        '''
+        Watch the settings file for changes if requested on the command line
+        '''
+        if args.watch:
+            from meeting_timer.file_watcher import SettingsReloader
+            self.reloader = SettingsReloader(self.settings, self.dispatcher.call, self.import_agenda)
+    
+    def create_metrics(self, args):
+        '''
+        Record timing histograms if requested on the command line (before
+        the outputs are created)
+        '''
+        if args.metrics is None:
+            return
+        self.metrics = Metrics()
+        self.scheduler.stats.histogram = self.metrics.histogram('tick.lateness')
+        self.display_state.subscribe(self._record_drift)
+        self._metrics_interval = int(args.metrics * 1000)
+        if self._metrics_interval > 0:
+            self.master.after(self._metrics_interval, self._log_metrics)
+    
+    def _record_drift(self, state, changed):
+        '''Display state observer: how late the countdown reached the display'''
+        if 'time' in changed:
+            drift = self.engine.drift()
+            if drift is not None:
+                self.metrics.record('countdown.drift', drift)
+    
+    def _log_metrics(self):
+        '''Periodic metrics log line'''
+        logger.info('Metrics: %s', self.metrics.summary())
+        self.master.after(self._metrics_interval, self._log_metrics)
+    
+    def _measure(self, name):
+        '''Context manager recording the duration of a block, if metrics are enabled'''
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.timer(name)
+    
+    def create_tracer(self, args):
+        '''
+        Record a timeline of spans if requested on the command line (before
+        the state is constructed)
+        '''
+        if args.trace is None:
+            return
+        self.tracer = Tracer()
+        self._trace_file = args.trace
+        self.tracer.attach(self)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self._on_trace_signal)
+    
+    def _on_trace_signal(self, signum, frame):
+        '''Write the trace once the current callback has finished'''
+        self.master.after_idle(self.dump_trace)
+    
+    def dump_trace(self):
+        '''Write the recorded spans to the trace file'''
+        try:
+            count = self.tracer.dump(self._trace_file)
+        except OSError as e:
+            logger.error('Unable to write trace %s: %s', self._trace_file, e)
+        else:
+            logger.info('Trace of %d spans written to %s', count, self._trace_file)
+    
+    def stats(self):
+        '''
+        Metrics and output counters (JSON serialisable, safe to call from
+        other threads)
+        '''
+        return {
+            'metrics': self.metrics.snapshot() if self.metrics is not None else None,
+            'ticks': self.scheduler.stats.summary(),
+            'webcam': self.camera.stats() if self.camera is not None else None,
+        }
+    
+    def create_settings(self, filename=None):
+        '''
+        Construct the settings object
+        '''
+        return Settings(filename)
+    
+    def init_state(self, filename=None):
+        '''
+        Construct the settings and timer state
+        '''
+        self.settings = self.create_settings(filename)
         
-        # render image
-        self.camera.schedule_frame()
+        # countdown timer
+        self.engine = TimerEngine(self.settings.initial.duration.get(),
+                                  self.settings.initial.warning.get())
+        self.engine.subscribe(self._on_timer_event)
         
-        # schedule next display update
-        self.master.after(100, self.update_timer)
+        # copy initial values onto display
+        self.settings.display.title.set(self.settings.initial.title.get())
+        self.settings.display.time.set(self.settings.initial.time.get())
+        self.settings.display.speaker.set(self.settings.initial.speaker.get())
+        
+        # batch display changes into one update per idle cycle
+        self.display_state = DisplayStateBus(self.master.after_idle)
+        if self.tracer is not None:
+            self.tracer.attach(self.display_state)
+        self.display_state.trace_variables(self.settings.display)
+        
+        # tick at each second boundary of the countdown
+        self.scheduler = TickScheduler(self.master.after, self.master.after_cancel, self.update_timer)
+        
+        # agenda sessions are staged into the "next" settings one at a time
+        self.dispatcher = Dispatcher(self.master)
+        self.settings.agenda.subscribe(self._on_agenda_change)
+        self._on_agenda_change(self.settings.agenda)
+        if self.settings.agenda_file is not None:
+            self.import_agenda(self.settings.agenda_file)
+    
+    @traced('timer.tick')
+    def update_timer(self, now=None):
+        '''
+        Timer function that updates the display
+        
+        @param now: float, time.monotonic() value of this tick
+        @return: float, time.monotonic() deadline of the next display change
+                 or None if the display is static (stopped or paused)
+        '''
+        if self.metrics is None:
+            return self.engine.tick(now)
+        start = time.perf_counter()
+        deadline = self.engine.tick(now)
+        self.metrics.record('tick.duration', time.perf_counter() - start)
+        return deadline
+    
+    def _on_timer_event(self, event, value):
+        '''Copy timer engine changes onto the display'''
+        display = self.settings.display
+        if event == 'time':
+            display.time.set(value)
+        elif event == 'phase':
+            # phases are named after their colour settings
+            display.foreground.set(self.settings.colour.get(value).get())
+        elif event == 'stopped':
+            display.foreground.set(self.settings.colour.finished.get())
+            display.time.set(self.settings.finished_text.get())
+
+    @traced('command.commit')
+    def _commit_control(self):
+        '''Show the result of a batch of remote commands straight away'''
+        self.scheduler.tick_now()
+        self.display_state.flush()
+
+    def status(self):
+        '''
+        Timer and display state as a JSON string
+        '''
+        state = self.display_state.state
+        state['state'] = 'running' if self.engine.running else 'paused' if self.engine.paused else 'stopped'
+        state['remaining'] = self.engine.remaining()
+        return json.dumps(state, separators=(',', ':'))
 
     def update_bg_colour(self):
         '''Update background colour on display'''
@@ -138,34 +435,63 @@ class Application(object):
         Choose a file to open
         '''
         initial_dir = "~"
-        filename = tk.filedialog.askopenfilename(initialdir=initial_dir,
-                                                 title="Select file",
-                                                 filetypes=(("meeting timer files","*.mt"),
-                                                            ("all files","*.*")))
-        self.settings.read(filename)
+        with self._measure('settings.dialog'):
+            filename = tk.filedialog.askopenfilename(initialdir=initial_dir,
+                                                     title="Select file",
+                                                     filetypes=(("meeting timer files","*.mt"),
+                                                                ("agenda files","*.csv *.jsonl"),
+                                                                ("all files","*.*")))
+        if not filename:
+            return
+        if os.path.splitext(filename)[1].lower() in AGENDA_EXTENSIONS:
+            self.import_agenda(filename)
+        else:
+            with self._measure('settings.read'):
+                self.settings.read(filename)
+            if self.settings.agenda_file is not None:
+                self.import_agenda(self.settings.agenda_file)
+    
+    def import_agenda(self, filename):
+        '''
+        Load the agenda from a CSV/JSON lines file in the background
+        '''
+        from meeting_timer.agenda_import import AgendaLoader
+        agenda = self.settings.agenda
+        agenda.set_progress(0.0)
+        AgendaLoader(filename, self.dispatcher.call, agenda.load,
+                     self._on_agenda_error, agenda.set_progress)
+    
+    def _on_agenda_error(self, error):
+        '''Agenda file could not be loaded'''
+        logger.error('Unable to load agenda: %s', error)
+        self.settings.agenda.set_progress(None)
 
     def save(self):
         '''Save to file'''
         if self.settings._filename is None or not os.path.isfile(self.settings._filename):
             self.saveas()
         else:
-            self.settings.write()
+            with self._measure('settings.write'):
+                self.settings.write()
     
     def saveas(self):
         '''Save as new file'''
         initial_dir = "~"
-        filename = tk.filedialog.asksaveasfilename(initialdir=initial_dir,
-                                                   title="Select file",
-                                                   filetypes=(("meeting timer files","*.mt"),
-                                                              ("all files","*.*")))
+        with self._measure('settings.dialog'):
+            filename = tk.filedialog.asksaveasfilename(initialdir=initial_dir,
+                                                       title="Select file",
+                                                       filetypes=(("meeting timer files","*.mt"),
+                                                                  ("all files","*.*")))
         if filename is not None:
-            self.settings.write(filename)
+            with self._measure('settings.write'):
+                self.settings.write(filename)
 
     def show_settings(self):
         '''Show the settings window'''
         
         self.settings_window = tk.Toplevel(self.master)
         self.settings_window.title('Settings - Meeting Timer')
+        from meeting_timer.settings_window import SettingsWindow
         self.settings_app = SettingsWindow(self.settings_window, app=self)
         
 
@@ -174,49 +500,104 @@ class Application(object):
         '''Clear '''
         raise NotImplementedError
 
+    @traced('command.start')
     def start(self):
-        if self.pause_time is not None:
-            self.start_time += time.time() - self.pause_time
-        elif self.start_time is None:
-            self.start_time = time.time()
-        self.pause_time = None
+        self.engine.start()
+        self._prerender_countdown()
+        self.scheduler.reschedule()
     
+    @traced('command.pause')
     def pause(self):
-        if self.pause_time is None and self.start_time is not None:
-            self.pause_time = time.time()
+        if self.engine.running:
+            self.engine.pause()
+            self.scheduler.reschedule()
     
+    @traced('command.next')
     def next(self):
         '''
         Move to next speaker
         '''
-        self.stop()
-        
-        # update configuration
-        self.duration = self.settings.next.duration.get()
-        self.warning = self.settings.next.warning.get()
+        self.scheduler.cancel()
         
         # preload next speakers duration
-        self.settings.display.foreground.set(self.settings.colour.primary.get())
-        self.settings.display.title.set(self.settings.next.title.get())
-        self.settings.display.speaker.set(self.settings.next.speaker.get())
-        self.settings.display.time.set(self._seconds_to_display(self.duration))
+        self._load_item(self._next_item())
+        self.settings.agenda.advance()
+    
+    @traced('command.previous')
+    def previous(self):
+        '''
+        Move back to the previous agenda item
+        '''
+        item = self.settings.agenda.rewind()
+        if item is not None:
+            self.scheduler.cancel()
+            self._load_item(item)
+    
+    @traced('command.jump')
+    def jump(self, index):
+        '''
+        Move to an agenda item
         
+        @param index: int, position in the agenda (from 0)
+        '''
+        item = self.settings.agenda.jump(index)
+        self.scheduler.cancel()
+        self._load_item(item)
+    
+    def _next_item(self):
+        '''The session staged in the "next" settings'''
+        next_ = self.settings.next
+        return AgendaItem(next_.title.get(), next_.speaker.get(),
+                          next_.duration.get(), next_.warning.get())
+    
+    def _load_item(self, item):
+        '''Put a session on display, ready to start'''
+        self.engine.load(item.duration, item.warning)
+        self.settings.display.title.set(item.title)
+        self.settings.display.speaker.set(item.speaker)
+        self._prerender_countdown()
     
+    def _on_agenda_change(self, agenda):
+        '''Stage the following agenda item into the "next" settings'''
+        item = agenda.peek()
+        if item is not None:
+            next_ = self.settings.next
+            next_.title.set(item.title)
+            next_.speaker.set(item.speaker)
+            next_.duration.set(item.duration)
+            next_.warning.set(item.warning)
+    
+    @traced('command.stop')
     def stop(self):
         '''
         Stop timer and reset to 0
         '''
-        self.start_time = None
-        self.pause_time = None
-        colour = self.settings.colour.finished.get()
-        self.settings.display.foreground.set(colour)
-        self._last_colour = colour
-        self.settings.display.time.set(self.settings.finished_text.get())
+        self.scheduler.cancel()
+        self.engine.stop()
     
     def quit(self):
         '''
         Stop the application
         '''
+        self._closed = True
+        logger.info('Timer ticks: %s', self.scheduler.stats.summary())
+        if self.metrics is not None:
+            logger.info('Metrics: %s', self.metrics.summary())
+        if self.tracer is not None:
+            self.dump_trace()
+        if self.camera is not None:
+            logger.info('Webcam frames: %s', self.camera.stats())
+            self.camera.close()
+        if self.broadcast is not None:
+            self.broadcast.close()
+        if self.control is not None:
+            logger.info('Control commands: %s', self.control.stats.summary())
+            self.control.close()
+        if self.reloader is not None:
+            self.reloader.close()
+        if self.autosave is not None:
+            self.autosave.close()
+            logger.info('Autosaves: %d written, %d unchanged', self.autosave.saves, self.autosave.skipped)
         self.master.destroy()
     
     def add60(self):
@@ -224,13 +605,41 @@ class Application(object):
     def minus60(self):
         self.add(-60)
     
+    @traced('command.add')
     def add(self, duration):
-        self.duration += duration
+        self.engine.add(duration)
+        self._prerender_countdown()
+        self.scheduler.reschedule()
+    
+    def _prerender_countdown(self):
+        '''
+        Queue the remaining frames of the countdown for pre-rendering, once
+        the current burst of changes (i.e. a batch of commands) is applied
+        '''
+        if self.camera is None or self._prerender_pending:
+            return
+        self._prerender_pending = True
+        self.master.after_idle(self._queue_prerender)
+    
+    def _queue_prerender(self):
+        '''Build the countdown frame states for the pre-renderer'''
+        self._prerender_pending = False
+        remaining = self.engine.remaining()
         
+        title = self.settings.display.title.get()
+        speaker = self.settings.display.speaker.get()
+        background = self.settings.display.background.get()
+        primary = self.settings.colour.primary.get()
+        warning = self.settings.colour.warning.get()
+        states = [(title, seconds_to_display(r), speaker,
+                   warning if r <= self.engine.warning else primary, background)
+                  for r in range(remaining, 0, -1)]
+        states.append((title, self.settings.finished_text.get(), speaker,
+                       self.settings.colour.finished.get(), background))
         
-    
-    def _seconds_to_display(self, duration):
-        '''Formats a duration for display'''
-        mins = int(duration / 60)
-        sec = duration % 60
-        return '%02d:%02d' % (mins, sec)
+        # first frames of the next session, so switching to it is instant
+        item = self._next_item()
+        preload = [(item.title, seconds_to_display(item.duration - s), item.speaker,
+                    warning if 0 < s and item.duration - s <= item.warning else primary, background)
+                   for s in range(min(PRELOAD_FRAMES, item.duration))]
+        self.camera.prerender(states, preload)
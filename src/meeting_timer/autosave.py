@@ -0,0 +1,152 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import logging
+import threading
+import time
+
+from meeting_timer.settings import UNSAVED_SECTIONS, content_hash, serialise, write_atomic
+
+logger = logging.getLogger(__name__)
+
+# seconds of quiet before changes are saved
+DELAY = 1.0
+
+
+class AutoSaver(object):
+    '''
+    Saves the settings file shortly after the settings (or agenda) change
+    
+    Changes are debounced on the event loop, which only takes a snapshot of
+    the values; serialising and writing happen on a background thread.  The
+    file is replaced atomically and is not rewritten when its content would
+    not change.
+    '''
+
+    def __init__(self, settings, after, after_cancel, delay=DELAY, metrics=None):
+        '''
+        Constructor
+        
+        @param settings: Settings, settings to save (to their own filename)
+        @param after: callable(ms, func), event loop timer
+        @param after_cancel: callable(id), cancels an after() timer
+        @param delay: float, seconds of quiet before saving
+        @param metrics: Metrics, optional, records the write durations
+        '''
+        self._settings = settings
+        self._after = after
+        self._after_cancel = after_cancel
+        self._delay_ms = int(delay * 1000)
+        self._metrics = metrics
+        self._timer = None
+        self._pending = None
+        self._running = True
+        self.saves = 0
+        self.skipped = 0
+        self._cond = threading.Condition()
+        
+        settings.subscribe(self._on_settings_change)
+        settings.agenda.subscribe(self._on_agenda_change)
+        self._thread = threading.Thread(target=self._run, name='meeting-timer-autosave', daemon=True)
+        self._thread.start()
+
+    def schedule(self):
+        '''(Re)start the quiet period before saving'''
+        if not self._running:
+            return
+        if self._timer is not None:
+            self._after_cancel(self._timer)
+        self._timer = self._after(self._delay_ms, self.save)
+
+    def save(self):
+        '''
+        Hand a snapshot of the settings to the writer thread now
+        '''
+        self._timer = None
+        filename = self._settings.filename
+        if filename is None:
+            return
+        content = self._settings.dump()
+        with self._cond:
+            self._pending = (filename, content)
+            self._cond.notify()
+
+    def close(self):
+        '''
+        Save any outstanding changes and stop the writer thread
+        '''
+        if not self._running:
+            return
+        if self._timer is not None:
+            self._after_cancel(self._timer)
+            self.save()
+        self._running = False
+        self._settings.unsubscribe(self._on_settings_change)
+        self._settings.agenda.unsubscribe(self._on_agenda_change)
+        with self._cond:
+            self._cond.notify()
+        self._thread.join()
+
+    def _on_settings_change(self, changed):
+        '''Settings observer'''
+        if any(name.split('.', 1)[0] not in UNSAVED_SECTIONS for name in changed):
+            self.schedule()
+
+    def _on_agenda_change(self, agenda):
+        '''Agenda observer'''
+        self.schedule()
+
+    def _run(self):
+        '''Background thread main loop'''
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                (filename, content), self._pending = self._pending, None
+            
+            # (the settings know the hash of the file as last read/written)
+            data = serialise(content)
+            digest = content_hash(data)
+            previous = self._settings._file_hash
+            if digest == previous:
+                self.skipped += 1
+                continue
+            
+            # recorded first so a file watcher does not reload our own write
+            self._settings._file_hash = digest
+            start = time.perf_counter()
+            try:
+                write_atomic(filename, data)
+            except OSError as e:
+                self._settings._file_hash = previous
+                logger.warning('autosave of %s failed: %s', filename, e)
+                continue
+            self.saves += 1
+            if self._metrics is not None:
+                self._metrics.record('settings.autosave', time.perf_counter() - start)
+
+## end class AutoSaver() ##
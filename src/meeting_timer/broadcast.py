@@ -0,0 +1,269 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+
+from meeting_timer import support
+
+logger = logging.getLogger(__name__)
+
+WEBSOCKET_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# websocket opcodes
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# clients with more than this many bytes unsent are too slow and dropped
+MAX_CLIENT_BUFFER = 64*1024
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+
+
+def websocket_accept(key):
+    '''Sec-WebSocket-Accept value for a Sec-WebSocket-Key'''
+    return base64.b64encode(hashlib.sha1(key.encode('ascii') + WEBSOCKET_GUID).digest()).decode('ascii')
+
+
+def websocket_frame(payload, opcode=OP_TEXT):
+    '''
+    Encode an (unmasked, server to client) websocket frame
+    
+    @param payload: bytes, message data
+    '''
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_websocket_frame(reader):
+    '''
+    Read a (masked, client to server) websocket frame
+    
+    @return: (opcode, payload bytes)
+    '''
+    head, length = await reader.readexactly(2)
+    if length & 0x7f == 126:
+        length, = struct.unpack('!H', await reader.readexactly(2))
+    elif length & 0x7f == 127:
+        length, = struct.unpack('!Q', await reader.readexactly(8))
+    else:
+        length &= 0x7f
+    mask = await reader.readexactly(4)
+    payload = bytearray(await reader.readexactly(length))
+    for i in range(length):
+        payload[i] ^= mask[i % 4]
+    return head & 0x0f, bytes(payload)
+
+
+def display_message(state, keys):
+    '''
+    Serialise display values as a compact JSON delta message, colours are
+    converted to HTML notation
+    
+    Translucent text is blended into the background, as on the display
+    window and the webcam, so a change of either colour sends both.
+    '''
+    message = {}
+    for key in keys:
+        if key in ('foreground', 'background'):
+            message['foreground'] = '#%02x%02x%02x' % support.colour_over(state['foreground'], state['background'])
+            message['background'] = support.colour_to_html(state['background'])
+        else:
+            message[key] = state[key]
+    return json.dumps(message, separators=(',', ':')).encode('utf-8')
+
+
+class BroadcastServer(object):
+    '''
+    Pushes display state changes to web browsers over WebSocket
+    
+    Runs an asyncio HTTP server on its own thread that serves a small HTML
+    client at /, a websocket at /ws and optionally JSON statistics at /stats.
+    Each change is serialised and framed once and the same bytes are written
+    to every client; clients that fall behind are disconnected rather than
+    buffered.
+    '''
+    
+    def __init__(self, address=('localhost', 8080), stats=None):
+        '''
+        Constructor
+        
+        @param address: (host, port) to listen on, port 0 picks a free port
+        @param stats: callable(), optional, returns the JSON serialisable
+                      statistics served at /stats (called on the server thread)
+        '''
+        self.address = address
+        self._stats = stats
+        self.messages = 0
+        self.clients_dropped = 0
+        self._clients = set()
+        self._state = {}
+        self._snapshot = None
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = None
+    
+    @property
+    def clients(self):
+        '''Number of connected websocket clients'''
+        return len(self._clients)
+    
+    def start(self):
+        '''
+        Start the server thread and wait until it is listening
+        '''
+        self._thread = threading.Thread(target=self._run, name='meeting-timer-broadcast', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._server is None:
+            raise OSError(f'unable to listen on {self.address[0]}:{self.address[1]}')
+    
+    def publish(self, state, changed):
+        '''
+        Display state observer, safe to call from any thread
+        
+        @param state: dict, current display state
+        @param changed: iterable of the changed keys
+        '''
+        frame = websocket_frame(display_message(state, changed))
+        self._loop.call_soon_threadsafe(self._broadcast, frame, dict(state))
+    
+    def close(self):
+        '''Disconnect all clients and stop the server thread'''
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+    
+    def _run(self):
+        '''Server thread'''
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.address[0], self.address[1], backlog=1024))
+            self.address = self._server.sockets[0].getsockname()[:2]
+        except OSError as e:
+            logger.error('Broadcast server failed: %s', e)
+            self._ready.set()
+            self._loop.close()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+    
+    def _broadcast(self, frame, state):
+        '''Write a framed message to all clients (server thread)'''
+        self._state = state
+        self._snapshot = None
+        self.messages += 1
+        for writer in list(self._clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                self._drop(writer)
+            else:
+                writer.write(frame)
+    
+    def _drop(self, writer):
+        '''Disconnect a client'''
+        self._clients.discard(writer)
+        self.clients_dropped += 1
+        writer.transport.abort()
+    
+    async def _handle(self, reader, writer):
+        '''HTTP connection handler'''
+        try:
+            request = await reader.readuntil(b'\r\n\r\n')
+            lines = request.decode('latin-1').split('\r\n')
+            method, path, _ = (lines[0].split(' ') + ['', ''])[:3]
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            
+            if method != 'GET':
+                self._respond(writer, '405 Method Not Allowed', b'')
+            elif path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                await self._websocket(reader, writer, headers['sec-websocket-key'])
+            elif path in ('/', '/index.html'):
+                with open(os.path.join(STATIC_DIR, 'display.html'), 'rb') as f:
+                    self._respond(writer, '200 OK', f.read(), 'text/html; charset=utf-8')
+            elif path == '/stats' and self._stats is not None:
+                self._respond(writer, '200 OK', json.dumps(self._stats()).encode('utf-8'), 'application/json')
+            else:
+                self._respond(writer, '404 Not Found', b'')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, KeyError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+    
+    def _respond(self, writer, status, body, content_type='text/plain'):
+        '''Write a complete HTTP response'''
+        writer.write((f'HTTP/1.1 {status}\r\n'
+                      f'Content-Type: {content_type}\r\n'
+                      f'Content-Length: {len(body)}\r\n'
+                      'Connection: close\r\n\r\n').encode('ascii') + body)
+    
+    async def _websocket(self, reader, writer, key):
+        '''Websocket connection: send the current state then every change'''
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\n'
+                      'Upgrade: websocket\r\n'
+                      'Connection: Upgrade\r\n'
+                      f'Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n').encode('ascii'))
+        if self._snapshot is None and self._state:
+            self._snapshot = websocket_frame(display_message(self._state, self._state.keys()))
+        if self._snapshot is not None:
+            writer.write(self._snapshot)
+        self._clients.add(writer)
+        
+        # clients only send pings and close
+        while True:
+            opcode, payload = await read_websocket_frame(reader)
+            if opcode == OP_CLOSE:
+                writer.write(websocket_frame(payload[:2], OP_CLOSE))
+                return
+            elif opcode == OP_PING:
+                writer.write(websocket_frame(payload, OP_PONG))
+
+## end class BroadcastServer() ##
@@ -0,0 +1,261 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+
+# tk.READABLE, without importing tkinter into the client
+READABLE = 2
+
+# largest request read in one go
+RECV_SIZE = 65536
+
+
+def default_socket_path():
+    '''Per-user control socket path'''
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f'meeting-timer-{os.getuid()}.sock')
+
+
+class ControlStats(object):
+    '''
+    Command counts and the time from receiving a batch of commands to the
+    display state being updated
+    '''
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.commands = 0
+        self.batches = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def record(self, commands, latency):
+        '''Record a batch of commands and its latency in seconds'''
+        self.commands += commands
+        self.batches += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def latency_mean(self):
+        if self.batches == 0:
+            return 0.0
+        return self.latency_sum / self.batches
+
+    def summary(self):
+        '''One line summary for logging'''
+        return (f'commands={self.commands} batches={self.batches} errors={self.errors} '
+                f'latency mean={self.latency_mean*1000:.3f}ms max={self.latency_max*1000:.3f}ms')
+
+## end class ControlStats() ##
+
+
+class ControlServer(object):
+    '''
+    Line based command protocol on a unix socket
+    
+    Each line is a command name followed by space separated arguments and is
+    answered by one line, "ok[ <result>]" or "error <message>".  Commands are
+    read and applied directly on the event loop thread (via file handlers),
+    all complete lines received together are applied as one batch and
+    commit() is called once per batch.
+    '''
+
+    def __init__(self, path, commands, commit, createfilehandler, deletefilehandler, clock=time.perf_counter):
+        '''
+        Constructor
+        
+        @param path: string, unix socket path (replaced if it exists)
+        @param commands: dict of name: callable(*args), return value (if not
+                         None) is sent back with the "ok"
+        @param commit: callable(), applies the batch (i.e. updates the display)
+        @param createfilehandler: callable(file, mask, func), i.e. Tk's
+        @param deletefilehandler: callable(file)
+        '''
+        self.path = path
+        self.commands = commands
+        self.stats = ControlStats()
+        self._commit = commit
+        self._createfilehandler = createfilehandler
+        self._deletefilehandler = deletefilehandler
+        self._clock = clock
+        self._buffers = {}
+
+        # listen
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        os.chmod(path, 0o600)
+        self._server.listen(16)
+        self._server.setblocking(False)
+        self._createfilehandler(self._server, READABLE, self._accept)
+
+    def close(self):
+        '''Disconnect all clients and remove the socket'''
+        for conn in list(self._buffers):
+            self._disconnect(conn)
+        self._deletefilehandler(self._server)
+        self._server.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def execute(self, line):
+        '''
+        Run one command line
+        
+        @return: string, response line (without newline)
+        '''
+        name, *args = line.split()
+        command = self.commands.get(name)
+        if command is None:
+            self.stats.errors += 1
+            return f'error unknown command: {name}'
+        try:
+            result = command(*args)
+        except (TypeError, ValueError, IndexError) as e:
+            self.stats.errors += 1
+            return f'error {name}: {e}'
+        return 'ok' if result is None else f'ok {result}'
+
+    def _accept(self, *_):
+        '''New client (file handler)'''
+        try:
+            conn, _ = self._server.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(False)
+        self._buffers[conn] = b''
+        self._createfilehandler(conn, READABLE, self._read)
+
+    def _read(self, conn, *_):
+        '''Client data (file handler)'''
+        try:
+            data = conn.recv(RECV_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._disconnect(conn)
+            return
+        received = self._clock()
+
+        # apply all complete lines as one batch
+        *lines, self._buffers[conn] = (self._buffers[conn] + data).split(b'\n')
+        lines = [line.decode('utf-8', 'replace').strip() for line in lines]
+        responses = [self.execute(line) for line in lines if line]
+        if not responses:
+            return
+        self._commit()
+        self.stats.record(len(responses), self._clock() - received)
+
+        try:
+            conn.sendall(('\n'.join(responses) + '\n').encode('utf-8'))
+        except OSError:
+            # client not reading its responses
+            self._disconnect(conn)
+
+    def _disconnect(self, conn):
+        '''Drop a client'''
+        del self._buffers[conn]
+        self._deletefilehandler(conn)
+        conn.close()
+
+## end class ControlServer() ##
+
+
+def send_commands(path, lines):
+    '''
+    Send a pipelined batch of commands and wait for all responses
+    
+    @return: list of response lines
+    '''
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(''.join(f'{line}\n' for line in lines).encode('utf-8'))
+        reader = sock.makefile('r', encoding='utf-8')
+        return [reader.readline().rstrip('\n') for _ in lines]
+
+
+def parse_repeat(text):
+    '''
+    Parse the --repeat command line value, a count of at least 1
+    '''
+    try:
+        count = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid count: {text}')
+    if count < 1:
+        raise argparse.ArgumentTypeError(f'count must be at least 1: {text}')
+    return count
+
+
+def client_main(argv):
+    '''
+    Entry point of "meeting-timer ctl"
+    
+    @return: int, exit code
+    '''
+    parser = argparse.ArgumentParser(prog='meeting-timer ctl',
+                                     description='Control a running meeting timer.',
+                                     epilog='commands: start, pause, next, previous, jump ITEM, stop, '
+                                            'add60, minus60, add SECONDS, status, stats, ping')
+    parser.add_argument('commands', nargs='+', metavar='COMMAND',
+                        help='command to send (quote commands with arguments, i.e. "add 30")')
+    parser.add_argument('--socket', default=default_socket_path(),
+                        help='control socket path (default: %(default)s)')
+    parser.add_argument('--repeat', type=parse_repeat, default=1, metavar='N',
+                        help='send the commands N times and report the round trip latency')
+    args = parser.parse_args(argv)
+
+    try:
+        latencies = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            responses = send_commands(args.socket, args.commands)
+            latencies.append(time.perf_counter() - start)
+    except OSError as e:
+        print(f'meeting-timer ctl: {args.socket}: {e}', file=sys.stderr)
+        return 2
+
+    for response in responses:
+        print(response)
+    if args.repeat > 1:
+        latencies.sort()
+        print(f'round trip: mean={sum(latencies)/len(latencies)*1000:.3f}ms '
+              f'p95={latencies[int(len(latencies)*0.95)]*1000:.3f}ms '
+              f'max={latencies[-1]*1000:.3f}ms', file=sys.stderr)
+    return 0 if all(r.startswith('ok') for r in responses) else 1
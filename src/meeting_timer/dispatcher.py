@@ -0,0 +1,120 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import collections
+import logging
+import os
+import threading
+
+# tk.READABLE
+READABLE = 2
+
+# fallback polling interval (ms) where file handlers are not supported
+POLL_MS = 50
+
+logger = logging.getLogger(__name__)
+
+
+class Dispatcher(object):
+    '''
+    Runs calls from background threads on the event loop thread
+    
+    Calls are queued and the event loop is woken through a pipe registered as
+    a file handler; event loops without file handler support (Tk on Windows)
+    poll the queue instead.
+    '''
+
+    def __init__(self, master):
+        '''
+        Constructor
+        
+        @param master: event loop/root window (Tk or HeadlessLoop)
+        '''
+        self._master = master
+        self._calls = collections.deque()
+        self._lock = threading.Lock()
+        self._read_fd = None
+        self._write_fd = None
+        try:
+            read_fd, write_fd = os.pipe()
+            master.tk.createfilehandler(read_fd, READABLE, self._on_wakeup)
+        except (AttributeError, NotImplementedError, OSError):
+            self._poll()
+        else:
+            os.set_blocking(read_fd, False)
+            os.set_blocking(write_fd, False)
+            self._read_fd, self._write_fd = read_fd, write_fd
+
+    def call(self, func, *args):
+        '''
+        Run func(*args) on the event loop thread (safe from any thread)
+        '''
+        with self._lock:
+            wake = not self._calls
+            self._calls.append((func, args))
+        if wake and self._write_fd is not None:
+            try:
+                os.write(self._write_fd, b'\0')
+            except (BlockingIOError, OSError):
+                pass
+
+    def close(self):
+        '''Stop receiving calls'''
+        if self._read_fd is not None:
+            self._master.tk.deletefilehandler(self._read_fd)
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+            self._read_fd = self._write_fd = None
+
+    def run_pending(self):
+        '''
+        Run the queued calls (event loop thread), a call that raises is
+        logged and the rest still run
+        '''
+        while True:
+            with self._lock:
+                if not self._calls:
+                    return
+                func, args = self._calls.popleft()
+            try:
+                func(*args)
+            except Exception:
+                # (the queue must be drained or later calls never wake the loop)
+                logger.exception('Dispatched call %r failed', func)
+
+    def _on_wakeup(self, *_):
+        '''Pipe file handler'''
+        try:
+            os.read(self._read_fd, 512)
+        except BlockingIOError:
+            pass
+        self.run_pending()
+
+    def _poll(self):
+        '''Timer fallback'''
+        self.run_pending()
+        self._master.after(POLL_MS, self._poll)
+
+## end class Dispatcher() ##
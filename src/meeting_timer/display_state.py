@@ -0,0 +1,106 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+from meeting_timer.tracing import traced
+
+DISPLAY_KEYS = ('title', 'time', 'speaker', 'foreground', 'background')
+
+
+class DisplayStateBus(object):
+    '''
+    Collects changes to the display state and dispatches them to observers as
+    a single consolidated update
+    '''
+
+    def __init__(self, schedule=None):
+        '''
+        Constructor
+
+        @param schedule: callable(fn), schedules fn to run once the current
+                         burst of changes is over (i.e. Tk's after_idle).  If
+                         None, changes are only dispatched by flush()
+        '''
+        self._schedule = schedule
+        self._state = {}
+        self._dirty = set()
+        self._pending = False
+        self._observers = []
+        self.dispatch_count = 0
+
+    @property
+    def state(self):
+        '''Copy of the current display state'''
+        return dict(self._state)
+
+    def subscribe(self, callback):
+        '''
+        Register an observer
+
+        @param callback: callable(state, changed), called with a copy of the
+                         display state and a frozenset of the changed keys
+        '''
+        self._observers.append(callback)
+
+    def unsubscribe(self, callback):
+        '''Remove an observer'''
+        self._observers.remove(callback)
+
+    @traced('variable.trace')
+    def set(self, key, value):
+        '''
+        Update a display value; observers are notified on the next dispatch
+        '''
+        if key in self._state and self._state[key] == value:
+            return
+        self._state[key] = value
+        self._dirty.add(key)
+        if not self._pending and self._schedule is not None:
+            self._pending = True
+            self._schedule(self.flush)
+
+    @traced('display.dispatch')
+    def flush(self):
+        '''
+        Dispatch all pending changes to the observers
+        '''
+        self._pending = False
+        if not self._dirty:
+            return
+        changed = frozenset(self._dirty)
+        self._dirty.clear()
+        self.dispatch_count += 1
+        state = dict(self._state)
+        for callback in list(self._observers):
+            callback(state, changed)
+
+    def trace_variables(self, display):
+        '''
+        Feed the bus from the values of a settings display section
+        '''
+        for key in DISPLAY_KEYS:
+            var = display.get(key)
+            self._state[key] = var.get()
+            var.trace('w', lambda *_, key=key, var=var: self.set(key, var.get()))
+
+## end class DisplayStateBus() ##
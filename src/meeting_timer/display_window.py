@@ -23,50 +23,138 @@
 #
 
 import tkinter as tk
+import tkinter.font as tkfont
 from meeting_timer import support
+from meeting_timer.font_fit import FontFitter
+from meeting_timer.tracing import traced
+
+# (family, weight) of the title, time and speaker text
+TEXT_FONTS = (('Arial', 'normal'), ('Courier', 'bold'), ('Arial', 'normal'))
+
+# share of the window height given to the title, time and speaker text
+TEXT_SHARES = (1 / 6, 4 / 6, 1 / 6)
+
+# share of the window width the text may fill
+WIDTH_SHARE = 0.95
+
+# milliseconds without a resize before the text is fitted to the window
+RESIZE_DELAY = 150
 
 
 class DisplayWindow(tk.Frame):
     '''
     Share-screen window
+    
+    The text is sized to fill the window.  While the window is being resized
+    the fonts are left alone; they are fitted once the resizing settles.
     '''
     def __init__(self, master, app, *args, **kwargs):
         super().__init__(master, bg="black", *args, **kwargs)
         self.master = master
         self.app = app
+        if app.tracer is not None:
+            app.tracer.attach(self)
         self.pack(fill=tk.BOTH, expand=tk.YES)
         self.create_widgets()
 #         master.attributes('-zoomed', True)
 
         # watch for colour updates
-        def update_colour(*args):
-            colour = self.app.settings.display.foreground.get()
-            background = self.app.settings.display.background.get()
-            self.set_colours(fg=colour, bg=background)
-        self.app.settings.display.foreground.trace('w', update_colour)
-        self.app.settings.display.background.trace('w', update_colour)
+        def update_colour(state, changed):
+            if 'foreground' in changed or 'background' in changed:
+                self.set_colours(fg=state['foreground'], bg=state['background'])
+        self.app.display_state.subscribe(update_colour)
+        
+        # re-fit the text when the window size settles or the text changes
+        self._resize_pending = None
+        self.bind('<Configure>', self._on_configure)
+        def update_text(state, changed):
+            if 'title' in changed or 'time' in changed or 'speaker' in changed:
+                self._text = [state['title'], state['time'], state['speaker']]
+                if self._resize_pending is None:
+                    self.fit_fonts()
+        self.app.display_state.subscribe(update_text)
+        
+        # time from a display change until Tk has redrawn (when idle)
+        tracer = app.tracer
+        if tracer is not None:
+            def redrawn(state, changed):
+                self.after_idle(tracer.complete, 'display.redraw', tracer.now())
+            self.app.display_state.subscribe(redrawn)
 
     def create_widgets(self):
+        # one font per label, so re-sizing the font re-sizes the label
+        self._fonts = [tkfont.Font(self, family=family, weight=weight, size=size)
+                       for (family, weight), size in zip(TEXT_FONTS, (64, 256, 64))]
+        self._sizes = [None, None, None]
+        self._measure_fonts = {}
+        self._fitter = FontFitter(self._measure)
+        display = self.app.settings.display
+        self._text = [display.title.get(), display.time.get(), display.speaker.get()]
+        
         self.title_label = tk.Label(self, fg="green", bg="black")
-        self.title_label["textvariable"] = self.app.settings.display.title
+        self.title_label["textvariable"] = display.title.variable()
         self.title_label.pack(side=tk.TOP, expand=tk.YES, fill=tk.BOTH)
-        self.title_label.config(font=("Arial", 64))
+        self.title_label.config(font=self._fonts[0])
         
         self.timer_label = tk.Label(self, fg="green", bg="black")
-        self.timer_label["textvariable"] = self.app.settings.display.time
+        self.timer_label["textvariable"] = display.time.variable()
         self.timer_label.pack(side=tk.TOP, expand=tk.YES, fill=tk.BOTH)
-        self.timer_label.config(font=("Courier Bold", 256))
+        self.timer_label.config(font=self._fonts[1])
         
         self.speaker_label = tk.Label(self, fg="green", bg="black")
-        self.speaker_label["textvariable"] = self.app.settings.display.speaker
+        self.speaker_label["textvariable"] = display.speaker.variable()
         self.speaker_label.pack(side=tk.TOP, expand=tk.YES, fill=tk.BOTH)
-        self.speaker_label.config(font=("Arial", 64))
+        self.speaker_label.config(font=self._fonts[2])
+
+    def _measure(self, font, size, text):
+        '''
+        Measure text for the FontFitter
+        
+        @param font: (family, weight)
+        @param size: int, font size in pixels
+        @return: (width, height) in pixels
+        '''
+        measure_font = self._measure_fonts.get(font)
+        if measure_font is None:
+            family, weight = font
+            measure_font = self._measure_fonts[font] = tkfont.Font(self, family=family, weight=weight)
+        # (negative sizes are pixels rather than points)
+        measure_font.configure(size=-size)
+        return measure_font.measure(text), measure_font.metrics('linespace')
+
+    def _on_configure(self, event):
+        '''Wait for the resizing to settle before fitting the text'''
+        if self._resize_pending is not None:
+            self.after_cancel(self._resize_pending)
+        self._resize_pending = self.after(RESIZE_DELAY, self.fit_fonts)
+
+    @traced('display.fit_fonts')
+    def fit_fonts(self):
+        '''
+        Size the text to fill the window
+        '''
+        self._resize_pending = None
+        width, height = self.winfo_width(), self.winfo_height()
+        if width <= 1 or height <= 1:
+            # (not on screen yet)
+            return
+        for i, (font, text, share) in enumerate(zip(TEXT_FONTS, self._text, TEXT_SHARES)):
+            size = self._fitter.fit(font, text, int(width * WIDTH_SHARE), int(height * share))
+            if size != self._sizes[i]:
+                self._sizes[i] = size
+                self._fonts[i].configure(size=-size)
 
+    @traced('display.set_colours')
     def set_colours(self, fg=None, bg=None):
         '''
         Set the display colours
         '''
         if fg is not None:
+            if bg is not None:
+                # translucent text is blended into the background, as on the webcam
+                fg = '#%02x%02x%02x' % support.colour_over(fg, bg)
+            else:
+                fg = support.colour_to_html(fg)
             self.title_label.config(fg=fg)
             self.timer_label.config(fg=fg)
             self.speaker_label.config(fg=fg)
@@ -0,0 +1,299 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import collections.abc
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import select
+import struct
+import threading
+
+from meeting_timer.agenda import AgendaItem
+from meeting_timer.settings import content_hash
+
+logger = logging.getLogger(__name__)
+
+# inotify constants (linux/inotify.h)
+IN_CLOSE_WRITE = 0x08
+IN_MOVED_TO = 0x80
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct('iIII')
+
+# seconds between checks where inotify is not available
+POLL_INTERVAL = 1.0
+
+# seconds to let a burst of writes settle before reading the file
+SETTLE = 0.05
+
+
+class Inotify(object):
+    '''
+    Minimal inotify binding (Linux) watching one directory for files being
+    written or renamed into place
+    '''
+
+    def __init__(self):
+        '''
+        Constructor
+        
+        @raise OSError: if inotify is not available
+        '''
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+            self._rm_watch = libc.inotify_rm_watch
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (AttributeError, TypeError) as e:
+            raise OSError(f'inotify not available: {e}')
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.fd = fd
+        self._wd = None
+
+    def watch(self, directory):
+        '''Watch directory (instead of the previous one)'''
+        if self._wd is not None:
+            self._rm_watch(self.fd, self._wd)
+            self._wd = None
+        wd = self._add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'cannot watch {directory}')
+        self._wd = wd
+
+    def read(self):
+        '''
+        Names of the files changed since the last call (never blocks)
+        '''
+        names = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64*1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                names.add(os.fsdecode(data[offset:offset+length].rstrip(b'\0')))
+                offset += length
+
+    def close(self):
+        '''Release the inotify instance'''
+        os.close(self.fd)
+
+## end class Inotify() ##
+
+
+class FileWatcher(object):
+    '''
+    Calls back, on a background thread, when a file is modified or replaced
+    
+    Uses inotify where available and polls the modification time otherwise.
+    The file to watch is asked for on every check so it can change (i.e.
+    after opening another file).
+    '''
+
+    def __init__(self, get_filename, callback, interval=POLL_INTERVAL, use_inotify=True):
+        '''
+        Constructor
+        
+        @param get_filename: callable(), returns the file to watch (or None)
+        @param callback: callable(filename), called from the watcher thread
+        @param interval: float, seconds between checks without inotify (and
+                         for a changed filename with it)
+        @param use_inotify: bool, False to always poll
+        '''
+        self._get_filename = get_filename
+        self._callback = callback
+        self._interval = interval
+        self._running = True
+        self._inotify = None
+        if use_inotify:
+            try:
+                self._inotify = Inotify()
+            except OSError as e:
+                logger.debug('Polling for file changes (%s)', e)
+        self._wake_read, self._wake_write = os.pipe()
+        self._filename = None
+        self._signature = None
+        self._follow()
+        self._thread = threading.Thread(target=self._run, name='meeting-timer-watcher', daemon=True)
+        self._thread.start()
+
+    @property
+    def polling(self):
+        '''True if inotify is not used'''
+        return self._inotify is None
+
+    def stop(self):
+        '''Stop the background thread'''
+        self._running = False
+        os.write(self._wake_write, b'\0')
+        self._thread.join()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+        if self._inotify is not None:
+            self._inotify.close()
+
+    @staticmethod
+    def _stat(filename):
+        '''What changes when a file is modified or replaced (None if missing)'''
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _follow(self):
+        '''Switch to a new file to watch (taking it as unchanged)'''
+        self._filename = self._get_filename()
+        self._signature = None
+        if self._filename is None:
+            return
+        self._signature = self._stat(self._filename)
+        if self._inotify is not None:
+            try:
+                self._inotify.watch(os.path.dirname(os.path.abspath(self._filename)))
+            except OSError as e:
+                logger.warning('Not watching %s: %s', self._filename, e)
+
+    def _wait(self):
+        '''
+        Wait for the next check
+        
+        @return: bool, True if the file may have changed
+        '''
+        if self._inotify is None:
+            select.select([self._wake_read], [], [], self._interval)
+            return True
+        ready, _, _ = select.select([self._wake_read, self._inotify.fd], [], [], self._interval)
+        if self._inotify.fd not in ready or not self._running:
+            return False
+        
+        # let writes in quick succession finish
+        select.select([self._wake_read], [], [], SETTLE)
+        names = self._inotify.read()
+        return self._filename is not None and os.path.basename(self._filename) in names
+
+    def _run(self):
+        '''Background thread main loop'''
+        while self._running:
+            changed = self._wait()
+            if not self._running:
+                return
+            if self._get_filename() != self._filename:
+                self._follow()
+                continue
+            if not changed or self._filename is None:
+                continue
+            signature = self._stat(self._filename)
+            if signature is not None and signature != self._signature:
+                self._signature = signature
+                try:
+                    self._callback(self._filename)
+                except Exception:
+                    logger.exception('File change callback failed')
+
+## end class FileWatcher() ##
+
+
+class SettingsReloader(object):
+    '''
+    Reloads the settings file when it is changed by another program
+    
+    The file is read and parsed on the watcher thread; only the values that
+    differ from the current settings are then applied on the event loop, so
+    unrelated observers (and re-renders) are not triggered.  Files the
+    application wrote itself are recognised by their hash and not reloaded.
+    '''
+
+    def __init__(self, settings, dispatch, import_agenda=None, interval=POLL_INTERVAL, use_inotify=True):
+        '''
+        Constructor
+        
+        @param settings: Settings, settings to keep up to date with their file
+        @param dispatch: callable(func, *args), runs func on the event loop
+                         (i.e. Dispatcher.call)
+        @param import_agenda: callable(filename), imports a changed agenda file
+        @param interval: float, see FileWatcher
+        @param use_inotify: bool, see FileWatcher
+        '''
+        self._settings = settings
+        self._dispatch = dispatch
+        self._import_agenda = import_agenda
+        self.reloads = 0
+        self._watcher = FileWatcher(lambda: settings.filename, self._on_file_change,
+                                    interval, use_inotify)
+
+    @property
+    def polling(self):
+        '''True if the file is polled rather than watched with inotify'''
+        return self._watcher.polling
+
+    def close(self):
+        '''Stop watching'''
+        self._watcher.stop()
+
+    def _on_file_change(self, filename):
+        '''File watcher callback (watcher thread)'''
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.warning('Cannot reload %s: %s', filename, e)
+            return
+        digest = content_hash(data)
+        if digest == self._settings._file_hash:
+            return
+        
+        # parse (and convert the agenda) here rather than on the event loop
+        try:
+            content = json.loads(data)
+            if not isinstance(content, collections.abc.Mapping):
+                raise ValueError('not a JSON object')
+            # (a file without an agenda leaves the current, i.e. imported, one alone)
+            if 'agenda' in content:
+                content['agenda'] = [AgendaItem.from_dict(item) for item in content['agenda']]
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning('Not reloading %s: %s', filename, e)
+            return
+        self._dispatch(self._apply, filename, digest, content)
+
+    def _apply(self, filename, digest, content):
+        '''Apply the changes (event loop)'''
+        settings = self._settings
+        if settings.filename != filename or settings._file_hash == digest:
+            return
+        settings._file_hash = digest
+        if settings.apply(content) and self._import_agenda is not None:
+            self._import_agenda(settings.agenda_file)
+        self.reloads += 1
+        logger.info('Reloaded %s', filename)
+
+## end class SettingsReloader() ##
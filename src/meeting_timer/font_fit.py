@@ -0,0 +1,100 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import functools
+import re
+
+# font sizes (pixels) searched when fitting text
+MIN_FONT_SIZE = 6
+MAX_FONT_SIZE = 1024
+
+# measurements and fits remembered
+MEASURE_CACHE_SIZE = 1024
+
+DIGIT_RE = re.compile(r'[0-9]')
+
+
+def text_shape(text):
+    '''
+    Text with every digit replaced by 0, so all the values of a countdown
+    (digits are the same width in display fonts) share their measurements
+    '''
+    return DIGIT_RE.sub('0', text)
+
+
+class FontFitter(object):
+    '''
+    Finds the largest font size at which a line of text fits a box
+    
+    Sizes are binary searched and each measurement is cached by font, size
+    and text shape, so re-fitting after a resize or a countdown tick rarely
+    measures any text.
+    '''
+
+    def __init__(self, measure, min_size=MIN_FONT_SIZE, max_size=MAX_FONT_SIZE):
+        '''
+        Constructor
+        
+        @param measure: callable(font, size, text), returns the (width,
+                        height) in pixels of text in font at size
+        @param min_size: int, smallest size returned (even if it does not fit)
+        @param max_size: int, largest size returned
+        '''
+        self._measure = measure
+        self.min_size = min_size
+        self.max_size = max_size
+        self.measurements = 0
+        self.measure = functools.lru_cache(maxsize=MEASURE_CACHE_SIZE)(self._measure_shape)
+        self._fit = functools.lru_cache(maxsize=MEASURE_CACHE_SIZE)(self._fit_shape)
+
+    def fit(self, font, text, width, height):
+        '''
+        Largest size at which text in font fits within width x height pixels
+        
+        @param font: hashable font description, passed to measure
+        @return: int, font size
+        '''
+        return self._fit(font, text_shape(text), width, height)
+
+    def _measure_shape(self, font, size, shape):
+        '''Measure text (cached by the caller)'''
+        self.measurements += 1
+        return self._measure(font, size, shape)
+
+    def _fit_shape(self, font, shape, width, height):
+        '''Binary search of the sizes (cached by the caller)'''
+        low, high = self.min_size, self.max_size
+        best = self.min_size
+        while low <= high:
+            size = (low + high) // 2
+            text_width, text_height = self.measure(font, size, shape)
+            if text_width <= width and text_height <= height:
+                best = size
+                low = size + 1
+            else:
+                high = size - 1
+        return best
+
+## end class FontFitter() ##
@@ -0,0 +1,436 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import collections
+import logging
+import selectors
+import socket
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSink(object):
+    '''
+    Base class for frame bus outputs
+    
+    Each sink writes frames on its own thread from a small bounded queue.  When
+    the queue is full the oldest frame is dropped, so a slow sink never holds
+    up the timer or the other sinks.  Subclasses implement write() and
+    optionally idle(), attached and _close().
+    '''
+    
+    def __init__(self, name, queue_size=2, idle_interval=None):
+        '''
+        Constructor
+        
+        @param name: string, name used in statistics and logs
+        @param queue_size: int, frames to hold before dropping the oldest
+        @param idle_interval: float, seconds between idle() calls while no
+                              frames arrive, None to never call idle()
+        '''
+        self.name = name
+        self.queue_size = queue_size
+        self.idle_interval = idle_interval
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.errors = 0
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = None
+    
+    @property
+    def attached(self):
+        '''True if somebody is consuming the frames'''
+        return True
+    
+    def start(self):
+        '''Start the sink thread'''
+        self._thread = threading.Thread(target=self._run, name=f'meeting-timer-sink-{self.name}', daemon=True)
+        self._thread.start()
+    
+    def push(self, frame, timestamp):
+        '''
+        Queue a frame to be written (never blocks)
+        
+        @param frame: numpy array (height, width, 3) uint8, read-only RGB frame
+        @param timestamp: float, monotonic clock time the frame is shown
+        '''
+        with self._cond:
+            if len(self._queue) >= self.queue_size:
+                self._queue.popleft()
+                self.frames_dropped += 1
+            self._queue.append((frame, timestamp))
+            self._cond.notify()
+    
+    def stats(self):
+        '''Sink counters'''
+        return {
+            'written': self.frames_written,
+            'dropped': self.frames_dropped,
+            'errors': self.errors,
+        }
+    
+    def close(self):
+        '''Write the queued frames, stop the thread and release resources'''
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self._close()
+    
+    def write(self, frame, timestamp):
+        '''Output a frame (sink thread)'''
+        raise NotImplementedError
+    
+    def idle(self):
+        '''Called every idle_interval seconds while no frames arrive (sink thread)'''
+        pass
+    
+    def _close(self):
+        '''Release resources (after the thread stopped)'''
+        pass
+    
+    def _run(self):
+        '''Sink thread main loop'''
+        while True:
+            with self._cond:
+                if not self._queue and self._running:
+                    self._cond.wait(self.idle_interval)
+                if not self._queue:
+                    if not self._running:
+                        return
+                    item = None
+                else:
+                    item = self._queue.popleft()
+            try:
+                if item is None:
+                    self.idle()
+                else:
+                    self.write(*item)
+                    self.frames_written += 1
+            except (OSError, ValueError) as e:
+                self.errors += 1
+                if self.errors == 1:
+                    logger.warning('Frame sink %s failed: %s', self.name, e)
+
+## end class FrameSink() ##
+
+
+class FrameBus(object):
+    '''
+    Distributes each rendered frame to any number of sinks
+    '''
+    
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.sinks = []
+    
+    @property
+    def attached(self):
+        '''True if any sink has a consumer'''
+        return any(sink.attached for sink in self.sinks)
+    
+    def add(self, sink):
+        '''Start a sink and send it frames'''
+        sink.start()
+        self.sinks.append(sink)
+    
+    def remove(self, sink):
+        '''Stop sending frames to a sink and close it'''
+        self.sinks.remove(sink)
+        sink.close()
+    
+    def publish(self, frame, timestamp):
+        '''Queue a frame on every sink'''
+        for sink in self.sinks:
+            sink.push(frame, timestamp)
+    
+    def stats(self):
+        '''Counters of each sink'''
+        return {sink.name: sink.stats() for sink in self.sinks}
+    
+    def close(self):
+        '''Close all sinks'''
+        while self.sinks:
+            self.remove(self.sinks[-1])
+
+## end class FrameBus() ##
+
+
+class LoopbackSink(FrameSink):
+    '''
+    Writes frames to a v4l2loopback webcam
+    '''
+    
+    def __init__(self, path, width, height):
+        '''
+        Constructor
+        
+        @param path: string, device node (i.e. /dev/video0)
+        @param width: int, frame width in pixels
+        @param height: int, frame height in pixels
+        '''
+        from meeting_timer.loopback import LoopbackDevice, ReaderProbe
+        
+        FrameSink.__init__(self, f'loopback:{path}')
+        self.device = LoopbackDevice(path, width, height)
+        self._probe = ReaderProbe(path)
+    
+    @property
+    def attached(self):
+        '''True if another process has the webcam open'''
+        return self._probe.attached
+    
+    def write(self, frame, timestamp):
+        self.device.schedule_frame(frame)
+    
+    def _close(self):
+        self._probe.stop()
+        self.device.close()
+
+## end class LoopbackSink() ##
+
+
+class RecorderSink(FrameSink):
+    '''
+    Base class for constant frame rate recordings
+    
+    The bus only sends frames when the picture changes (plus keep-alives), so
+    each frame is repeated until the next one is due according to the frame
+    timestamps.  Subclasses implement _record() and optionally _finish().
+    '''
+    
+    def __init__(self, path, width, height, fps):
+        '''
+        Constructor
+        
+        @param path: string, file to record to
+        @param width: int, frame width in pixels
+        @param height: int, frame height in pixels
+        @param fps: int, frame rate of the recording
+        '''
+        FrameSink.__init__(self, f'record:{path}', queue_size=8)
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames_recorded = 0
+        self._start = None
+        self._last = None
+    
+    def write(self, frame, timestamp):
+        if self._start is None:
+            self._start = timestamp
+        
+        # the previous frame was displayed until this one
+        due = int((timestamp - self._start) * self.fps)
+        if self._last is not None:
+            for _ in range(due - self.frames_recorded):
+                self._record(self._last)
+                self.frames_recorded += 1
+        self._last = frame
+    
+    def _close(self):
+        if self._last is not None:
+            self._record(self._last)
+            self.frames_recorded += 1
+        self._finish()
+    
+    def _record(self, frame):
+        '''Append an RGB frame to the recording (sink thread)'''
+        raise NotImplementedError
+    
+    def _finish(self):
+        '''Finalise the recording'''
+        pass
+
+## end class RecorderSink() ##
+
+
+class Y4MRecorder(RecorderSink):
+    '''
+    Records to an uncompressed YUV4MPEG2 (.y4m) file, 4:4:4 full range
+    '''
+    
+    def __init__(self, path, width, height, fps):
+        RecorderSink.__init__(self, path, width, height, fps)
+        self._file = open(path, 'wb')
+        self._file.write(f'YUV4MPEG2 W{width} H{height} F{fps}:1 Ip A1:1 C444 XCOLORRANGE=FULL\n'.encode('ascii'))
+        self._planes = np.empty((3, height, width), dtype=np.uint8)
+        self._scratch = np.empty((2, height, width), dtype=np.int32)
+        self._converted = None
+    
+    def _record(self, frame):
+        if frame is not self._converted:
+            # (as the loopback output)
+            from meeting_timer.loopback import YUV_WEIGHTS, rgb_to_yuv_plane
+            out, tmp = self._scratch
+            for plane, weights in enumerate(YUV_WEIGHTS):
+                self._planes[plane] = rgb_to_yuv_plane(out, tmp, frame, weights)
+            self._converted = frame
+        self._file.write(b'FRAME\n')
+        self._file.write(memoryview(self._planes).cast('B'))
+    
+    def _finish(self):
+        self._file.close()
+
+## end class Y4MRecorder() ##
+
+
+class VideoWriterRecorder(RecorderSink):
+    '''
+    Records to a compressed video file with OpenCV
+    '''
+    
+    def __init__(self, path, width, height, fps, fourcc='mp4v'):
+        '''
+        Constructor
+        
+        @param fourcc: string, OpenCV codec code
+        '''
+        import cv2
+        
+        RecorderSink.__init__(self, path, width, height, fps)
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+        if not self._writer.isOpened():
+            raise OSError(f'unable to record to {path} with codec {fourcc}')
+        self._bgr = np.empty((height, width, 3), dtype=np.uint8)
+        self._converted = None
+    
+    def _record(self, frame):
+        if frame is not self._converted:
+            self._bgr[...] = frame[..., ::-1]
+            self._converted = frame
+        self._writer.write(self._bgr)
+    
+    def _finish(self):
+        self._writer.release()
+
+## end class VideoWriterRecorder() ##
+
+
+def create_recorder(path, width, height, fps):
+    '''
+    Recorder for a file name, .y4m files are written uncompressed and
+    everything else is encoded with OpenCV
+    '''
+    if path.lower().endswith('.y4m'):
+        return Y4MRecorder(path, width, height, fps)
+    return VideoWriterRecorder(path, width, height, fps)
+
+
+class StreamSink(FrameSink):
+    '''
+    Serves raw RGB frames over TCP
+    
+    Each client is sent a one line text header ("RGB24 <width>x<height>\\n")
+    followed by width*height*3 bytes per frame, starting with the current
+    frame.  Clients that cannot keep up are disconnected.
+    '''
+    
+    def __init__(self, address, width, height, send_timeout=1.0):
+        '''
+        Constructor
+        
+        @param address: (host, port) to listen on, port 0 picks a free port
+        @param width: int, frame width in pixels
+        @param height: int, frame height in pixels
+        @param send_timeout: float, seconds a client may block a frame
+        '''
+        self.width = width
+        self.height = height
+        self.send_timeout = send_timeout
+        self._server = socket.create_server(address)
+        self._server.setblocking(False)
+        self.address = self._server.getsockname()[:2]
+        FrameSink.__init__(self, f'stream:{self.address[0]}:{self.address[1]}', idle_interval=0.2)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ)
+        self._clients = []
+        self._last = None
+        self._header = f'RGB24 {width}x{height}\n'.encode('ascii')
+    
+    @property
+    def attached(self):
+        '''True if any client is connected'''
+        return bool(self._clients)
+    
+    @property
+    def clients(self):
+        return len(self._clients)
+    
+    def write(self, frame, timestamp):
+        self._accept()
+        self._last = frame
+        self._send(self._clients, frame)
+    
+    def idle(self):
+        self._accept()
+    
+    def _accept(self):
+        '''Accept waiting clients and send them the current frame'''
+        if not self._selector.select(0):
+            return
+        new = []
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except BlockingIOError:
+                break
+            client.settimeout(self.send_timeout)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._clients.append(client)
+            new.append(client)
+        self._send(new, None)
+    
+    def _send(self, clients, frame):
+        '''Send a frame (or just the header if None) to clients'''
+        for client in list(clients):
+            try:
+                if frame is None:
+                    client.sendall(self._header)
+                    if self._last is not None:
+                        client.sendall(memoryview(self._last).cast('B'))
+                else:
+                    client.sendall(memoryview(frame).cast('B'))
+            except OSError:
+                self._clients.remove(client)
+                client.close()
+    
+    def _close(self):
+        for client in self._clients:
+            client.close()
+        self._clients = []
+        self._selector.close()
+        self._server.close()
+
+## end class StreamSink() ##
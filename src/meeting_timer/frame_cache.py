@@ -0,0 +1,327 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import collections
+import logging
+import threading
+
+import numpy as np
+
+from meeting_timer.renderer import FrameRenderer
+
+logger = logging.getLogger(__name__)
+
+
+def frame_key(title, time_text, speaker, foreground, background, resolution):
+    '''
+    Content address of a rendered frame
+    '''
+    return (title, time_text, speaker, foreground, background, tuple(resolution))
+
+
+def mask_key(title, time_text, speaker, resolution):
+    '''
+    Content address of a rendered text coverage mask (any colours)
+    '''
+    return (title, time_text, speaker, tuple(resolution))
+
+
+class FrameSpill(object):
+    '''
+    Fixed-size memory-mapped file holding frames evicted from a FrameCache
+
+    Slots are re-used round-robin so the oldest spilled frame is overwritten
+    first.
+    '''
+
+    def __init__(self, path, max_bytes):
+        '''
+        Constructor
+
+        @param path: string, file to memory-map (created/truncated)
+        @param max_bytes: int, maximum size of the file
+        '''
+        self._path = path
+        self._max_bytes = max_bytes
+        self._slots = None
+        self._shape = None
+        self._index = {}
+        self._owners = []
+        self._next = 0
+
+    def put(self, key, frame):
+        '''Copy a frame into the spill file'''
+        if self._shape != frame.shape:
+            self._open(frame.shape)
+        if self._slots is None or key in self._index:
+            return
+        slot = self._next
+        self._next = (self._next + 1) % len(self._slots)
+        old_key = self._owners[slot]
+        if old_key is not None:
+            del self._index[old_key]
+        self._slots[slot] = frame
+        self._owners[slot] = key
+        self._index[key] = slot
+
+    def pop(self, key):
+        '''Remove a frame from the spill file, returning an in-memory copy'''
+        slot = self._index.pop(key, None)
+        if slot is None:
+            return None
+        self._owners[slot] = None
+        return np.array(self._slots[slot])
+
+    def close(self):
+        '''Release the memory-mapped file'''
+        self._slots = None
+        self._index.clear()
+
+    def _open(self, shape):
+        '''(Re)create the file with slots for frames of the given shape'''
+        frame_bytes = int(np.prod(shape))
+        count = self._max_bytes // frame_bytes
+        self._shape = shape
+        self._index.clear()
+        self._next = 0
+        if count == 0:
+            self._slots = None
+            return
+        self._slots = np.memmap(self._path, dtype=np.uint8, mode='w+', shape=(count,) + tuple(shape))
+        self._owners = [None] * count
+
+## end class FrameSpill() ##
+
+
+class FrameCache(object):
+    '''
+    Thread-safe, content-addressed LRU cache of rendered frames
+
+    Frames are stored read-only and evicted least-recently-used first once
+    the total size exceeds the memory cap.  Evicted frames optionally spill
+    to a memory-mapped file, apart from coloured frames that keep the mask
+    they were coloured from (re-colouring the mask is cheap).
+    '''
+
+    def __init__(self, max_bytes=256*1024*1024, spill_path=None, spill_bytes=1024*1024*1024):
+        '''
+        Constructor
+
+        @param max_bytes: int, memory cap for cached frames
+        @param spill_path: string, optional file to spill evicted frames into
+        @param spill_bytes: int, maximum size of the spill file
+        '''
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._spill = None
+        if spill_path is not None:
+            self._spill = FrameSpill(spill_path, spill_bytes)
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._frames
+
+    def get(self, key):
+        '''
+        Get a cached frame (or None)
+        '''
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+            elif self._spill is not None:
+                frame = self._spill.pop(key)
+                if frame is not None:
+                    self._insert(key, frame)
+            if frame is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return frame
+
+    def put(self, key, frame):
+        '''
+        Add a frame to the cache.  The cache takes ownership of the array.
+        '''
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+            else:
+                self._insert(key, frame)
+        return frame
+
+    def clear(self):
+        '''Remove all frames'''
+        with self._lock:
+            self._frames.clear()
+            self.nbytes = 0
+            if self._spill is not None:
+                self._spill.close()
+
+    def _insert(self, key, frame):
+        '''Insert a frame and evict down to the memory cap (lock held)'''
+        frame.setflags(write=False)
+        self._frames[key] = frame
+        self.nbytes += frame.nbytes
+        while self.nbytes > self.max_bytes and len(self._frames) > 1:
+            old_key, old_frame = self._frames.popitem(last=False)
+            self.nbytes -= old_frame.nbytes
+            if self._spill is not None and getattr(old_frame, 'mask', None) is None:
+                self._spill.put(old_key, old_frame)
+
+## end class FrameCache() ##
+
+
+class PreRenderer(object):
+    '''
+    Renders the text of upcoming frames into a FrameCache on a background
+    thread
+
+    Coverage masks are rendered, which do not depend on the colours, so they
+    stay valid when the colours change (i.e. at the warning time).  Only a
+    window of frames ahead of the one currently on display is rendered so
+    that pre-rendering never evicts the frames about to be used.  A few
+    preload frames (i.e. the start of the next session) are rendered after
+    the window and re-rendered if they were evicted.
+    '''
+
+    def __init__(self, cache, width, height, window=None, scale=None):
+        '''
+        Constructor
+
+        @param cache: FrameCache, cache to fill
+        @param width: int, frame width in pixels
+        @param height: int, frame height in pixels
+        @param window: int, number of frames to render ahead (default: half
+                       of the masks, with their coloured frames, that fit
+                       in the cache)
+        @param scale: int, rasterise text at 1/scale of the frame size
+                      (default: see FrameRenderer)
+        '''
+        self._cache = cache
+        self._resolution = (width, height)
+        self._scale = scale
+        if window is None:
+            window = max(1, cache.max_bytes // (2*width*height*4))
+        self._window = window
+        self._jobs = []
+        self._index = {}
+        self._preload = []
+        self._preloaded = set()
+        self._position = 0
+        self._cursor = 0
+        self._running = True
+        self._suspended = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='meeting-timer-prerender', daemon=True)
+        self._thread.start()
+
+    def schedule(self, states, preload=()):
+        '''
+        Replace the pre-render queue
+
+        @param states: iterable of (title, time, speaker, foreground,
+                       background) in the order they will be displayed
+        @param preload: iterable of states to keep rendered
+        '''
+        with self._cond:
+            self._jobs = [mask_key(*state[:3], self._resolution) for state in states]
+            self._index = {key: i for i, key in enumerate(self._jobs)}
+            self._preload = [mask_key(*state[:3], self._resolution) for state in preload]
+            self._preloaded.clear()
+            self._position = 0
+            self._cursor = 0
+            self._cond.notify()
+
+    def advance(self, key):
+        '''
+        Notify the pre-renderer that a frame is on display
+
+        @param key: mask_key() of the frame
+        '''
+        with self._cond:
+            index = self._index.get(key)
+            if index is not None and index > self._position:
+                self._position = index
+                self._preloaded.clear()
+                self._cond.notify()
+
+    def suspend(self, suspended=True):
+        '''Pause (or resume) pre-rendering'''
+        with self._cond:
+            self._suspended = suspended
+            self._cond.notify()
+
+    def stop(self):
+        '''Stop the background thread'''
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        '''Background thread main loop'''
+        try:
+            renderer = FrameRenderer(*self._resolution, self._scale)
+        except Exception:
+            logger.exception('Unable to pre-render %dx%d frames', *self._resolution)
+            return
+        while True:
+            with self._cond:
+                key = None if self._suspended else self._take()
+                while self._running and key is None:
+                    self._cond.wait()
+                    key = None if self._suspended else self._take()
+                if not self._running:
+                    return
+            if key not in self._cache:
+                try:
+                    self._cache.put(key, renderer.render_mask(*key[:3]).copy())
+                except Exception:
+                    # (the render worker renders it when it is needed)
+                    logger.exception('Pre-rendering frame failed')
+
+    def _take(self):
+        '''Next key to render within the window (lock held)'''
+        self._cursor = max(self._cursor, self._position)
+        if self._cursor < min(len(self._jobs), self._position + self._window):
+            key = self._jobs[self._cursor]
+            self._cursor += 1
+            return key
+
+        # (at most once per displayed frame in case they do not fit the cache)
+        for key in self._preload:
+            if key not in self._preloaded and key not in self._cache:
+                self._preloaded.add(key)
+                return key
+        return None
+
+## end class PreRenderer() ##
@@ -0,0 +1,117 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import time
+
+# timers may fire this early and still count as on time (seconds)
+TOLERANCE = 0.002
+
+# frame rates used when the ones given are not positive
+DEFAULT_FPS = 10
+DEFAULT_KEEPALIVE_FPS = 1
+
+
+class FramePacer(object):
+    '''
+    Adaptive output rate for a frame sink
+
+    A changed frame is sent straight away and repeated at the full frame rate
+    for a short burst (so a consumer that drops a frame still gets it), after
+    which an unchanged frame is only re-sent at the keep-alive rate.
+    '''
+
+    def __init__(self, fps=DEFAULT_FPS, keepalive_fps=DEFAULT_KEEPALIVE_FPS, burst=3, clock=time.monotonic):
+        '''
+        Constructor
+
+        @param fps: float, maximum (burst) frame rate (defaults if not positive)
+        @param keepalive_fps: float, frame rate while the image is static
+                              (defaults if not positive)
+        @param burst: int, frames to send at the full rate after a change
+        @param clock: callable(), monotonic clock in seconds
+        '''
+        self.fps = DEFAULT_FPS
+        self.keepalive_fps = DEFAULT_KEEPALIVE_FPS
+        self.configure(fps, keepalive_fps)
+        self.burst = burst
+        self.frames_sent = 0
+        self._clock = clock
+        self._started = clock()
+        self._version = None
+        self._last_sent = None
+        self._burst_left = 0
+
+    def configure(self, fps=None, keepalive_fps=None):
+        '''Change the frame rates'''
+        if fps is not None and fps > 0:
+            self.fps = fps
+        if keepalive_fps is not None and keepalive_fps > 0:
+            self.keepalive_fps = min(keepalive_fps, self.fps)
+
+    def due(self, version, now=None):
+        '''
+        Check if a frame should be sent now
+
+        @param version: identifies the frame content; a new version starts a burst
+        '''
+        if now is None:
+            now = self._clock()
+        if version != self._version:
+            self._version = version
+            self._burst_left = self.burst
+            return True
+        if self._last_sent is None:
+            return True
+        return now - self._last_sent >= self._interval() - TOLERANCE
+
+    def sent(self, now=None):
+        '''Record that a frame was sent'''
+        if now is None:
+            now = self._clock()
+        self._last_sent = now
+        self.frames_sent += 1
+        if self._burst_left > 0:
+            self._burst_left -= 1
+
+    def next_due(self, now=None):
+        '''Seconds until the next frame is due (if nothing changes)'''
+        if self._last_sent is None:
+            return 0.0
+        if now is None:
+            now = self._clock()
+        return max(0.0, self._last_sent + self._interval() - now)
+
+    def frames_skipped(self, now=None):
+        '''Frames not sent compared with sending at the full rate'''
+        if now is None:
+            now = self._clock()
+        return max(0, int((now - self._started) * self.fps) - self.frames_sent)
+
+    def _interval(self):
+        '''Current time between frames'''
+        if self._burst_left > 0:
+            return 1 / self.fps
+        return 1 / self.keepalive_fps
+
+## end class FramePacer() ##
@@ -0,0 +1,190 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import heapq
+import itertools
+import os
+import selectors
+import signal
+import time
+
+from meeting_timer.application import Application
+
+
+class HeadlessLoop(object):
+    '''
+    Event loop providing the subset of the Tk root window interface used by
+    the application (after, after_idle, after_cancel, mainloop, destroy and
+    tk.createfilehandler) without a display
+    '''
+
+    def __init__(self, clock=time.monotonic):
+        '''
+        Constructor
+        '''
+        self._clock = clock
+        self._timers = []
+        self._idle = []
+        self._callbacks = {}
+        self._ids = itertools.count()
+        self._running = False
+
+        # lets quit() interrupt a blocking select
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+
+    def after(self, ms, func, *args):
+        '''Call func(*args) after ms milliseconds'''
+        timer_id = f'after#{next(self._ids)}'
+        self._callbacks[timer_id] = (func, args)
+        heapq.heappush(self._timers, (self._clock() + ms/1000, timer_id))
+        return timer_id
+
+    def after_idle(self, func, *args):
+        '''Call func(*args) once all pending events are processed'''
+        timer_id = f'idle#{next(self._ids)}'
+        self._callbacks[timer_id] = (func, args)
+        self._idle.append(timer_id)
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        '''Cancel a callback scheduled with after() or after_idle()'''
+        self._callbacks.pop(timer_id, None)
+
+    @property
+    def tk(self):
+        '''Interpreter interface (only file handlers are provided)'''
+        return self
+
+    def createfilehandler(self, file, mask, func):
+        '''Call func(file, mask) whenever file is readable'''
+        self._selector.register(file, selectors.EVENT_READ, (func, mask))
+
+    def deletefilehandler(self, file):
+        '''Remove a file handler'''
+        self._selector.unregister(file)
+
+    def mainloop(self):
+        '''Run callbacks until destroy() is called'''
+        self._running = True
+        while self._running:
+            # wait for the next timer (or a wakeup)
+            timeout = None
+            if self._idle:
+                timeout = 0
+            elif self._timers:
+                timeout = max(0, self._timers[0][0] - self._clock())
+            for key, _ in self._selector.select(timeout):
+                if key.fd == self._wakeup_r:
+                    try:
+                        os.read(self._wakeup_r, 512)
+                    except BlockingIOError:
+                        pass
+                elif self._running and key.fd in self._selector.get_map():
+                    # (not removed by an earlier handler)
+                    func, mask = key.data
+                    func(key.fileobj, mask)
+
+            # run due timers then idle callbacks
+            now = self._clock()
+            while self._timers and self._timers[0][0] <= now and self._running:
+                _, timer_id = heapq.heappop(self._timers)
+                self._call(timer_id)
+            idle, self._idle = self._idle, []
+            for timer_id in idle:
+                self._call(timer_id)
+
+    def destroy(self):
+        '''Stop the event loop (safe to call from a signal handler)'''
+        self._running = False
+        self.wakeup()
+
+    def wakeup(self):
+        '''Interrupt a blocking wait for events (i.e. from a signal handler)'''
+        try:
+            os.write(self._wakeup_w, b'\0')
+        except BlockingIOError:
+            pass
+
+    def _call(self, timer_id):
+        '''Run a scheduled callback if it was not cancelled'''
+        callback = self._callbacks.pop(timer_id, None)
+        if callback is not None:
+            func, args = callback
+            func(*args)
+
+## end class HeadlessLoop() ##
+
+
+class HeadlessApplication(Application):
+    '''
+    Runs the countdown straight to the webcam output, without Tk windows
+    '''
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        Application.__init__(self, HeadlessLoop())
+
+    def main(self, args):
+        '''
+        Main entry point into headless mode
+
+        @param args: argparse.Namespace, parsed command line arguments
+        '''
+        self.create_tracer(args)
+        self.init_state(args.filename)
+        self.create_metrics(args)
+        if args.agenda is not None:
+            self.import_agenda(args.agenda)
+        self.create_output(args)
+        self.create_broadcast(args)
+        self.create_control(args)
+        self.create_autosave(args)
+        self.create_reloader(args)
+
+        # stop cleanly on Ctrl-C / service stop (between callbacks)
+        signal.signal(signal.SIGINT, self._on_signal)
+        signal.signal(signal.SIGTERM, self._on_signal)
+
+        # there is nobody to press start
+        self.start()
+        self.camera.start(self.master)
+        self.master.mainloop()
+
+    def _on_signal(self, signum, frame):
+        '''Quit once the current callback has finished'''
+        self.master.after_idle(self.quit)
+        self.master.wakeup()
+
+    def _on_trace_signal(self, signum, frame):
+        '''Write the trace once the current callback has finished'''
+        Application._on_trace_signal(self, signum, frame)
+        self.master.wakeup()
+
+## end class HeadlessApplication() ##
@@ -0,0 +1,347 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import fcntl
+import os
+import threading
+
+import numpy as np
+
+
+# where video devices are described without opening them
+SYSFS_VIDEO = '/sys/class/video4linux'
+
+# 8-bit fixed-point full-range BT.601 (the JPEG colourspace): the red, green
+# and blue weights (x256) and offset of Y, U and V
+YUV_WEIGHTS = ((77, 150, 29, 0), (-43, -85, 128, 128), (128, -107, -21, 128))
+
+
+def default_device_cache():
+    '''Per-user file remembering the loopback device used last'''
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache_dir, 'meeting_timer', 'loopback-device')
+
+
+def is_loopback(path, sysfs=SYSFS_VIDEO):
+    '''
+    True if a device node is a v4l2loopback device (which, unlike capture
+    cards, has a max_openers attribute in sysfs)
+    '''
+    return os.path.exists(os.path.join(sysfs, os.path.basename(path), 'max_openers'))
+
+
+def find_loopback_devices(sysfs=SYSFS_VIDEO, dev='/dev'):
+    '''
+    Device nodes of the v4l2loopback devices, in device number order
+    
+    Only sysfs is read; no device is opened.
+    '''
+    try:
+        names = os.listdir(sysfs)
+    except OSError:
+        return []
+    names = [name for name in names if name.startswith('video') and name[5:].isdigit()]
+    names.sort(key=lambda name: int(name[5:]))
+    return [os.path.join(dev, name) for name in names if is_loopback(name, sysfs)]
+
+
+def discover_loopback(device=None, cache=None, sysfs=SYSFS_VIDEO, dev='/dev'):
+    '''
+    Choose the loopback device to write to
+    
+    An explicit device is always used.  Otherwise the device used last time
+    is re-used while it is still a loopback device, or the first loopback
+    device found is chosen and remembered.
+    
+    @param device: string, device node given by the user (or None)
+    @param cache: string, file remembering the device between runs (default
+                  default_device_cache(), '' to not remember)
+    @return: string device node, or None if there is no loopback device
+    '''
+    if device is not None:
+        return device
+    if cache is None:
+        cache = default_device_cache()
+    
+    # device used last time
+    if cache:
+        try:
+            with open(cache) as f:
+                cached = f.read().strip()
+        except OSError:
+            cached = None
+        if cached and os.path.exists(cached) and is_loopback(cached, sysfs):
+            return cached
+    
+    devices = find_loopback_devices(sysfs, dev)
+    if not devices:
+        return None
+    if cache:
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            with open(cache, 'w') as f:
+                f.write(devices[0] + '\n')
+        except OSError:
+            pass
+    return devices[0]
+
+
+def count_readers(path, exclude_pid=None):
+    '''
+    Count the other processes that have a device open (by scanning /proc)
+    
+    Processes whose file descriptors cannot be read (other users) are not
+    counted.
+    '''
+    target = os.path.realpath(path)
+    if exclude_pid is None:
+        exclude_pid = os.getpid()
+    readers = 0
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit() or int(pid) == exclude_pid:
+            continue
+        fd_dir = f'/proc/{pid}/fd'
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                if os.readlink(f'{fd_dir}/{fd}') == target:
+                    readers += 1
+                    break
+            except OSError:
+                pass
+    return readers
+
+
+class ReaderProbe(object):
+    '''
+    Periodically checks, on a background thread, whether any other process
+    has a device open
+    '''
+    
+    def __init__(self, path, interval=2.0):
+        '''
+        Constructor
+        
+        @param path: string, device node to watch
+        @param interval: float, seconds between checks
+        '''
+        self.path = path
+        self.interval = interval
+        self.attached = True
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='meeting-timer-probe', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        '''Stop the background thread'''
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        '''Background thread main loop'''
+        while not self._stop.is_set():
+            try:
+                self.attached = count_readers(self.path) > 0
+            except OSError:
+                # no /proc: assume somebody is watching
+                self.attached = True
+            self._stop.wait(self.interval)
+
+## end class ReaderProbe() ##
+
+
+def rgb_to_yuv_plane(out, tmp, rgb, weights):
+    '''
+    Y, U or V of RGB pixels, in place without allocating
+
+    @param out: numpy int32 array, rgb's shape without the colour axis
+    @param tmp: numpy int32 array shaped like out, scratch space
+    @param rgb: numpy array (..., 3) uint8
+    @param weights: (red, green, blue, offset), one of YUV_WEIGHTS
+    @return: out, values 0-255
+    '''
+    red, green, blue, offset = weights
+    np.multiply(rgb[..., 0], red, out=out, dtype=np.int32)
+    np.multiply(rgb[..., 1], green, out=tmp, dtype=np.int32)
+    np.add(out, tmp, out=out)
+    np.multiply(rgb[..., 2], blue, out=tmp, dtype=np.int32)
+    np.add(out, tmp, out=out)
+    # (+128 rounds)
+    np.add(out, 128, out=out)
+    np.right_shift(out, 8, out=out)
+    if offset:
+        # (only chroma can overflow)
+        np.add(out, offset, out=out)
+        np.minimum(out, 255, out=out)
+    return out
+
+
+
+class YUYVConverter(object):
+    '''
+    Converts RGB frames to packed YUYV 4:2:2 in a preallocated buffer
+
+    Uses YUV_WEIGHTS (see rgb_to_yuv_plane), chroma is taken from the even
+    pixel of each pair.
+    '''
+
+    def __init__(self, width, height):
+        '''
+        Constructor
+
+        @param width: int, frame width in pixels (even)
+        @param height: int, frame height in pixels
+        '''
+        self.width = width
+        self.height = height
+        self.buffer = np.zeros((height, width*2), dtype=np.uint8)
+
+        # scratch planes so a conversion allocates nothing
+        self._luma = np.empty((height, width), dtype=np.int32)
+        self._luma_tmp = np.empty((height, width), dtype=np.int32)
+        self._chroma = np.empty((height, width//2), dtype=np.int32)
+        self._chroma_tmp = np.empty((height, width//2), dtype=np.int32)
+        self._palette = None
+        self._tables = None
+
+    def convert(self, rgb):
+        '''
+        Convert an RGB frame, (height, width, 3) uint8
+
+        @return: numpy array (height, width*2) uint8, the converter's buffer
+        '''
+        luma, blue, red = YUV_WEIGHTS
+
+        # Y for every pixel
+        self.buffer[:, 0::2] = rgb_to_yuv_plane(self._luma, self._luma_tmp, rgb, luma)
+
+        # U and V for every pixel pair
+        pairs = rgb[:, 0::2]
+        self.buffer[:, 1::4] = rgb_to_yuv_plane(self._chroma, self._chroma_tmp, pairs, blue)
+        self.buffer[:, 3::4] = rgb_to_yuv_plane(self._chroma, self._chroma_tmp, pairs, red)
+
+        return self.buffer
+
+    def colourise(self, mask, palette):
+        '''
+        Colour a coverage mask, (height, width) uint8, straight into YUYV
+        through a palette (as convert() of the palette-coloured RGB frame)
+
+        @return: numpy array (height, width*2) uint8, the converter's buffer
+        '''
+        if palette is not self._palette:
+            self._tables = self._palette_tables(palette.rgb)
+            self._palette = palette
+        luma, blue, red = self._tables
+        pairs = mask[:, 0::2]
+        np.take(luma, mask, out=self.buffer[:, 0::2], mode='clip')
+        np.take(blue, pairs, out=self.buffer[:, 1::4], mode='clip')
+        np.take(red, pairs, out=self.buffer[:, 3::4], mode='clip')
+        return self.buffer
+
+    @staticmethod
+    def _palette_tables(rgb):
+        '''Y, U and V of each palette entry, (256, 3) uint8 RGB'''
+        out = np.empty(len(rgb), dtype=np.int32)
+        tmp = np.empty(len(rgb), dtype=np.int32)
+        return [rgb_to_yuv_plane(out, tmp, rgb, weights).astype(np.uint8) for weights in YUV_WEIGHTS]
+
+## end class YUYVConverter() ##
+
+
+class LoopbackDevice(object):
+    '''
+    Writes frames to a v4l2loopback video device in YUYV format
+
+    Each distinct frame is converted once; re-sending an unchanged frame
+    writes the already converted buffer straight to the device.  Frames that
+    carry their coverage mask and palette (PalettedFrame) are coloured
+    straight into YUYV rather than converted.
+    '''
+
+    def __init__(self, path, width, height):
+        '''
+        Constructor
+
+        @param path: string, device node (i.e. /dev/video0)
+        @param width: int, frame width in pixels
+        @param height: int, frame height in pixels
+        '''
+        import pyfakewebcam.v4l2 as _v4l2
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.conversions = 0
+        self.writes = 0
+
+        self._fd = os.open(path, os.O_WRONLY | os.O_SYNC)
+        try:
+            fmt = _v4l2.v4l2_format()
+            fmt.type = _v4l2.V4L2_BUF_TYPE_VIDEO_OUTPUT
+            fmt.fmt.pix.pixelformat = _v4l2.V4L2_PIX_FMT_YUYV
+            fmt.fmt.pix.width = width
+            fmt.fmt.pix.height = height
+            fmt.fmt.pix.field = _v4l2.V4L2_FIELD_NONE
+            fmt.fmt.pix.bytesperline = width * 2
+            fmt.fmt.pix.sizeimage = width * height * 2
+            fmt.fmt.pix.colorspace = _v4l2.V4L2_COLORSPACE_JPEG
+            fcntl.ioctl(self._fd, _v4l2.VIDIOC_S_FMT, fmt)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+        self._converter = YUYVConverter(width, height)
+        self._view = memoryview(self._converter.buffer).cast('B')
+        self._frame = None
+
+    def schedule_frame(self, frame):
+        '''
+        Write an RGB frame, (height, width, 3) uint8, to the device
+
+        Frames must not be modified after being passed in; an identical
+        frame object is not converted again.
+        '''
+        if frame is not self._frame:
+            if frame.shape != (self.height, self.width, 3):
+                raise ValueError(f'frame shape {frame.shape} does not match device ({self.height}, {self.width}, 3)')
+            if getattr(frame, 'mask', None) is not None:
+                self._converter.colourise(frame.mask, frame.palette)
+            else:
+                self._converter.convert(frame)
+            self._frame = frame
+            self.conversions += 1
+        os.write(self._fd, self._view)
+        self.writes += 1
+
+    def close(self):
+        '''Close the device'''
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+## end class LoopbackDevice() ##
@@ -24,14 +24,22 @@
 #
 
 import sys
-from meeting_timer.application import Application
+from meeting_timer.application import Application, parse_args
 
 def main(argv=sys.argv):
     '''
     Main entry-point
     '''
-    app = Application()
-    app.main(argv)
+    if argv[1:2] == ['ctl']:
+        from meeting_timer.control import client_main
+        sys.exit(client_main(argv[2:]))
+    args = parse_args(argv[1:])
+    if args.headless:
+        from meeting_timer.headless import HeadlessApplication
+        HeadlessApplication().main(args)
+    else:
+        app = Application()
+        app.main(argv)
 
 # start end-point if file is executed
 if __name__ == '__main__':
@@ -24,6 +24,91 @@
 
 import tkinter as tk
 
+from meeting_timer.timer_engine import seconds_to_display
+
+
+class AgendaView(tk.LabelFrame):
+    '''
+    Scrollable list of agenda items
+    
+    Only a fixed number of rows is created; scrolling changes which agenda
+    items they show, so the agenda can be any length.
+    '''
+    
+    def __init__(self, master, app, rows=6, *args, **kwargs):
+        super().__init__(master, text="Agenda", *args, **kwargs)
+        
+        self.app = app
+        self.agenda = app.settings.agenda
+        self.offset = 0
+        
+        self.rows = []
+        for row in range(rows):
+            label = tk.Label(self, anchor=tk.W, font="Arial 9")
+            label.grid(column=0, row=row, sticky=tk.EW)
+            label.bind("<Button-1>", lambda event, row=row: self.select(row))
+            self.rows.append(label)
+        self.scrollbar = tk.Scrollbar(self, command=self.scroll)
+        self.scrollbar.grid(column=1, row=0, rowspan=rows, sticky=tk.NS)
+        self.columnconfigure(0, weight=1)
+        
+        # the wheel scrolls over the rows too (X11 sends it as buttons 4 and 5)
+        for widget in [self, self.scrollbar] + self.rows:
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                widget.bind(sequence, self.wheel)
+        
+        self.agenda.subscribe(self.follow)
+        self.follow(self.agenda)
+    
+    def follow(self, agenda):
+        '''Scroll to the item on display (agenda observer)'''
+        if agenda.progress is None:
+            self.config(text="Agenda")
+        else:
+            self.config(text=f"Agenda (loading {agenda.progress:.0%})")
+        self.offset = max(0, agenda.index)
+        self.refresh()
+    
+    def scroll(self, action, amount, unit=None):
+        '''Scrollbar command'''
+        if action == 'moveto':
+            offset = int(float(amount) * len(self.agenda))
+        elif unit == 'pages':
+            offset = self.offset + int(amount) * len(self.rows)
+        else:
+            offset = self.offset + int(amount)
+        self.offset = max(0, min(offset, len(self.agenda) - len(self.rows)))
+        self.refresh()
+    
+    def wheel(self, event):
+        '''Mouse wheel handler'''
+        up = event.num == 4 or (event.num != 5 and event.delta > 0)
+        self.scroll('scroll', -1 if up else 1, 'units')
+        return "break"
+    
+    def select(self, row):
+        '''Jump to the agenda item shown in a row'''
+        index = self.offset + row
+        if index < len(self.agenda):
+            self.app.jump(index)
+    
+    def refresh(self):
+        '''Show the items from offset'''
+        items = self.agenda.window(self.offset, len(self.rows))
+        for row, label in enumerate(self.rows):
+            index = self.offset + row
+            if row < len(items):
+                item = items[row]
+                text = f'{index + 1}. {item.title} - {item.speaker} ({seconds_to_display(item.duration)})'
+            else:
+                text = ''
+            label.config(text=text, relief=tk.SUNKEN if index == self.agenda.index else tk.FLAT)
+        
+        total = max(1, len(self.agenda))
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(self.rows)) / total))
+
+## end class AgendaView() ##
+
 
 class MainWindow(tk.Frame):
     '''
@@ -49,19 +134,19 @@ class MainWindow(tk.Frame):
         self.current_title_label = tk.Label(self.current_frame, text="Title:", font="Arial 10 bold", anchor=tk.W)
         self.current_title_label.pack(side="top", expand=True, fill="x")
         self.current_title_entry = tk.Entry(self.current_frame)
-        self.current_title_entry["textvariable"] = self.app.settings.display.title
+        self.current_title_entry["textvariable"] = self.app.settings.display.title.variable()
         self.current_title_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.current_time_label = tk.Label(self.current_frame, text="Time:", font="Arial 10 bold", anchor=tk.W)
         self.current_time_label.pack(side="top", expand=True, fill="x")
         self.current_time_entry = tk.Entry(self.current_frame)
-        self.current_time_entry["textvariable"] = self.app.settings.display.time
+        self.current_time_entry["textvariable"] = self.app.settings.display.time.variable()
         self.current_time_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.current_speaker_label = tk.Label(self.current_frame, text="Speaker:", font="Arial 10 bold", anchor=tk.W)
         self.current_speaker_label.pack(side="top", expand=True, fill="x")
         self.current_speaker_entry = tk.Entry(self.current_frame)
-        self.current_speaker_entry["textvariable"] = self.app.settings.display.speaker
+        self.current_speaker_entry["textvariable"] = self.app.settings.display.speaker.variable()
         self.current_speaker_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.current_frame.pack(padx=2, pady=2, expand=True, fill=tk.X)
@@ -98,31 +183,35 @@ class MainWindow(tk.Frame):
         
         self.control_frame.pack(padx=2, pady=2, expand=True, fill=tk.X)
         
+        ## Agenda area ##
+        self.agenda_view = AgendaView(self, app=self.app)
+        self.agenda_view.pack(padx=2, pady=2, expand=True, fill=tk.X)
+        
         ## Up next area ##
         self.next_frame = tk.LabelFrame(self, text="Up-next")
         
         self.next_title_label = tk.Label(self.next_frame, text="Title:", font="Arial 10 bold", anchor=tk.W)
         self.next_title_label.pack(side="top", expand=True, fill="x")
         self.next_title_entry = tk.Entry(self.next_frame)
-        self.next_title_entry["textvariable"] = self.app.settings.next.title
+        self.next_title_entry["textvariable"] = self.app.settings.next.title.variable()
         self.next_title_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.next_time_label = tk.Label(self.next_frame, text="Speaking time (total sec):", font="Arial 10 bold", anchor=tk.W)
         self.next_time_label.pack(side="top", expand=True, fill="x")
         self.next_time_entry = tk.Entry(self.next_frame)
-        self.next_time_entry["textvariable"] = self.app.settings.next.duration
+        self.next_time_entry["textvariable"] = self.app.settings.next.duration.variable()
         self.next_time_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.next_warn_label = tk.Label(self.next_frame, text="Warning time (last X sec):", font="Arial 10 bold", anchor=tk.W)
         self.next_warn_label.pack(side="top", expand=True, fill="x")
         self.next_warn_entry = tk.Entry(self.next_frame)
-        self.next_warn_entry["textvariable"] = self.app.settings.next.warning
+        self.next_warn_entry["textvariable"] = self.app.settings.next.warning.variable()
         self.next_warn_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.next_speaker_label = tk.Label(self.next_frame, text="Speaker:", font="Arial 10 bold", anchor=tk.W)
         self.next_speaker_label.pack(side="top", expand=True, fill="x")
         self.next_speaker_entry = tk.Entry(self.next_frame)
-        self.next_speaker_entry["textvariable"] = self.app.settings.next.speaker
+        self.next_speaker_entry["textvariable"] = self.app.settings.next.speaker.variable()
         self.next_speaker_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.next_frame.pack(padx=2, pady=2, expand=True, fill=tk.X)
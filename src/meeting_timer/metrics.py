@@ -0,0 +1,167 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import bisect
+import contextlib
+import time
+
+# histogram bucket upper bounds (seconds), 100us to 50s in 1-2-5 steps
+BUCKETS = tuple(round(m * 10.0**e, 6) for e in range(-4, 2) for m in (1, 2, 5))
+
+# percentiles reported in snapshots and log lines
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram(object):
+    '''
+    Distribution of durations (seconds) in fixed buckets
+    
+    Recording is a bisect and a few additions and takes no lock; values are
+    recorded from a single thread and read (approximately) from any.
+    '''
+
+    def __init__(self, bounds=BUCKETS):
+        '''
+        Constructor
+        
+        @param bounds: sorted tuple of bucket upper bounds, values above the
+                       last bound are counted in an overflow bucket
+        '''
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        '''Record a duration in seconds'''
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        if self.count == 0:
+            return 0.0
+        return self.sum / self.count
+
+    def percentile(self, fraction):
+        '''
+        Upper bound of the bucket holding the given fraction of values (the
+        maximum if it is in the overflow bucket, or smaller)
+        '''
+        if self.count == 0:
+            return 0.0
+        rank = fraction * self.count
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            if total >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        '''JSON serialisable summary, with the non-empty buckets'''
+        counts = list(self.counts)
+        buckets = {str(bound): count for bound, count in zip(self.bounds, counts) if count}
+        if counts[-1]:
+            buckets['+Inf'] = counts[-1]
+        result = {'count': self.count, 'mean': self.mean, 'max': self.max, 'buckets': buckets}
+        for fraction in PERCENTILES:
+            result[f'p{fraction*100:g}'] = self.percentile(fraction)
+        return result
+
+    def summary(self):
+        '''Short report of the distribution'''
+        return (f'n={self.count} mean={self.mean*1000:.2f}ms p95={self.percentile(0.95)*1000:.2f}ms '
+                f'max={self.max*1000:.2f}ms')
+
+## end class Histogram() ##
+
+
+class Metrics(object):
+    '''
+    Named duration histograms and counters of the running timer
+    
+    Components take an optional Metrics object and only measure when they
+    have one, so a timer running without metrics pays a single None check
+    per instrumented call.
+    '''
+
+    def __init__(self, clock=time.monotonic):
+        '''
+        Constructor
+        
+        @param clock: callable(), monotonic clock in seconds
+        '''
+        self._clock = clock
+        self.started = clock()
+        self.histograms = {}
+        self.counters = {}
+
+    def histogram(self, name):
+        '''The histogram called name (created on first use)'''
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def record(self, name, seconds):
+        '''Record a duration'''
+        self.histogram(name).record(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        '''Context manager recording the duration of its block'''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        '''Add to a counter'''
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        '''
+        JSON serialisable copy of all the metrics
+        '''
+        return {
+            'uptime': self._clock() - self.started,
+            'counters': dict(self.counters),
+            'histograms': {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())},
+        }
+
+    def summary(self):
+        '''One line report of the busiest figures'''
+        parts = [f'{name} p95={histogram.percentile(0.95)*1000:.2f}ms max={histogram.max*1000:.2f}ms'
+                 for name, histogram in sorted(self.histograms.items()) if histogram.count]
+        parts.extend(f'{name}={value}' for name, value in sorted(self.counters.items()))
+        return ', '.join(parts) or 'nothing recorded'
+
+## end class Metrics() ##
@@ -0,0 +1,200 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import logging
+import threading
+import time
+
+from meeting_timer.frame_cache import frame_key, mask_key
+from meeting_timer.renderer import FrameRenderer, colourise, get_palette
+
+logger = logging.getLogger(__name__)
+
+
+class FrameBuffer(object):
+    '''
+    Double buffer between the render worker and the frame consumer
+
+    The worker publishes finished (read-only) frames into the back buffer and
+    the consumer swaps it to the front; neither side ever waits on a render.
+    '''
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self._front = None
+        self._back = None
+        self._fresh = False
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def publish(self, frame):
+        '''Make a finished frame available (render side)'''
+        with self._lock:
+            self._back = frame
+            self._fresh = True
+
+    def swap(self):
+        '''
+        Get the latest frame (consumer side)
+
+        @return: the newest published frame, or None if nothing published yet
+        '''
+        with self._lock:
+            if self._fresh:
+                self._front, self._back = self._back, self._front
+                self._fresh = False
+                self.version += 1
+            return self._front
+
+## end class FrameBuffer() ##
+
+
+class RenderWorker(object):
+    '''
+    Renders display state snapshots on a background thread
+
+    Only the newest snapshot is rendered; snapshots submitted while a render
+    is in progress replace each other.  The text is rendered (or found
+    pre-rendered) as a coverage mask and then coloured, so a colour change
+    only costs a table lookup over the frame.  While only the time changes
+    the renderer updates its frame incrementally instead.  Rendering can be
+    suspended (i.e. while nobody is watching) and picks up the newest
+    snapshot when resumed.
+    '''
+
+    def __init__(self, cache, width, height, buffer, prerenderer=None, metrics=None, tracer=None, scale=None):
+        '''
+        Constructor
+
+        @param cache: FrameCache, cache to look frames up in and add them to
+        @param width: int, frame width in pixels
+        @param height: int, frame height in pixels
+        @param buffer: FrameBuffer, where finished frames are published
+        @param prerenderer: PreRenderer, optional, told which frame is on display
+        @param metrics: Metrics, optional, records the render durations
+        @param tracer: Tracer, optional, records each render as a span
+        @param scale: int, rasterise text at 1/scale of the frame size
+                      (default: see FrameRenderer)
+        '''
+        self._cache = cache
+        self._resolution = (width, height)
+        self._scale = scale
+        self._buffer = buffer
+        self._prerenderer = prerenderer
+        self._metrics = metrics
+        self._tracer = tracer
+        self._pending = None
+        self._running = True
+        self._suspended = False
+        self._cond = threading.Condition()
+        self.render_count = 0
+        self.colour_count = 0
+        self.submitted = 0
+        self.completed = 0
+        self._thread = threading.Thread(target=self._run, name='meeting-timer-render', daemon=True)
+        self._thread.start()
+
+    def submit(self, state):
+        '''
+        Queue a display state snapshot for rendering (never blocks on a render)
+        '''
+        with self._cond:
+            self.submitted += 1
+            self._pending = (self.submitted, state)
+            self._cond.notify()
+
+    @property
+    def busy(self):
+        '''True until the newest submitted snapshot is published'''
+        return self.completed < self.submitted
+
+    def suspend(self, suspended=True):
+        '''Pause (or resume) rendering'''
+        with self._cond:
+            self._suspended = suspended
+            self._cond.notify()
+
+    def stop(self):
+        '''Stop the background thread'''
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        '''Background thread main loop'''
+        try:
+            renderer = FrameRenderer(*self._resolution, self._scale)
+        except Exception:
+            logger.exception('Unable to render %dx%d frames', *self._resolution)
+            return
+        while True:
+            with self._cond:
+                while self._running and (self._pending is None or self._suspended):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                (seq, state), self._pending = self._pending, None
+
+            try:
+                self._render(renderer, state)
+            except Exception:
+                # (keep rendering the next snapshots)
+                logger.exception('Rendering frame failed')
+            self.completed = seq
+
+    def _render(self, renderer, state):
+        '''Render (or find) and publish the frame of a snapshot'''
+        start = time.perf_counter()
+        key = frame_key(state['title'], state['time'], state['speaker'],
+                        state['foreground'], state['background'],
+                        self._resolution)
+        text_key = mask_key(state['title'], state['time'], state['speaker'], self._resolution)
+        frame = self._cache.get(key)
+        if frame is None:
+            palette = get_palette(state['foreground'], state['background'])
+            mask = self._cache.get(text_key)
+            if mask is None or (state['title'], state['speaker']) == (renderer.title, renderer.speaker):
+                # (the renderer only re-draws and re-colours the text
+                # that changed, cheaper than colouring a whole mask)
+                coloured = renderer.render(*key[:5])
+                if mask is None:
+                    mask = self._cache.put(text_key, renderer.mask.copy())
+                    self.render_count += 1
+                frame = colourise(mask, palette, coloured)
+            else:
+                frame = colourise(mask, palette)
+                self.colour_count += 1
+            frame = self._cache.put(key, frame)
+        if self._prerenderer is not None:
+            self._prerenderer.advance(text_key)
+        self._buffer.publish(frame)
+        if self._metrics is not None:
+            self._metrics.record('render.duration', time.perf_counter() - start)
+        if self._tracer is not None:
+            self._tracer.complete('webcam.render', start)
+
+## end class RenderWorker() ##
@@ -0,0 +1,394 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import functools
+
+import numpy as np
+from PIL import Image, ImageFont, ImageDraw
+
+from meeting_timer import support
+
+TEXT_FONT = "arial.ttf"
+TIME_FONT = "FreeMonoBold.otf"
+TIME_GLYPHS = '0123456789:'
+
+# widest frame that text is rasterised at full size for, wider frames are
+# rasterised at an integer fraction of their size and scaled up
+BASE_WIDTH = 1280
+
+# smallest frame and (rasterised) layout that text can be drawn in
+MIN_WIDTH = 32
+MIN_HEIGHT = 16
+
+_font_cache = {}
+
+def load_font(name, size):
+    '''
+    Load a truetype font (cached), falling back to the PIL default font
+    '''
+    key = (name, size)
+    font = _font_cache.get(key)
+    if font is None:
+        try:
+            font = ImageFont.truetype(name, size)
+        except OSError:
+            try:
+                font = ImageFont.load_default(size)
+            except TypeError:
+                # Pillow < 10.1 has no scalable default font
+                font = ImageFont.load_default()
+        _font_cache[key] = font
+    return font
+
+
+def render_scale(width, base_width=BASE_WIDTH):
+    '''
+    Integer factor to rasterise a frame width at a fraction of (1 up to
+    twice base_width)
+    '''
+    return max(1, width // base_width)
+
+
+def clamp_size(width, height, scale=0):
+    '''
+    Frame size and scale (i.e. from the settings) limited to ones that can
+    be rendered: at least MIN_WIDTH x MIN_HEIGHT, rasterised at least
+    MIN_HEIGHT high
+    
+    @param scale: int, rasterise at 1/scale of the size (0: automatic)
+    @return: (width, height, scale), scale is None for automatic
+    '''
+    width = max(MIN_WIDTH, width)
+    height = max(MIN_HEIGHT, height)
+    return width, height, min(max(0, scale), height // MIN_HEIGHT) or None
+
+
+def scale_into(out, image, scale):
+    '''
+    Scale a coverage mask or frame up by an integer factor (nearest
+    neighbour)
+    
+    @param out: numpy array (height*scale, width*scale[, 3]) uint8, written
+                in place
+    @param image: numpy array (height, width[, 3]) uint8
+    '''
+    if scale == 1:
+        out[...] = image
+        return
+    # widen each row once then copy it to scale rows of out (much faster than
+    # broadcasting each pixel over a block)
+    rows = np.lib.stride_tricks.as_strided(out, (image.shape[0], scale) + out.shape[1:],
+                                           (out.strides[0]*scale,) + out.strides)
+    rows[...] = np.repeat(image, scale, axis=1)[:, None]
+
+
+class Palette(object):
+    '''
+    The colour of each of the 256 text coverage values, for a foreground
+    colour drawn over a background colour
+    
+    Frames are coloured by looking their coverage mask up in the table, so a
+    colour change never lays out or rasterises text again.
+    '''
+
+    def __init__(self, foreground, background):
+        '''
+        Constructor
+
+        @param foreground: (red, green, blue) ints 0-255, opaque
+        @param background: (red, green, blue) ints 0-255
+        '''
+        self.foreground = tuple(foreground)
+        self.background = tuple(background)
+        coverage = np.arange(256, dtype=np.int32)[:, None]
+        fg = np.array(foreground, dtype=np.int32)
+        bg = np.array(background, dtype=np.int32)
+        self.rgb = (bg + (coverage * (fg - bg) + 127) // 255).astype(np.uint8)
+        self.rgb.setflags(write=False)
+        self._pixels = self.rgb.view('V3').reshape(256)
+
+    def colourise(self, mask, out=None):
+        '''
+        Colour a coverage mask, (height, width) uint8
+
+        @param out: numpy array (height, width, 3) uint8 to colour into
+                    (pixels contiguous), default is a new array
+        @return: numpy array (height, width, 3) uint8
+        '''
+        if out is None:
+            out = np.empty(mask.shape + (3,), dtype=np.uint8)
+        # (whole pixels at a time, which is much faster than per channel)
+        np.take(self._pixels, mask, out=out.view('V3')[..., 0], mode='clip')
+        return out
+
+## end class Palette() ##
+
+
+@functools.lru_cache(maxsize=64)
+def get_palette(foreground, background):
+    '''
+    Palette (cached) of a foreground colour, which may be translucent, drawn
+    over a background colour
+    '''
+    return Palette(support.colour_over(foreground, background), support.colour_to_tuple(background))
+
+
+class PalettedFrame(np.ndarray):
+    '''
+    RGB frame, (height, width, 3) uint8, that remembers the coverage mask and
+    palette it was coloured from so outputs in other pixel formats (i.e.
+    YUYV) can colour the mask directly
+    '''
+
+    def __array_finalize__(self, obj):
+        # views and results of operations on the frame are plain RGB
+        self.mask = None
+        self.palette = None
+
+## end class PalettedFrame() ##
+
+
+def colourise(mask, palette, coloured=None):
+    '''
+    Colour a (read-only) coverage mask into a new frame
+
+    @param coloured: numpy array, optional, the mask already coloured with
+                     the palette (copied, which is cheaper than colouring)
+    @return: PalettedFrame
+    '''
+    frame = np.empty(mask.shape + (3,), dtype=np.uint8).view(PalettedFrame)
+    if coloured is not None:
+        frame[...] = coloured
+    else:
+        palette.colourise(mask, frame)
+    frame.mask = mask
+    frame.palette = palette
+    return frame
+
+
+class FrameRenderer(object):
+    '''
+    Renders timer frames into a persistent frame buffer
+
+    Text is drawn as an 8-bit coverage mask and coloured through a Palette,
+    so a colour change is a single table lookup over the frame.  Fonts are
+    loaded once and the time font's digit glyphs are rasterised into an atlas
+    up-front so a countdown tick only copies the changed character cells.
+    Large frames (i.e. 4K) are laid out and rasterised at 1/scale of their
+    size and only the changed areas are scaled up into the frame.
+    '''
+
+    def __init__(self, width=1280, height=720, scale=None):
+        '''
+        Constructor
+
+        @param width: int, frame width in pixels
+        @param height: int, frame height in pixels
+        @param scale: int, rasterise text at 1/scale of the frame size
+                      (default/0: render_scale() of the width)
+        '''
+        width, height, scale = clamp_size(width, height, scale or 0)
+        self.width = width
+        self.height = height
+        self.scale = min(scale or render_scale(width), height // MIN_HEIGHT)
+        # (layout is in rasterised pixels, a remainder of less than scale
+        # pixels is left as background on the right and bottom)
+        self._layout_width = width // self.scale
+        self._layout_height = height // self.scale
+        height = self._layout_height
+
+        # fonts
+        self._text_font = load_font(TEXT_FONT, int(height/7))
+        self._time_font = load_font(TIME_FONT, int(height/2))
+
+        # layout
+        ascent, descent = self._text_font.getmetrics()
+        self._text_height = ascent + descent
+        self._title_y = 5
+        self._speaker_y = height - 15 - int(height/7)
+        self._build_atlas()
+        self._time_y = int((height - self._cell_height)/2) - 15
+
+        # coverage mask and frame buffer and what is currently drawn into them
+        self._mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        self._frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        if self.scale == 1:
+            self._layout_mask = self._mask
+            self._layout_frame = self._frame
+        else:
+            self._layout_mask = np.zeros((self._layout_height, self._layout_width), dtype=np.uint8)
+            self._layout_frame = np.zeros((self._layout_height, self._layout_width, 3), dtype=np.uint8)
+        self._palette = None
+        self._changed = []
+        self._dirty = []
+        self._title = None
+        self._time = None
+        self._speaker = None
+        self._time_from_atlas = False
+
+    def render(self, title, time_text, speaker, foreground, background):
+        '''
+        Update the frame buffer to show the given text and colours
+
+        @return: numpy array (height, width, 3) of the frame.  NOTE: this is
+                 the renderer's own buffer and is modified by the next call
+        '''
+        self.render_mask(title, time_text, speaker)
+
+        # a colour change re-colours the whole frame, otherwise only the text
+        # that changed
+        palette = get_palette(foreground, background)
+        scale = self.scale
+        if palette is not self._palette:
+            self._palette = palette
+            self._dirty = [(0, self._layout_height, 0, self._layout_width)]
+            # (and the remainder the layout does not cover)
+            self._frame[self._layout_height*scale:] = palette.rgb[0]
+            self._frame[:, self._layout_width*scale:] = palette.rgb[0]
+        for top, bottom, left, right in self._dirty:
+            palette.colourise(self._layout_mask[top:bottom, left:right], self._layout_frame[top:bottom, left:right])
+            if scale > 1:
+                scale_into(self._frame[top*scale:bottom*scale, left*scale:right*scale],
+                           self._layout_frame[top:bottom, left:right], scale)
+        self._dirty.clear()
+
+        return self._frame
+
+    @property
+    def mask(self):
+        '''The coverage mask of the last render (the renderer's own buffer)'''
+        return self._mask
+
+    @property
+    def title(self):
+        '''Title text currently drawn'''
+        return self._title
+
+    @property
+    def speaker(self):
+        '''Speaker text currently drawn'''
+        return self._speaker
+
+    def render_mask(self, title, time_text, speaker):
+        '''
+        Update the coverage mask to show the given text
+
+        @return: numpy array (height, width) uint8 of text coverage.  NOTE:
+                 this is the renderer's own buffer and is modified by the
+                 next call
+        '''
+        if title != self._title:
+            self._draw_text(self._title_y, self._text_height, title, self._text_font)
+            self._title = title
+
+        if time_text != self._time:
+            self._draw_time(time_text)
+            self._time = time_text
+
+        if speaker != self._speaker:
+            self._draw_text(self._speaker_y, self._text_height, speaker, self._text_font)
+            self._speaker = speaker
+
+        scale = self.scale
+        for top, bottom, left, right in self._changed:
+            scale_into(self._mask[top*scale:bottom*scale, left*scale:right*scale],
+                       self._layout_mask[top:bottom, left:right], scale)
+        self._changed.clear()
+
+        return self._mask
+
+    def _build_atlas(self):
+        '''Rasterise the time glyphs into fixed-size coverage cells'''
+        font = self._time_font
+        ascent, descent = font.getmetrics()
+        self._cell_height = ascent + descent
+        self._cell_width = int(round(max(font.getlength(c) for c in TIME_GLYPHS)))
+
+        self._atlas = np.zeros((len(TIME_GLYPHS), self._cell_height, self._cell_width), dtype=np.uint8)
+        self._glyph_index = {}
+        for i, glyph in enumerate(TIME_GLYPHS):
+            img = Image.new('L', (self._cell_width, self._cell_height), 0)
+            x = (self._cell_width - font.getlength(glyph))/2
+            ImageDraw.Draw(img).text((x, 0), glyph, font=font, fill=255)
+            self._atlas[i] = np.asarray(img)
+            self._glyph_index[glyph] = i
+
+    def _draw_time(self, text):
+        '''Draw time text, copying only the changed atlas cells if possible'''
+        if not text or any(c not in self._glyph_index for c in text):
+            self._draw_text(self._time_y, self._cell_height, text, self._time_font)
+            self._time_from_atlas = False
+            return
+
+        x0 = int((self._layout_width - len(text)*self._cell_width)/2)
+        previous = self._time
+        if not self._time_from_atlas or previous is None or len(previous) != len(text):
+            self._clear(self._time_y, self._cell_height)
+            previous = None
+
+        for i, glyph in enumerate(text):
+            if previous is None or previous[i] != glyph:
+                self._paint(self._time_y, x0 + i*self._cell_width, self._atlas[self._glyph_index[glyph]])
+        self._time_from_atlas = True
+
+    def _draw_text(self, y, height, text, font):
+        '''Draw a centred line of text, replacing the band it occupies'''
+        self._clear(y, height)
+        if text:
+            img = Image.new('L', (self._layout_width, height), 0)
+            x = (self._layout_width - font.getlength(text))/2
+            ImageDraw.Draw(img).text((x, 0), text, font=font, fill=255)
+            self._paint(y, 0, np.asarray(img))
+
+    def _clear(self, y, height):
+        '''Clear a horizontal band of text'''
+        top, bottom = max(y, 0), min(max(y + height, 0), self._layout_height)
+        self._layout_mask[top:bottom] = 0
+        self._touch(top, bottom, 0, self._layout_width)
+
+    def _paint(self, y, x, mask):
+        '''Copy text coverage into the mask'''
+        # clip to frame
+        top, left = max(y, 0), max(x, 0)
+        bottom = min(y + mask.shape[0], self._layout_height)
+        right = min(x + mask.shape[1], self._layout_width)
+        if bottom <= top or right <= left:
+            return
+        mask = mask[top-y:bottom-y, left-x:right-x]
+
+        self._layout_mask[top:bottom, left:right] = mask
+        self._touch(top, bottom, left, right)
+
+    def _touch(self, top, bottom, left, right):
+        '''
+        An area of the (layout) mask changed, and needs scaling into the mask
+        and colouring into the frame
+        '''
+        if self.scale > 1:
+            self._changed.append((top, bottom, left, right))
+        # (the whole frame is coloured the first time anyway)
+        if self._palette is not None:
+            self._dirty.append((top, bottom, left, right))
+
+## end class FrameRenderer() ##
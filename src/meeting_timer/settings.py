@@ -23,35 +23,215 @@
 #
 
 import collections.abc
+import contextlib
+import hashlib
 import json
 import os
+import tempfile
 import tkinter as tk
 
+from meeting_timer.agenda import Agenda, AgendaItem
 
-class SettingsWrapper(object):
+
+# setting names and default values (the type of the default is the type of
+# the setting), nested dictionaries are sections
+DEFAULTS = {
+    "colour": {
+        "background": "black",
+        "finished": "red",
+        "primary": "green",
+        "warning": "orange",
+    },
+    "display": {
+        "background": "black",
+        "foreground": "green",
+        "title": "",
+        "time": "",
+        "speaker": "",
+    },
+    "initial": {
+        "duration": 540,
+        "title": "My Webinar",
+        "time": "",
+        "speaker": "Welcome",
+        "warning": 60,
+        "width": 1280,
+        "height": 720,
+    },
+    "next": {
+        "duration": 540,
+        "speaker": "John Smith",
+        "title": "My Webinar",
+        "warning": 60,
+    },
+    "webcam": {
+        "fps": 10,
+        "keepalive_fps": 1,
+        "width": 1280,
+        "height": 720,
+        "scale": 0,
+    },
+    "finished_text": "STOP",
+}
+
+
+# sections that are not saved to file
+UNSAVED_SECTIONS = ('display',)
+
+
+def content_hash(data):
+    '''
+    Digest of settings file content (bytes), to tell whether a file changed
     '''
-    Wraps settings sub-sections with standard interface
+    return hashlib.sha1(data).digest()
+
+
+def serialise(content):
     '''
+    Convert a Settings.dump() snapshot to the file format
     
-    def __init__(self, root=None, settings={}):
+    @return: bytes, JSON
+    '''
+    if 'agenda' in content:
+        content = dict(content, agenda=[item.to_dict() for item in content['agenda']])
+    return json.dumps(content, indent=2, sort_keys=True).encode('utf-8')
+
+
+def write_atomic(filename, data):
+    '''
+    Replace a file with new content such that a crash leaves either the old
+    or the new file (written to a temporary file, synced, then renamed)
+    '''
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{os.path.basename(filename)}.', suffix='.tmp', dir=directory)
+    try:
+        # keep the permissions of the file being replaced (mkstemp uses 0600)
+        try:
+            mode = os.stat(filename).st_mode & 0o7777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_name, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, filename)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    
+    # make the rename itself durable
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class Value(object):
+    '''
+    A typed setting value
+    
+    Provides the get/set/trace interface of a Tk variable without needing a
+    Tcl interpreter; widgets are bridged to it with variable().
+    '''
+    __slots__ = ('name', 'type', '_value', '_root', '_callbacks', '_var')
+    
+    def __init__(self, name, default, root=None):
         '''
         Constructor
+        
+        @param name: string, dotted path of the setting (i.e. display.title)
+        @param default: int or string, initial value (also sets the type)
+        @param root: Settings, notified of changes
+        '''
+        self.name = name
+        self.type = type(default)
+        self._value = default
+        self._root = root
+        self._callbacks = []
+        self._var = None
+    
+    def get(self):
+        '''Current value'''
+        return self._value
+    
+    def set(self, value):
+        '''
+        Change the value, observers are only called if it changed
+        
+        @raise ValueError: if value cannot be converted to the setting type
         '''
-        if root is None:
-            self._root = self
-        else:
-            self._root = root
-        self.settings = settings
+        value = self.type(value)
+        if value == self._value:
+            return
+        self._value = value
+        for callback in list(self._callbacks):
+            callback(self.name, '', 'write')
+        if self._root is not None:
+            self._root._changed(self)
     
-    def settings_root(self):
+    def trace(self, mode, callback):
         '''
-        Get the top level settings object
+        Call callback(name, index, mode) after each change (as tk.Variable's
+        trace with mode 'w')
         '''
-        return self._root
+        self._callbacks.append(callback)
+        return callback
     
-    def __getattr__(self, key):
-        '''Attribute mapper (i.e. Object.key)'''
-        return self.get(key)
+    def trace_remove(self, callback):
+        '''Remove a trace callback'''
+        self._callbacks.remove(callback)
+    
+    def variable(self, master=None):
+        '''
+        Tk variable kept in sync with the value, for widgets (textvariable)
+        
+        @param master: Tk widget/interpreter, default is the settings master
+        '''
+        if self._var is None:
+            if master is None and self._root is not None:
+                master = self._root._master
+            var_class = tk.IntVar if self.type is int else tk.StringVar
+            var = var_class(master, value=self._value)
+            updating = []
+            
+            def from_tk(*_):
+                if not updating:
+                    updating.append(True)
+                    try:
+                        self.set(var.get())
+                    except (ValueError, tk.TclError):
+                        # incomplete value being typed
+                        pass
+                    finally:
+                        updating.clear()
+            
+            def to_tk(*_):
+                if not updating:
+                    updating.append(True)
+                    try:
+                        var.set(self._value)
+                    finally:
+                        updating.clear()
+            
+            var.trace_add('write', from_tk)
+            self.trace('w', to_tk)
+            self._var = var
+        return self._var
+
+## end class Value() ##
+
+
+class Section(object):
+    '''
+    Group of settings, the values (or sub-sections) are attributes
+    '''
+    __slots__ = ()
+    _keys = ()
     
     def __getitem__(self, key):
         '''Index mapper (i.e. Object['key'])'''
@@ -61,70 +241,120 @@ class SettingsWrapper(object):
         '''
         Get the specified key
         '''
+        if key in self._keys:
+            return getattr(self, key)
         if default is not None:
-            result = self.settings.get(key, default)
-        else:
-            result = self.settings[key]
-        if isinstance(result, collections.abc.Mapping):
-            result = SettingsWrapper(self._root, result)
-        return result
+            return default
+        raise KeyError(key)
+    
+    def keys(self):
+        return self._keys
+    
+    def items(self):
+        return [(key, getattr(self, key)) for key in self._keys]
+
+## end class Section() ##
+
 
-## end class SettingsWrapper() ##
+def _section_class(name, defaults):
+    '''Create a Section class with a slot for each setting'''
+    keys = tuple(defaults)
+    return type(f'{name.title()}Section', (Section,), {'__slots__': keys, '_keys': keys})
 
+_SECTION_CLASSES = {name: _section_class(name, defaults)
+                    for name, defaults in DEFAULTS.items() if isinstance(defaults, dict)}
 
-class Settings(SettingsWrapper):
+
+class Settings(Section):
     '''
     Object for storing settings including writing-to/reading-from file
+    
+    Each setting is a typed Value reached by plain attribute access (i.e.
+    settings.display.title), and observers registered with subscribe() are
+    told which settings changed, once per batch of changes.
     '''
+    __slots__ = tuple(DEFAULTS) + ('_filename', '_master', '_agenda', '_agenda_file',
+                                   '_file_hash', '_observers', '_dirty', '_batch_depth')
+    _keys = tuple(DEFAULTS)
     
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, master=None):
         '''
         Constructor
         
-        @param filename: string, name of file to read-from/write-to
-        '''
-        SettingsWrapper.__init__(self, self, {
-            "colour": {
-                "background": tk.StringVar(value="black"),
-                "finished": tk.StringVar(value="red"),
-                "primary": tk.StringVar(value="green"),
-                "warning": tk.StringVar(value="orange"),
-            },
-            "display": {
-                "background": tk.StringVar(value="black"),
-                "foreground": tk.StringVar(value="green"),
-                "title": tk.StringVar(value=""),
-                "time": tk.StringVar(value=""),
-                "speaker": tk.StringVar(value=""),
-            },
-            "initial": {
-                "duration": tk.IntVar(value=540),
-                "title": tk.StringVar(value="My Webinar"),
-                "time": tk.StringVar(value=""),
-                "speaker": tk.StringVar(value="Welcome"),
-                "warning": tk.IntVar(value=60),
-                "width": tk.IntVar(value=1280),
-                "height": tk.IntVar(value=720),
-            },
-            "next": {
-                "duration": tk.IntVar(value=540),
-                "speaker": tk.StringVar(value="John Smith"),
-                "title": tk.StringVar(value="My Webinar"),
-                "warning": tk.IntVar(value=60),
-            },
-            "finished_text": tk.StringVar(value="STOP")
-        })
+        @param filename: string, name of file to read-from/write-to (read
+                         straight away if it exists)
+        @param master: Tk widget/interpreter for the variables bridged to
+                       widgets (default is the Tk root window)
+        '''
         self._filename = filename
-        self._settings_loaded = False
+        self._master = master
+        self._agenda = Agenda()
+        self._agenda_file = None
+        self._file_hash = None
+        self._observers = []
+        self._dirty = set()
+        self._batch_depth = 0
+        
+        # build settings tree
+        for name, default in DEFAULTS.items():
+            if isinstance(default, dict):
+                section = _SECTION_CLASSES[name]()
+                for key, value in default.items():
+                    setattr(section, key, Value(f'{name}.{key}', value, self))
+                setattr(self, name, section)
+            else:
+                setattr(self, name, Value(name, default, self))
+        
+        if filename is not None and os.path.exists(filename):
+            self.read()
     
-    def get(self, key, default=None):
+    @property
+    def filename(self):
         '''
-        Get a specific setting
+        File the settings are read from/written to (or None)
         '''
-        if not self._settings_loaded and self._filename is not None:
-            self._settings_loaded = True
-            self.read()
-        return SettingsWrapper.get(self, key, default=default)
+        return self._filename
+    
+    @property
+    def agenda(self):
+        '''
+        The agenda (sessions after the initial one)
+        '''
+        return self._agenda
+    
+    @property
+    def agenda_file(self):
+        '''
+        CSV/JSON lines file to import the agenda from (or None)
+        '''
+        return self._agenda_file
+    
+    def subscribe(self, callback):
+        '''
+        Register an observer
+        
+        @param callback: callable(changed), called with a frozenset of the
+                         names (i.e. 'display.title') of the changed settings
+        '''
+        self._observers.append(callback)
+    
+    def unsubscribe(self, callback):
+        '''Remove an observer'''
+        self._observers.remove(callback)
+    
+    @contextlib.contextmanager
+    def batch(self):
+        '''
+        Context in which changes are collected and observers are notified
+        once at the end
+        '''
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._notify()
     
     def read(self, from_filename=None):
         '''
@@ -141,15 +371,57 @@ class Settings(SettingsWrapper):
             raise FileNotFoundError(f"Settings file does not exist ({self._filename})")
         
         # open file to read
-        if os.path.getsize(self._filename) > 0:
-            with open(self._filename, 'r') as f:
-                content = json.load(f)
-                self._read_setting_values(self.settings, content, ('display',))
+        with open(self._filename, 'rb') as f:
+            data = f.read()
+        self._file_hash = content_hash(data)
+        if data.strip():
+            content = json.loads(data)
+            with self.batch():
+                self._read_setting_values(self, content, UNSAVED_SECTIONS)
+                # (a file without an agenda leaves an imported one alone)
+                if 'agenda' in content:
+                    self._agenda.load([AgendaItem.from_dict(item) for item in content['agenda']])
+                self._agenda_file = self._resolve_agenda_file(content)
+
+    def changes(self, content):
+        '''
+        The values in file content (i.e. from json.load) that differ from the
+        current settings
+        
+        @return: dict, nested like content (empty if nothing changed)
+        '''
+        return self._diff_setting_values(self, content, UNSAVED_SECTIONS)
+
+    def apply(self, content):
+        '''
+        Apply file content read elsewhere (i.e. a reloaded file); only the
+        settings whose values differ are set, so observers are told about
+        those alone
+        
+        @param content: dict, file content with the agenda already converted
+                        to a list of AgendaItem (without an agenda the current
+                        one, i.e. imported, is kept)
+        @return: bool, True if the agenda file changed (and needs importing)
+        '''
+        with self.batch():
+            self._read_setting_values(self, self.changes(content), UNSAVED_SECTIONS)
+            agenda_file = self._resolve_agenda_file(content)
+            file_changed = agenda_file != self._agenda_file
+            self._agenda_file = agenda_file
+            if agenda_file is None and 'agenda' in content:
+                items = content['agenda']
+                current = self._agenda.items
+                # (a file-backed agenda is never parsed just to compare it)
+                if file_changed or getattr(current, 'path', None) is not None or items != list(current):
+                    self._agenda.load(items)
+        return file_changed and agenda_file is not None
 
 
     def write(self, as_filename=None):
         '''
         Writes settings to file, optionally as an alternate filename
+        
+        The file is replaced atomically, so it is never left half written.
         '''
         # change filename if required
         if as_filename is not None:
@@ -159,27 +431,78 @@ class Settings(SettingsWrapper):
         if self._filename is None:
             raise FileNotFoundError(f"Settings filename not provided")
         
-        # open file to write
-        with open(self._filename, 'w+') as f:
-            # convert to basic python types
-            content = self._dump_setting_values(self.settings, ('display',))
-            
-            # write to file in json format
-            json.dump(content, f, indent=2, sort_keys=True)
+        data = serialise(self.dump())
+        # recorded first so a file watcher does not reload our own write
+        previous = self._file_hash
+        self._file_hash = content_hash(data)
+        try:
+            write_atomic(self._filename, data)
+        except:
+            # (not written, so an autosave must still write it)
+            self._file_hash = previous
+            raise
+
+    def dump(self):
+        '''
+        Snapshot of the saved settings for serialise(); cheap enough for the
+        UI thread (agenda items are converted by serialise)
+        '''
+        content = self._dump_setting_values(self, UNSAVED_SECTIONS)
+        items = self._agenda.items
+        if getattr(items, 'path', None) is not None:
+            content['agenda_file'] = os.path.abspath(items.path)
+        elif len(items):
+            content['agenda'] = list(items)
+        return content
 
 
     def _read_setting_values(self, settings, values, ignore_keys=()):
         '''
-        Tree-recursively load setting values
+        Tree-recursively load setting values (missing or invalid values are
+        left unchanged)
         '''
+        if not isinstance(values, collections.abc.Mapping):
+            return
         for key,var in settings.items():
-            if key not in ignore_keys:
-                if isinstance(var, collections.abc.Mapping):
-                    self._read_setting_values(var, values.get(key))
-                elif values is not None:
-                    var.set(values.get(key))
+            if key not in ignore_keys and key in values:
+                if isinstance(var, Section):
+                    self._read_setting_values(var, values[key])
+                else:
+                    try:
+                        var.set(values[key])
+                    except (TypeError, ValueError):
+                        pass
 
 
+    def _diff_setting_values(self, settings, values, ignore_keys=()):
+        '''
+        Tree-recursively find the values that differ from settings (missing
+        or invalid values are left out)
+        '''
+        result = {}
+        if not isinstance(values, collections.abc.Mapping):
+            return result
+        for key,var in settings.items():
+            if key not in ignore_keys and key in values:
+                if isinstance(var, Section):
+                    changed = self._diff_setting_values(var, values[key])
+                    if changed:
+                        result[key] = changed
+                else:
+                    try:
+                        if var.type(values[key]) != var.get():
+                            result[key] = values[key]
+                    except (TypeError, ValueError):
+                        pass
+        return result
+
+    def _resolve_agenda_file(self, content):
+        '''Path of the agenda file named in file content (relative to this one)'''
+        agenda_file = content.get('agenda_file')
+        if agenda_file is not None:
+            agenda_file = os.path.join(os.path.dirname(self._filename), agenda_file)
+        return agenda_file
+
     def _dump_setting_values(self, settings, ignore_keys=()):
         '''
         Tree-recursively dump settings into regular python types 
@@ -187,12 +510,28 @@ class Settings(SettingsWrapper):
         result = {}
         for key,var in settings.items():
             if key not in ignore_keys:
-                if isinstance(var, collections.abc.Mapping):
+                if isinstance(var, Section):
                     result[key] = self._dump_setting_values(var)
                 else:
                     result[key] = var.get()
         return result
 
+    def _changed(self, value):
+        '''A value changed'''
+        if self._observers:
+            self._dirty.add(value.name)
+            if self._batch_depth == 0:
+                self._notify()
+
+    def _notify(self):
+        '''Dispatch the collected changes'''
+        if not self._dirty:
+            return
+        changed = frozenset(self._dirty)
+        self._dirty.clear()
+        for callback in list(self._observers):
+            callback(changed)
+
 ## end class Settings() ##
 
 
@@ -47,31 +47,31 @@ class SettingsWindow(tk.Frame):
         self.fg_colour_label = tk.Label(self.tab_disp, text="Foreground Colour:", font="Arial 10 bold", anchor=tk.W)
         self.fg_colour_label.pack(side="top", expand=True, fill="x")
         self.fg_colour_entry = tk.Entry(self.tab_disp)
-        self.fg_colour_entry["textvariable"] = self.app.settings.colour.primary
+        self.fg_colour_entry["textvariable"] = self.app.settings.colour.primary.variable()
         self.fg_colour_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.warn_colour_label = tk.Label(self.tab_disp, text="Warning Colour:", font="Arial 10 bold", anchor=tk.W)
         self.warn_colour_label.pack(side="top", expand=True, fill="x")
         self.warn_colour_entry = tk.Entry(self.tab_disp)
-        self.warn_colour_entry["textvariable"] = self.app.settings.colour.warning
+        self.warn_colour_entry["textvariable"] = self.app.settings.colour.warning.variable()
         self.warn_colour_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.fin_colour_label = tk.Label(self.tab_disp, text="Finished Colour:", font="Arial 10 bold", anchor=tk.W)
         self.fin_colour_label.pack(side="top", expand=True, fill="x")
         self.fin_colour_entry = tk.Entry(self.tab_disp)
-        self.fin_colour_entry["textvariable"] = self.app.settings.colour.finished
+        self.fin_colour_entry["textvariable"] = self.app.settings.colour.finished.variable()
         self.fin_colour_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.bg_colour_label = tk.Label(self.tab_disp, text="Background Colour:", font="Arial 10 bold", anchor=tk.W)
         self.bg_colour_label.pack(side="top", expand=True, fill="x")
         self.bg_colour_entry = tk.Entry(self.tab_disp)
-        self.bg_colour_entry["textvariable"] = self.app.settings.colour.background
+        self.bg_colour_entry["textvariable"] = self.app.settings.colour.background.variable()
         self.bg_colour_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.fin_text_label = tk.Label(self.tab_disp, text="Finished Text:", font="Arial 10 bold", anchor=tk.W)
         self.fin_text_label.pack(side="top", expand=True, fill="x")
         self.fin_text_entry = tk.Entry(self.tab_disp)
-        self.fin_text_entry["textvariable"] = self.app.settings.finished_text
+        self.fin_text_entry["textvariable"] = self.app.settings.finished_text.variable()
         self.fin_text_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.tab_ctl.add(self.tab_disp, text='Display')
@@ -82,35 +82,64 @@ class SettingsWindow(tk.Frame):
         self.init_title_label = tk.Label(self.tab_init, text="Title:", font="Arial 10 bold", anchor=tk.W)
         self.init_title_label.pack(side="top", expand=True, fill="x")
         self.init_title_entry = tk.Entry(self.tab_init)
-        self.init_title_entry["textvariable"] = self.app.settings.initial.title
+        self.init_title_entry["textvariable"] = self.app.settings.initial.title.variable()
         self.init_title_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.init_time_label = tk.Label(self.tab_init, text="Time:", font="Arial 10 bold", anchor=tk.W)
         self.init_time_label.pack(side="top", expand=True, fill="x")
         self.init_time_entry = tk.Entry(self.tab_init)
-        self.init_time_entry["textvariable"] = self.app.settings.initial.time
+        self.init_time_entry["textvariable"] = self.app.settings.initial.time.variable()
         self.init_time_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.init_speaker_label = tk.Label(self.tab_init, text="Speaker:", font="Arial 10 bold", anchor=tk.W)
         self.init_speaker_label.pack(side="top", expand=True, fill="x")
         self.init_speaker_entry = tk.Entry(self.tab_init)
-        self.init_speaker_entry["textvariable"] = self.app.settings.initial.speaker
+        self.init_speaker_entry["textvariable"] = self.app.settings.initial.speaker.variable()
         self.init_speaker_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.init_width_label = tk.Label(self.tab_init, text="Width:", font="Arial 10 bold", anchor=tk.W)
         self.init_width_label.pack(side="top", expand=True, fill="x")
         self.init_width_entry = tk.Entry(self.tab_init)
-        self.init_width_entry["textvariable"] = self.app.settings.initial.width
+        self.init_width_entry["textvariable"] = self.app.settings.initial.width.variable()
         self.init_width_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.init_height_label = tk.Label(self.tab_init, text="Height:", font="Arial 10 bold", anchor=tk.W)
         self.init_height_label.pack(side="top", expand=True, fill="x")
         self.init_height_entry = tk.Entry(self.tab_init)
-        self.init_height_entry["textvariable"] = self.app.settings.initial.height
+        self.init_height_entry["textvariable"] = self.app.settings.initial.height.variable()
         self.init_height_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
         
         self.tab_ctl.add(self.tab_init, text='Initial')
         
+        # webcam tab #
+        self.tab_webcam = tk.ttk.Frame(self.tab_ctl)
+        
+        self.webcam_fps_label = tk.Label(self.tab_webcam, text="Frame rate (fps):", font="Arial 10 bold", anchor=tk.W)
+        self.webcam_fps_label.pack(side="top", expand=True, fill="x")
+        self.webcam_fps_entry = tk.Entry(self.tab_webcam)
+        self.webcam_fps_entry["textvariable"] = self.app.settings.webcam.fps.variable()
+        self.webcam_fps_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
+        
+        self.webcam_keepalive_label = tk.Label(self.tab_webcam, text="Static frame rate (fps):", font="Arial 10 bold", anchor=tk.W)
+        self.webcam_keepalive_label.pack(side="top", expand=True, fill="x")
+        self.webcam_keepalive_entry = tk.Entry(self.tab_webcam)
+        self.webcam_keepalive_entry["textvariable"] = self.app.settings.webcam.keepalive_fps.variable()
+        self.webcam_keepalive_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
+        
+        self.webcam_width_label = tk.Label(self.tab_webcam, text="Width (on restart):", font="Arial 10 bold", anchor=tk.W)
+        self.webcam_width_label.pack(side="top", expand=True, fill="x")
+        self.webcam_width_entry = tk.Entry(self.tab_webcam)
+        self.webcam_width_entry["textvariable"] = self.app.settings.webcam.width.variable()
+        self.webcam_width_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
+        
+        self.webcam_height_label = tk.Label(self.tab_webcam, text="Height (on restart):", font="Arial 10 bold", anchor=tk.W)
+        self.webcam_height_label.pack(side="top", expand=True, fill="x")
+        self.webcam_height_entry = tk.Entry(self.tab_webcam)
+        self.webcam_height_entry["textvariable"] = self.app.settings.webcam.height.variable()
+        self.webcam_height_entry.pack(side="top", expand=True, fill="x", padx=1, pady=(0,1))
+        
+        self.tab_ctl.add(self.tab_webcam, text='Webcam')
+        
         # pack tab ctrl
         self.tab_ctl.pack(side="top", expand = 1, fill ="both")
         
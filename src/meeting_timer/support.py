@@ -23,55 +23,126 @@
 #
 
 
+import colorsys
+import functools
 import re
 
-HTML_CODE_RE3 = r'^#?([a-f0-9])([a-f0-9])([a-f0-9])$'
-HTML_CODE_RE6 = r'^#?([a-f0-9]{2})([a-f0-9]{2})([a-f0-9]{2})$'
+# number of distinct colour strings remembered by each converter
+COLOUR_CACHE_SIZE = 256
 
-def colour_to_html(colour, default="#ffffff"):
-    '''Force a colour into HTML hash notation'''
-    
-    # strip formatting
-    colour = str(colour).lower().replace(' ', '').replace('-', '').strip()
-    
-    # replace named colour codes
-    if colour in _named_html_colours:
-        colour = _named_html_colours[colour]
-    
-    # check value matches html notation
-    if not re.match(HTML_CODE_RE3, colour) and not re.match(HTML_CODE_RE6, colour):
-        colour = default
+HTML_CODE_RE = re.compile(r'^#?((?:[a-f0-9]{3}){1,2}|(?:[a-f0-9]{4}){1,2})$')
+FUNCTION_RE = re.compile(r'^(rgba?|hsla?)\((.*)\)$')
+ARGUMENT_SPLIT_RE = re.compile(r'\s*[,/]\s*|\s+')
+NUMBER_RE = re.compile(r'^([+-]?(?:\d+\.?\d*|\.\d+))(%|deg)?$')
 
-    # check value starts with #
-    elif not colour.startswith('#'):
-        colour = f'#{colour}'
-    
-    return colour
-    
 
-def colour_to_tuple(colour, default="#ffffff"):
-    '''Force a colour into RGB tuple'''
+@functools.lru_cache(maxsize=COLOUR_CACHE_SIZE)
+def parse_colour(colour):
+    '''
+    Parse a colour name, HTML code (#rgb, #rgba, #rrggbb or #rrggbbaa) or
+    CSS rgb(), rgba(), hsl() or hsla() function
     
-    # convert to html format
-    colour = str(colour_to_html(colour, default)).lower()
+    @return: tuple (red, green, blue, alpha), ints 0-255
+    @raise ValueError: if the colour is not understood
+    '''
+    text = str(colour).strip().lower()
     
-    # try 6-diget html code
-    match =  re.match(HTML_CODE_RE6, colour)
+    # functional notation (comma or space separated, optional / alpha)
+    match = FUNCTION_RE.match(text)
     if match:
-        match = match.groups()
-    else:
-        # try 3-digit html code
-        match = re.match(HTML_CODE_RE3, colour)
-        if match:
-            match = map(lambda h: f'{h}{h}', match.groups())
-        else:
-            # give up
-            raise RuntimeError(f'Invalid colour: "{colour}"')
+        name, args = match.group(1), ARGUMENT_SPLIT_RE.split(match.group(2).strip())
+        if len(args) not in (3, 4):
+            raise ValueError(f'Invalid colour: "{colour}"')
+        values = [_parse_number(arg) for arg in args]
+        alpha = _alpha(*values[3]) if len(values) == 4 else 255
+        if name.startswith('rgb'):
+            return tuple(_channel(*value) for value in values[:3]) + (alpha,)
+        (hue, hue_unit), saturation, lightness = values[:3]
+        if hue_unit == '%':
+            raise ValueError(f'Invalid colour: "{colour}"')
+        rgb = colorsys.hls_to_rgb((hue % 360) / 360, _fraction(*lightness), _fraction(*saturation))
+        return tuple(int(round(c * 255)) for c in rgb) + (alpha,)
     
-    # convert to decimal tuple
-    return tuple(map(lambda h: int(h, 16), match))
-        
+    # named colour (spaces and dashes ignored)
+    text = _named_html_colours.get(text.replace(' ', '').replace('-', ''), text)
     
+    match = HTML_CODE_RE.match(text)
+    if not match:
+        raise ValueError(f'Invalid colour: "{colour}"')
+    digits = match.group(1)
+    if len(digits) <= 4:
+        digits = ''.join(h*2 for h in digits)
+    values = tuple(int(digits[i:i+2], 16) for i in range(0, len(digits), 2))
+    return values if len(values) == 4 else values + (255,)
+
+
+@functools.lru_cache(maxsize=COLOUR_CACHE_SIZE)
+def colour_to_rgba(colour, default="#ffffff"):
+    '''Force a colour into RGBA tuple (ints 0-255)'''
+    try:
+        return parse_colour(colour)
+    except ValueError:
+        pass
+    try:
+        return parse_colour(default)
+    except ValueError:
+        raise RuntimeError(f'Invalid colour: "{default}"')
+
+
+@functools.lru_cache(maxsize=COLOUR_CACHE_SIZE)
+def colour_to_html(colour, default="#ffffff"):
+    '''Force a colour into HTML hash notation (#rrggbb, alpha is dropped)'''
+    return '#%02x%02x%02x' % colour_to_rgba(colour, default)[:3]
+
+
+@functools.lru_cache(maxsize=COLOUR_CACHE_SIZE)
+def colour_to_tuple(colour, default="#ffffff"):
+    '''Force a colour into RGB tuple'''
+    return colour_to_rgba(colour, default)[:3]
+
+
+@functools.lru_cache(maxsize=COLOUR_CACHE_SIZE)
+def colour_over(colour, background, default="#ffffff"):
+    '''
+    RGB tuple of a (possibly translucent) colour drawn over an opaque
+    background colour
+    '''
+    red, green, blue, alpha = colour_to_rgba(colour, default)
+    return tuple((c*alpha + b*(255 - alpha) + 127) // 255
+                 for c, b in zip((red, green, blue), colour_to_tuple(background, default)))
+
+
+def _parse_number(text):
+    '''Split a CSS number into (value, unit)'''
+    match = NUMBER_RE.match(text)
+    if not match:
+        raise ValueError(f'Invalid colour component: "{text}"')
+    return float(match.group(1)), match.group(2)
+
+
+def _fraction(value, unit):
+    '''Percentage to 0-1'''
+    if unit != '%':
+        raise ValueError(f'Expected a percentage: {value}')
+    return min(max(value / 100, 0.0), 1.0)
+
+
+def _channel(value, unit):
+    '''rgb() component (0-255 or percentage) to int 0-255'''
+    if unit == 'deg':
+        raise ValueError(f'Invalid colour component: {value}deg')
+    if unit == '%':
+        value = value * 255 / 100
+    return int(round(min(max(value, 0.0), 255.0)))
+
+
+def _alpha(value, unit):
+    '''Alpha (0-1 or percentage) to int 0-255'''
+    if unit == 'deg':
+        raise ValueError(f'Invalid alpha: {value}deg')
+    if unit == '%':
+        value = value / 100
+    return int(round(min(max(value, 0.0), 1.0) * 255))
 
 
 _named_html_colours = {
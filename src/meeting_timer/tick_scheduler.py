@@ -0,0 +1,178 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import math
+import time
+
+# wakeups this much before the (lateness compensated) wakeup time still
+# count as the tick, i.e. timers rounded to whole milliseconds (seconds)
+TOLERANCE = 0.002
+
+
+class TickStats(object):
+    '''
+    Wakeup counts and lateness (jitter) of scheduled ticks
+    '''
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.wakeups = 0
+        self.early_wakeups = 0
+        self.ticks = 0
+        self.lateness_count = 0
+        self.lateness_sum = 0.0
+        self.lateness_sq_sum = 0.0
+        self.lateness_max = 0.0
+        # optional metrics.Histogram of lateness
+        self.histogram = None
+
+    def record(self, lateness):
+        '''Record how late (seconds) a tick fired after its deadline'''
+        self.lateness_count += 1
+        self.lateness_sum += lateness
+        self.lateness_sq_sum += lateness * lateness
+        self.lateness_max = max(self.lateness_max, lateness)
+        if self.histogram is not None:
+            self.histogram.record(lateness)
+
+    @property
+    def lateness_mean(self):
+        if self.lateness_count == 0:
+            return 0.0
+        return self.lateness_sum / self.lateness_count
+
+    @property
+    def jitter(self):
+        '''Standard deviation of tick lateness (seconds)'''
+        if self.lateness_count == 0:
+            return 0.0
+        mean = self.lateness_mean
+        return math.sqrt(max(0.0, self.lateness_sq_sum / self.lateness_count - mean * mean))
+
+    def summary(self):
+        '''One line report of the statistics'''
+        return (f'ticks={self.ticks} wakeups={self.wakeups} early={self.early_wakeups} '
+                f'lateness mean={self.lateness_mean*1000:.2f}ms max={self.lateness_max*1000:.2f}ms '
+                f'jitter={self.jitter*1000:.2f}ms')
+
+## end class TickStats() ##
+
+
+class TickScheduler(object):
+    '''
+    Runs a tick function at absolute deadlines on the monotonic clock
+
+    The tick function returns the deadline of the next tick, so nothing runs
+    between display changes and errors never accumulate.  Wakeups are
+    scheduled early by the average observed lateness of the event loop; a
+    wakeup that arrives by then is the tick (run as at the deadline) and
+    only one clearly earlier is re-armed.
+    '''
+
+    # weight of the newest sample in the lateness estimate
+    LATENESS_WEIGHT = 0.2
+
+    def __init__(self, after, after_cancel, tick, clock=time.monotonic):
+        '''
+        Constructor
+
+        @param after: callable(ms, fn), schedules fn (i.e. Tk's after)
+        @param after_cancel: callable(id), cancels a scheduled fn
+        @param tick: callable(now), performs a tick and returns the next
+                     deadline (clock seconds) or None to go idle
+        @param clock: callable(), monotonic clock in seconds
+        '''
+        self._after = after
+        self._after_cancel = after_cancel
+        self._tick = tick
+        self._clock = clock
+        self._pending = None
+        self._deadline = None
+        self._target = None
+        self._lateness = 0.0
+        self.stats = TickStats()
+
+    @property
+    def deadline(self):
+        '''Deadline of the next tick (or None when idle)'''
+        return self._deadline
+
+    def reschedule(self):
+        '''
+        Tick as soon as possible (i.e. after the timer state was changed)
+        '''
+        self._cancel()
+        self._deadline = None
+        self._pending = self._after(0, self._fire)
+
+    def tick_now(self):
+        '''
+        Tick immediately, from within the current event loop callback
+        '''
+        self._cancel()
+        self._deadline = None
+        self._fire()
+
+    def cancel(self):
+        '''Stop ticking until the next reschedule()'''
+        self._cancel()
+        self._deadline = None
+
+    def _fire(self):
+        '''Event loop callback'''
+        self._pending = None
+        now = self._clock()
+        self.stats.wakeups += 1
+
+        if self._deadline is not None:
+            # woke well before the deadline: wait for the remainder
+            if now < self._deadline - self._lateness - TOLERANCE:
+                self.stats.early_wakeups += 1
+                self._arm(math.ceil((self._deadline - now) * 1000))
+                return
+            # (how late the event loop ran the wakeup, not the tick)
+            self._lateness += self.LATENESS_WEIGHT * (now - self._target - self._lateness)
+            self.stats.record(max(0.0, now - self._deadline))
+            now = max(now, self._deadline)
+
+        self.stats.ticks += 1
+        self._deadline = self._tick(now)
+        if self._deadline is not None:
+            delay = self._deadline - self._clock() - self._lateness
+            self._arm(max(0, int(delay * 1000)))
+
+    def _arm(self, ms):
+        '''Schedule the next wakeup'''
+        self._target = self._clock() + ms / 1000
+        self._pending = self._after(ms, self._fire)
+
+    def _cancel(self):
+        '''Cancel a pending wakeup'''
+        if self._pending is not None:
+            self._after_cancel(self._pending)
+            self._pending = None
+
+## end class TickScheduler() ##
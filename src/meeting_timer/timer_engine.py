@@ -0,0 +1,194 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import math
+import time
+
+# display phases
+PRIMARY = 'primary'
+WARNING = 'warning'
+
+# how far past a second boundary to tick so the new second is displayed
+TICK_EPSILON = 0.001
+
+
+def seconds_to_display(duration):
+    '''Formats a duration for display'''
+    mins = int(duration / 60)
+    sec = duration % 60
+    return '%02d:%02d' % (mins, sec)
+
+
+class TimerEngine(object):
+    '''
+    Countdown timer state, independent of any user interface
+
+    Observers are called as callback(event, value) with the events:
+      'time':    value is the countdown text to display
+      'phase':   value is PRIMARY or WARNING (the colour to display)
+      'stopped': the timer was stopped/finished (value is None)
+    '''
+
+    def __init__(self, duration=0, warning=0, clock=time.monotonic):
+        '''
+        Constructor
+
+        @param duration: int, length of the countdown in seconds
+        @param warning: int, warning phase starts with this many seconds left
+        @param clock: callable(), monotonic clock in seconds
+        '''
+        self.duration = duration
+        self.warning = warning
+        self.start_time = None
+        self.pause_time = None
+        self._clock = clock
+        self._observers = []
+        self._last_phase = None
+        self._last_time = None
+
+    def subscribe(self, callback):
+        '''
+        Register an observer, callable(event, value)
+        '''
+        self._observers.append(callback)
+
+    def unsubscribe(self, callback):
+        '''Remove an observer'''
+        self._observers.remove(callback)
+
+    @property
+    def running(self):
+        '''True if counting down (not stopped and not paused)'''
+        return self.start_time is not None and self.pause_time is None
+
+    @property
+    def paused(self):
+        return self.pause_time is not None
+
+    @property
+    def stopped(self):
+        return self.start_time is None
+
+    def elapsed(self, now=None):
+        '''Seconds elapsed since the countdown was started'''
+        if self.start_time is None:
+            return 0.0
+        if self.pause_time is not None:
+            return self.pause_time - self.start_time
+        if now is None:
+            now = self._clock()
+        return now - self.start_time
+
+    def remaining(self, now=None):
+        '''Whole seconds left to display'''
+        return int(self.duration - self.elapsed(now))
+
+    def drift(self, now=None):
+        '''
+        Seconds since the displayed second began (how late the display is if
+        it changes now), or None unless running
+        '''
+        if not self.running:
+            return None
+        elapsed = self.elapsed(now)
+        # (the first second began at the start)
+        return min(elapsed, elapsed - (self.duration - int(self.duration - elapsed) - 1))
+
+    def load(self, duration, warning):
+        '''
+        Stop the timer and set up the next countdown
+        '''
+        self.stop()
+        self.duration = duration
+        self.warning = warning
+        self._emit('phase', PRIMARY)
+        self._emit('time', seconds_to_display(duration))
+
+    def start(self):
+        '''Start or resume the countdown'''
+        now = self._clock()
+        if self.pause_time is not None:
+            self.start_time += now - self.pause_time
+        elif self.start_time is None:
+            self.start_time = now
+        self.pause_time = None
+
+    def pause(self):
+        '''Pause a running countdown'''
+        if self.pause_time is None and self.start_time is not None:
+            self.pause_time = self._clock()
+
+    def stop(self):
+        '''Stop the timer and reset to 0'''
+        self.start_time = None
+        self.pause_time = None
+        self._last_phase = None
+        self._last_time = None
+        self._emit('stopped', None)
+
+    def add(self, duration):
+        '''Add (or remove) seconds from the countdown'''
+        self.duration += duration
+
+    def tick(self, now=None):
+        '''
+        Update observers with the current state of the countdown
+
+        @param now: float, clock value of this tick
+        @return: float, clock deadline of the next display change or None if
+                 the display is static (stopped or paused)
+        '''
+        if self.start_time is None:
+            return None
+        if now is None:
+            now = self._clock()
+
+        # calculate time remaining
+        elapsed = self.elapsed(now)
+        remaining = int(self.duration - elapsed)
+        if remaining <= 0:
+            self.stop()
+            return None
+
+        # update display colour and text
+        phase = WARNING if remaining <= self.warning else PRIMARY
+        if phase != self._last_phase:
+            self._last_phase = phase
+            self._emit('phase', phase)
+        time_text = seconds_to_display(remaining)
+        if time_text != self._last_time:
+            self._last_time = time_text
+            self._emit('time', time_text)
+
+        # next change is when the elapsed time passes a whole second
+        if self.pause_time is not None:
+            return None
+        return self.start_time + math.floor(elapsed) + 1 + TICK_EPSILON
+
+    def _emit(self, event, value):
+        '''Notify observers'''
+        for callback in list(self._observers):
+            callback(event, value)
+
+## end class TimerEngine() ##
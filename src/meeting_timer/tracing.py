@@ -0,0 +1,167 @@
+#
+# MIT License
+#
+# Copyright (c) 2020 Andrew Robinson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+# spans kept (the oldest are overwritten)
+TRACE_CAPACITY = 65536
+
+
+class Tracer(object):
+    '''
+    Records timed spans into a preallocated ring buffer and writes them out
+    in the Chrome trace event format (for chrome://tracing or Perfetto)
+    
+    Recording a span only stores its name, times and thread into the next
+    slot, so tracing can stay on for a whole event and be dumped after a
+    stutter.  Methods marked with @traced are only wrapped on the objects
+    the tracer is attached to, so nothing is added to calls while tracing
+    is off.
+    '''
+
+    def __init__(self, capacity=TRACE_CAPACITY, clock=time.perf_counter):
+        '''
+        Constructor
+        
+        @param capacity: int, number of spans kept
+        @param clock: callable(), monotonic clock in seconds
+        '''
+        self.capacity = capacity
+        self._clock = clock
+        self._origin = clock()
+        self._names = [None] * capacity
+        self._starts = [0.0] * capacity
+        self._ends = [0.0] * capacity
+        self._threads = [0] * capacity
+        self._thread_names = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def now(self):
+        '''Clock value to pass to complete() as the start of a span'''
+        return self._clock()
+
+    def complete(self, name, start, end=None):
+        '''
+        Record a span
+        
+        @param name: string, span name, the part before the first '.' is its
+                     category (i.e. 'command.start')
+        @param start: float, now() value when the span began
+        @param end: float, now() value when the span ended (default now)
+        '''
+        if end is None:
+            end = self._clock()
+        thread = threading.get_ident()
+        if thread not in self._thread_names:
+            self._thread_names[thread] = threading.current_thread().name
+        with self._lock:
+            i = self.recorded % self.capacity
+            self._names[i] = name
+            self._starts[i] = start
+            self._ends[i] = end
+            self._threads[i] = thread
+            self.recorded += 1
+
+    def attach(self, obj):
+        '''
+        Record calls to the @traced methods of obj as spans (from now on,
+        bound methods taken earlier are not traced)
+        '''
+        for cls in type(obj).__mro__:
+            for attr, func in list(vars(cls).items()):
+                name = getattr(func, 'trace_name', None)
+                if name is not None and attr not in vars(obj):
+                    setattr(obj, attr, self._wrap(name, getattr(obj, attr)))
+
+    def _wrap(self, name, method):
+        '''A bound method recording each call as a span'''
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = self._clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.complete(name, start)
+        return wrapper
+
+    @contextlib.contextmanager
+    def span(self, name):
+        '''Context manager recording its block as a span'''
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.complete(name, start)
+
+    def events(self):
+        '''
+        The recorded spans, oldest first, as Chrome trace events
+        
+        @return: list of dict
+        '''
+        with self._lock:
+            count = min(self.recorded, self.capacity)
+            first = self.recorded - count
+            slots = [(self._names[i % self.capacity], self._starts[i % self.capacity],
+                      self._ends[i % self.capacity], self._threads[i % self.capacity])
+                     for i in range(first, first + count)]
+        pid = os.getpid()
+        # (metadata events name the threads)
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread, 'args': {'name': thread_name}}
+                  for thread, thread_name in list(self._thread_names.items())]
+        events.extend({'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': pid, 'tid': thread,
+                       'ts': (start - self._origin) * 1e6, 'dur': (end - start) * 1e6}
+                      for name, start, end, thread in slots)
+        return events
+
+    def dump(self, filename):
+        '''
+        Write the recorded spans to a Chrome trace (JSON) file
+        
+        @return: int, number of spans written
+        '''
+        events = self.events()
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return sum(1 for event in events if event['ph'] == 'X')
+
+## end class Tracer() ##
+
+
+def traced(name):
+    '''
+    Method decorator naming the span recorded for each call once a Tracer
+    is attached to the object (the method itself is unchanged)
+    '''
+    def decorator(func):
+        func.trace_name = name
+        return func
+    return decorator
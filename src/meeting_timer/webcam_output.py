@@ -22,96 +22,287 @@
 # SOFTWARE.
 #
 
+import logging
 import platform
-import glob
-from meeting_timer import support
+import time
 
-# platform specific imports
-WEBCAM_SUPPORT=False
-if platform.system().lower() == "linux":
+from meeting_timer.frame_pacer import FramePacer
+from meeting_timer.tracing import traced
+
+# optional imports, set by load() (importing numpy and Pillow is slow so
+# it is left until the output is created)
+RENDER_SUPPORT=None
+WEBCAM_SUPPORT=None
+
+def load():
+    '''
+    Import the render pipeline and webcam modules, if installed (safe to
+    call from a background thread to have them ready)
+    
+    @return: bool, True if frames can be rendered
+    '''
+    global RENDER_SUPPORT, WEBCAM_SUPPORT
+    if RENDER_SUPPORT is not None:
+        return RENDER_SUPPORT
+    
+    render_support = False
     try:
-        import pyfakewebcam
-        import numpy as np
-        from PIL import Image, ImageFont, ImageDraw
-        WEBCAM_SUPPORT=True
+        import meeting_timer.frame_bus
+        import meeting_timer.frame_cache
+        import meeting_timer.render_worker
+        render_support = True
     except ImportError:
         pass
+    
+    # platform specific imports
+    webcam_support = False
+    if platform.system().lower() == "linux" and render_support:
+        try:
+            import pyfakewebcam
+            import meeting_timer.loopback
+            webcam_support = True
+        except ImportError:
+            pass
+    
+    WEBCAM_SUPPORT = webcam_support
+    RENDER_SUPPORT = render_support
+    return RENDER_SUPPORT
+
+logger = logging.getLogger(__name__)
+
+# seconds between checks for a consumer while nobody is watching
+IDLE_POLL = 1.0
 
 class WebcamOutput(object):
     '''
-    Writes frames to loopback webcam
+    Renders the display to the loopback webcam and any other frame sinks
+    (recordings, network streams)
+    
+    Frames are sent at the full frame rate only while the image changes and
+    at a keep-alive rate while it is static.  Rendering and sending stop
+    altogether while no sink has a consumer.
     '''
     
-    def __init__(self, app):
+    def __init__(self, app, cache_bytes=256*1024*1024, spill_path=None, device=None, metrics=None,
+                 tracer=None):
         '''
         Constructor
+        
+        @param device: string, loopback device node (default: discovered)
+        @param cache_bytes: int, memory cap for the rendered frame cache
+        @param spill_path: string, optional file to spill evicted frames into
+        @param metrics: Metrics, optional, records render and output durations
+        @param tracer: Tracer, optional, records renders and output as spans
         '''
         self.app = app
-        self._camera = None
+        self.metrics = metrics
+        if tracer is not None:
+            tracer.attach(self)
+        self.bus = None
         self._running = True
+        self._prerenderer = None
+        self._worker = None
+        self._master = None
+        self._pending = None
+        self._suspended = True
         
+        # output rate
+        webcam = self.app.settings.webcam
+        self.pacer = FramePacer(webcam.fps.get(), webcam.keepalive_fps.get())
+        webcam.fps.trace('w', self._update_rate)
+        webcam.keepalive_fps.trace('w', self._update_rate)
+        
+        self._buffer = None
+        if not load():
+            return
+        from meeting_timer.renderer import clamp_size
+        
+        # output size (YUYV packs pixel pairs so the width is even), large
+        # frames are rasterised at 1/scale of the size (0: automatic)
+        width, self._img_height, scale = clamp_size(webcam.width.get(), webcam.height.get(), webcam.scale.get())
+        self._img_width = width // 2 * 2
+        from meeting_timer.frame_bus import FrameBus, LoopbackSink
+        from meeting_timer.frame_cache import FrameCache, PreRenderer
+        from meeting_timer.render_worker import FrameBuffer, RenderWorker
+        
+        # render pipeline (suspended until a sink has a consumer)
+        self.bus = FrameBus()
+        self._cache = FrameCache(cache_bytes, spill_path)
+        self._prerenderer = PreRenderer(self._cache, self._img_width, self._img_height, scale=scale)
+        self._prerenderer.suspend()
+        self._buffer = FrameBuffer()
+        self._worker = RenderWorker(self._cache, self._img_width, self._img_height,
+                                    self._buffer, self._prerenderer, metrics, tracer, scale)
+        self._worker.suspend()
         
-        # trace colour and text value changes
-        def update(*_):
-            if self._camera is not None:
-                self._update_webcam()
-        self.app.settings.display.foreground.trace('w', update)
-        self.app.settings.display.background.trace('w', update)
-        self.app.settings.display.title.trace('w', update)
-        self.app.settings.display.time.trace('w', update)
-        self.app.settings.display.speaker.trace('w', update)
-    
-        # open webcam
-        self._webcam_img = None
-        self._img_width = 1280
-        self._img_height = int(self._img_width*9/16)
         # find webcam
-        if platform.system().lower() == "linux" and WEBCAM_SUPPORT:
-            for dev in glob.glob('/dev/video*'):
-                try:
-                    self._camera = pyfakewebcam.FakeWebcam(dev, self._img_width, self._img_height)
-                    break
-                except:
-                    pass
-            if self._camera is None:
+        if WEBCAM_SUPPORT:
+            from meeting_timer.loopback import discover_loopback
+            device = discover_loopback(device)
+            if device is None:
                 print("No loopback web-cam found")
+            else:
+                try:
+                    self.bus.add(LoopbackSink(device, self._img_width, self._img_height))
+                except OSError as e:
+                    logger.error('Unable to open web-cam %s: %s', device, e)
+        
+        # render once per batch of colour and text value changes
+        self.app.display_state.subscribe(self._on_display_change)
+        self._update_webcam(self.app.display_state.state)
     
-    def schedule_frame(self):
+    def add_sink(self, sink):
         '''
-        Send current frame to webcam
+        Send frames to another sink
         '''
-        if self._webcam_img is not None and self._running:
-            self._camera.schedule_frame(self._webcam_img)
-
-    def _update_webcam(self):
-        '''Updates image to render to webcam'''
+        self.bus.add(sink)
+        self._wake(0)
+    
+    def record(self, path):
+        '''
+        Record the output to a file (.y4m or any format OpenCV can write)
+        '''
+        from meeting_timer.frame_bus import create_recorder
+        self.add_sink(create_recorder(path, self._img_width, self._img_height, self.pacer.fps))
+    
+    def stream(self, address):
+        '''
+        Serve raw frames over TCP
         
-        colour = self.app.settings.display.foreground.get()
-        background = support.colour_to_tuple(self.app.settings.display.background.get())
+        @param address: (host, port) to listen on
+        @return: StreamSink
+        '''
+        from meeting_timer.frame_bus import StreamSink
+        sink = StreamSink(address, self._img_width, self._img_height)
+        self.add_sink(sink)
+        return sink
+    
+    def start(self, master):
+        '''
+        Start sending frames using the event loop of master
+        '''
+        if self.bus is not None and self.bus.sinks:
+            self._master = master
+            self._wake(0)
+    
+    @traced('webcam.schedule')
+    def schedule_frame(self, now=None):
+        '''
+        Send current frame to webcam, if one is due
         
-        img = Image.new('RGB', (self._img_width, self._img_height, ), background)
-        draw = ImageDraw.Draw(img)
-        font = ImageFont.truetype("arial.ttf", int(self._img_height/7))
-        fontm = ImageFont.truetype("FreeMonoBold.otf", int(self._img_height/2))
-        # font = ImageFont.load_default()
+        @return: float, seconds until the next frame should be checked
+        '''
+        if now is None:
+            now = time.monotonic()
+        if self._buffer is None or not self._running:
+            return None
+        if self.metrics is None:
+            return self._schedule_frame(now)
+        start = time.perf_counter()
+        delay = self._schedule_frame(now)
+        self.metrics.record('webcam.schedule', time.perf_counter() - start)
+        return delay
+
+    def _schedule_frame(self, now):
+        '''Send the current frame, if one is due'''
+        
+        # nobody watching: stop rendering and sending
+        attached = self.bus.attached
+        if attached == self._suspended:
+            self._suspended = not attached
+            self._worker.suspend(self._suspended)
+            self._prerenderer.suspend(self._suspended)
+        if self._suspended:
+            return IDLE_POLL
         
-        # draw title text
-        title_text = self.app.settings.display.title.get()
-        w,_ = font.getsize(title_text)
-        draw.text(((self._img_width-w)/2, 5), title_text, font=font, fill=colour)
+        frame = self._buffer.swap()
+        if frame is not None and self.pacer.due(self._buffer.version, now):
+            self._push(frame, now)
+            self.pacer.sent(now)
         
-        # draw time text
-        time_text = self.app.settings.display.time.get()
-        w,h = fontm.getsize(time_text)
-        draw.text(((self._img_width-w)/2, (self._img_height-h)/2-15), time_text, font=fontm, fill=colour)
+        # check back at the full rate while a new frame is being rendered
+        delay = self.pacer.next_due(now)
+        if self._worker.busy:
+            delay = min(delay, 1 / self.pacer.fps)
+        return delay
+
+    @traced('webcam.push')
+    def _push(self, frame, now):
+        '''Send a frame to all sinks'''
+        if self.metrics is None:
+            self.bus.publish(frame, now)
+        else:
+            start = time.perf_counter()
+            self.bus.publish(frame, now)
+            self.metrics.record('frame.push', time.perf_counter() - start)
+
+    def stats(self):
+        '''Frame output counters'''
+        return {
+            'frames_sent': self.pacer.frames_sent,
+            'frames_skipped': self.pacer.frames_skipped(),
+            'suspended': self._suspended,
+            'sinks': self.bus.stats() if self.bus is not None else {},
+        }
+
+    def prerender(self, states, preload=()):
+        '''
+        Render upcoming frames in the background
         
-        # draw speaker text
-        title_text = self.app.settings.display.speaker.get()
-        w,_ = font.getsize(title_text)
-        draw.text(((self._img_width-w)/2, self._img_height-15-int(self._img_height/7)), title_text, font=font, fill=colour)
+        @param states: iterable of (title, time, speaker, foreground,
+                       background) in the order they will be displayed
+        @param preload: iterable of states that may be switched to at any
+                        time (kept rendered)
+        '''
+        if self._prerenderer is not None:
+            self._prerenderer.schedule(states, preload)
+
+    def close(self):
+        '''
+        Stop the background threads and close all sinks
+        '''
+        self._running = False
+        if self._pending is not None:
+            self._master.after_cancel(self._pending)
+            self._pending = None
+        if self._worker is not None:
+            self._worker.stop()
+            self._prerenderer.stop()
+            self._worker = None
+            self.bus.close()
+
+    def _on_display_change(self, state, changed):
+        '''Display state observer'''
+        self._update_webcam(state)
+
+    @traced('webcam.submit')
+    def _update_webcam(self, state):
+        '''Queues the display state to be rendered to the webcam'''
         
-        # create image
-        self._webcam_img = np.array(img)
-    
-    
-        
\ No newline at end of file
+        if self.metrics is not None:
+            start = time.perf_counter()
+        self._worker.submit(state)
+        if not self._suspended:
+            self._wake(1 / self.pacer.fps)
+        if self.metrics is not None:
+            self.metrics.record('webcam.update', time.perf_counter() - start)
+
+    def _update_rate(self, *_):
+        '''Apply changed frame rate settings'''
+        webcam = self.app.settings.webcam
+        self.pacer.configure(webcam.fps.get(), webcam.keepalive_fps.get())
+
+    def _send_frames(self):
+        '''Event loop callback'''
+        self._pending = None
+        delay = self.schedule_frame()
+        if delay is not None:
+            self._wake(delay)
+
+    def _wake(self, delay):
+        '''(Re)schedule the frame loop to run within delay seconds'''
+        if self._master is None or not self._running:
+            return
+        if self._pending is not None:
+            self._master.after_cancel(self._pending)
+        self._pending = self._master.after(int(delay * 1000), self._send_frames)
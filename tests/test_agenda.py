@@ -0,0 +1,80 @@
+'''
+Unit testing for Agenda class
+'''
+
+import os
+import tempfile
+import tkinter as tk
+import unittest
+
+from meeting_timer import agenda
+from meeting_timer import settings
+from meeting_timer.application import Application
+
+
+def make_items(count):
+    return [agenda.AgendaItem(f'Session {i}', f'Speaker {i}', 60 + i, 10) for i in range(count)]
+
+
+class TestAgenda(unittest.TestCase):
+    '''Tests the Agenda class'''
+
+    ## TESTS ##
+
+    def test_navigation(self):
+        a = agenda.Agenda(make_items(5000))
+        changes = []
+        a.subscribe(lambda a: changes.append(a.index))
+        self.assertIsNone(a.current, "nothing on display before the first item")
+        self.assertEqual(a.peek().title, 'Session 0', "first item is next")
+        self.assertEqual(a.advance().title, 'Session 0', "a.advance()")
+        self.assertEqual(a.jump(4998).title, 'Session 4998', "a.jump(4998)")
+        self.assertEqual(a.advance().title, 'Session 4999', "a.advance() to the last item")
+        self.assertIsNone(a.advance(), "no advance past the end")
+        self.assertEqual(a.rewind().title, 'Session 4998', "a.rewind()")
+        self.assertEqual(changes, [0, 4998, 4999, 4998], "observers notified of moves")
+        with self.assertRaises(IndexError):
+            a.jump(5000)
+
+    def test_window(self):
+        a = agenda.Agenda(make_items(10))
+        self.assertEqual([item.title for item in a.window(8, 5)], ['Session 8', 'Session 9'], "window clipped at the end")
+        self.assertEqual(len(a.window(-3, 2)), 2, "window clipped at the start")
+
+    def test_settings_file(self):
+        root = tk.Tk()
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'agenda.mt')
+            s = settings.Settings()
+            for item in make_items(3):
+                s.agenda.append(item)
+            s.write(filename)
+            s2 = settings.Settings(filename)
+            self.assertEqual(list(s2.agenda.items), make_items(3), "agenda saved and loaded")
+        root.destroy()
+
+
+class TestApplicationAgenda(unittest.TestCase):
+    '''Tests moving through the agenda with the Application'''
+
+    ## TESTS ##
+
+    def test_next_previous(self):
+        app = Application()
+        app.init_state()
+        app.settings.agenda.load(make_items(3))
+        self.assertEqual(app.settings.next.title.get(), 'Session 0', "first item staged")
+        app.next()
+        self.assertEqual(app.settings.display.title.get(), 'Session 0', "first item on display")
+        self.assertEqual(app.settings.display.time.get(), '01:00', "duration loaded")
+        self.assertEqual(app.settings.next.title.get(), 'Session 1', "following item staged")
+        app.next()
+        app.previous()
+        self.assertEqual(app.settings.display.speaker.get(), 'Speaker 0', "previous item on display")
+        app.jump(2)
+        self.assertEqual(app.settings.display.time.get(), '01:02', "jumped to the last item")
+        app.master.destroy()
+
+
+if __name__ == "__main__":
+    unittest.main()
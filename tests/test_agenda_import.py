@@ -0,0 +1,93 @@
+'''
+Unit testing for AgendaFile and AgendaLoader classes
+'''
+
+import gc
+import os
+import tempfile
+import unittest
+
+from meeting_timer import agenda_import
+from meeting_timer.agenda import AgendaItem
+from meeting_timer.dispatcher import Dispatcher
+from meeting_timer.headless import HeadlessLoop
+
+
+class TestAgendaFile(unittest.TestCase):
+    '''Tests the AgendaFile class'''
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    ## TESTS ##
+
+    def test_csv(self):
+        path = self._write('agenda.csv', b'\xef\xbb\xbfTitle,Speaker,Duration,Warning\r\n'
+                                         b'Keynote,"Doe, Jane",30:00,5:00\r\n'
+                                         b'\r\n'
+                                         b'Q&A,Jane,600,60')
+        items = agenda_import.AgendaFile(path)
+        self.assertEqual(len(items), 2, "blank lines skipped")
+        self.assertEqual(items[0], AgendaItem('Keynote', 'Doe, Jane', 1800, 300), "quoted field and MM:SS parsed")
+        self.assertEqual(items[-1], AgendaItem('Q&A', 'Jane', 600, 60), "last line without newline")
+        items.close()
+
+    def test_jsonl(self):
+        lines = b''.join(b'{"title": "Session %d", "speaker": "S%d", "duration": %d}\n' % (i, i, 60 + i)
+                         for i in range(50000))
+        progress = []
+        items = agenda_import.AgendaFile(self._write('agenda.jsonl', lines + b'not json\n'), progress.append)
+        self.assertEqual(len(items), 50001, "all lines indexed")
+        self.assertEqual(items[49999].duration, 60 + 49999, "random access")
+        self.assertTrue(items[50000].title.startswith('(invalid line'), "invalid line does not fail the agenda")
+        self.assertEqual(progress[-1], 1.0, "progress reported")
+        self.assertLessEqual(len(items._cache), agenda_import.PARSE_CACHE_SIZE, "only used items parsed")
+        items.close()
+
+    def test_rewritten(self):
+        path = self._write('agenda.jsonl', b''.join(b'{"title": "Session %d"}\n' % i for i in range(1000)))
+        items = agenda_import.AgendaFile(path)
+        with open(path, 'r+b') as f:
+            f.truncate(10)
+        self.assertTrue(items[999].title.startswith('(invalid line'), "truncated file read safely")
+        with open(path, 'wb') as f:
+            f.write(b'{"title": "Replaced"}\n')
+        self.assertEqual(items[0].title, 'Replaced', "rewritten file read")
+        items.close()
+
+    def test_empty(self):
+        items = agenda_import.AgendaFile(self._write('empty.jsonl', b''))
+        self.assertEqual(len(items), 0, "empty file")
+        items.close()
+
+    def test_loader(self):
+        # collect Tk variables left over by other tests here, not on the
+        # loader thread (where their __del__ cannot call into Tcl)
+        gc.collect()
+        path = self._write('agenda.csv', b'title,speaker\nA,B\n')
+        loop = HeadlessLoop()
+        dispatcher = Dispatcher(loop)
+        result = []
+        def done(items):
+            result.append(items)
+            loop.destroy()
+        agenda_import.AgendaLoader(path, dispatcher.call, done, done)
+        loop.after(5000, loop.destroy)
+        loop.mainloop()
+        dispatcher.close()
+        self.assertIsInstance(result[0], agenda_import.AgendaFile, "loaded on the event loop thread")
+        self.assertEqual(result[0][0].speaker, 'B')
+        result[0].close()
+
+
+if __name__ == "__main__":
+    unittest.main()
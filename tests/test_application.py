@@ -0,0 +1,36 @@
+'''
+Unit testing for Application class
+'''
+
+import argparse
+import os
+import tempfile
+import unittest
+
+from meeting_timer import webcam_output
+from meeting_timer.application import Application
+from meeting_timer.headless import HeadlessLoop
+
+
+class TestApplication(unittest.TestCase):
+    '''Tests the Application class'''
+
+    ## TESTS ##
+
+    @unittest.skipUnless(webcam_output.load(), "numpy/Pillow not installed")
+    def test_output_sink_failure(self):
+        app = Application(HeadlessLoop())
+        app.init_state()
+        path = os.path.join(tempfile.gettempdir(), 'no_such_dir', 'out.y4m')
+        args = argparse.Namespace(device=None, record=path, stream=None)
+        with self.assertLogs('meeting_timer.application', 'ERROR'):
+            app.create_output(args)
+        try:
+            self.assertIsNotNone(app.camera, "webcam output created")
+            self.assertEqual(app.camera.bus.sinks, [], "failed recorder not added")
+        finally:
+            app.camera.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
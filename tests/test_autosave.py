@@ -0,0 +1,116 @@
+'''
+Unit testing for AutoSaver class
+'''
+
+import json
+import os
+import tempfile
+import unittest
+
+from meeting_timer import autosave
+from meeting_timer import settings
+from meeting_timer.agenda import AgendaItem
+
+
+class FakeTimers(object):
+    '''Records after() calls instead of running them'''
+
+    def __init__(self):
+        self.pending = {}
+        self.cancelled = 0
+        self._next = 0
+
+    def after(self, ms, func):
+        self._next += 1
+        self.pending[self._next] = func
+        return self._next
+
+    def after_cancel(self, timer):
+        del self.pending[timer]
+        self.cancelled += 1
+
+    def run(self):
+        for func in list(self.pending.values()):
+            func()
+        self.pending.clear()
+
+
+class TestAutoSaver(unittest.TestCase):
+    '''Tests the AutoSaver class'''
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, 'meeting.mt')
+        self.timers = FakeTimers()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _saver(self, s):
+        return autosave.AutoSaver(s, self.timers.after, self.timers.after_cancel)
+
+    def _read(self):
+        with open(self.filename) as f:
+            return json.load(f)
+
+    ## TESTS ##
+
+    def test_debounce(self):
+        s = settings.Settings(self.filename)
+        saver = self._saver(s)
+        s.initial.title.set('one')
+        s.initial.title.set('two')
+        s.next.speaker.set('Jane')
+        self.assertEqual(len(self.timers.pending), 1, "one save pending")
+        self.assertEqual(self.timers.cancelled, 2, "quiet period restarted on each change")
+        
+        self.timers.run()
+        saver.close()
+        self.assertEqual(saver.saves, 1, "saved once")
+        self.assertEqual(self._read()['initial']['title'], 'two', "latest value saved")
+        self.assertEqual(self._read()['next']['speaker'], 'Jane', "all changes saved")
+
+    def test_unsaved_ignored(self):
+        s = settings.Settings(self.filename)
+        saver = self._saver(s)
+        s.display.time.set('00:10')
+        self.assertEqual(self.timers.pending, {}, "display changes not saved")
+        saver.close()
+        self.assertFalse(os.path.exists(self.filename), "nothing written")
+
+    def test_save_on_close(self):
+        s = settings.Settings(self.filename)
+        saver = self._saver(s)
+        s.agenda.load([AgendaItem('Keynote', 'Jane', 600, 60)])
+        saver.close()
+        self.assertEqual(saver.saves, 1, "pending change saved by close()")
+        self.assertEqual(self._read()['agenda'][0]['title'], 'Keynote', "agenda saved")
+        self.assertEqual(self.timers.pending, {}, "timer cancelled")
+
+    def test_unchanged_skipped(self):
+        s = settings.Settings(self.filename)
+        s.write()
+        mtime = os.stat(self.filename).st_mtime_ns
+        saver = self._saver(s)
+        s.initial.title.set('changed')
+        s.initial.title.set(settings.DEFAULTS['initial']['title'])
+        saver.close()
+        self.assertEqual((saver.saves, saver.skipped), (0, 1), "identical content not rewritten")
+        self.assertEqual(os.stat(self.filename).st_mtime_ns, mtime, "file untouched")
+
+    def test_no_filename(self):
+        s = settings.Settings()
+        saver = self._saver(s)
+        s.initial.title.set('changed')
+        saver.close()
+        self.assertEqual(saver.saves, 0, "nothing to save to")
+
+    def test_write_atomic(self):
+        with open(self.filename, 'w') as f:
+            f.write('old')
+        os.chmod(self.filename, 0o640)
+        settings.write_atomic(self.filename, b'new')
+        with open(self.filename) as f:
+            self.assertEqual(f.read(), 'new', "content replaced")
+        self.assertEqual(os.stat(self.filename).st_mode & 0o777, 0o640, "permissions kept")
+        self.assertEqual(os.listdir(self.tmp.name), ['meeting.mt'], "no temporary file left")
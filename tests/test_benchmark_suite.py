@@ -0,0 +1,44 @@
+'''
+Unit testing for the benchmark suite (see benchmarks/suite.py)
+'''
+
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks import suite
+
+
+class TestSuite(unittest.TestCase):
+    '''Tests the benchmark suite'''
+
+    ## TESTS ##
+
+    def test_compare(self):
+        baseline = {'meta': {}, 'results': {'a': 1.0, 'b': 2.0, 'c': 0.0, 'gone': 5.0}}
+        current = {'meta': {}, 'results': {'a': 1.05, 'b': 3.0, 'c': 0.0, 'new': 1.0}}
+        rows = suite.compare(current, baseline, 0.1)
+        self.assertEqual([row[0] for row in rows], ['a', 'b', 'c'], "only results in both")
+        self.assertEqual([row[4] for row in rows], [False, True, False], "slower than threshold regressed")
+        self.assertAlmostEqual(rows[1][3], 0.5, msg="fractional change")
+
+    def test_json_output(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'results.json')
+            self.assertEqual(suite.main(['colours', '-o', filename]), 0, "exit status")
+            with open(filename) as f:
+                results = json.load(f)
+            self.assertIn('python', results['meta'], "metadata saved")
+            self.assertIn('colours.to_html_ns', results['results'], "results saved")
+            
+            # a baseline that was much faster
+            for name in results['results']:
+                results['results'][name] /= 100
+            with open(filename, 'w') as f:
+                json.dump(results, f)
+            self.assertEqual(suite.main(['colours', '--compare', filename]), 1, "regression fails")
+
+
+if __name__ == '__main__':
+    unittest.main()
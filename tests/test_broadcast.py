@@ -0,0 +1,89 @@
+'''
+Unit testing for BroadcastServer class
+'''
+
+import asyncio
+import gc
+import json
+import unittest
+import urllib.request
+
+from meeting_timer import broadcast
+
+
+async def connect(address):
+    '''Open a websocket client connection, returns (reader, writer)'''
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(b'GET /ws HTTP/1.1\r\nHost: test\r\nUpgrade: websocket\r\n'
+                 b'Connection: Upgrade\r\nSec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n'
+                 b'Sec-WebSocket-Version: 13\r\n\r\n')
+    response = await reader.readuntil(b'\r\n\r\n')
+    assert b's3pPLMBiTxaQ9kYGzzhZRbK+xOo=' in response, response
+    return reader, writer
+
+
+async def receive(reader):
+    '''Read one server text message'''
+    head, length = await reader.readexactly(2)
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), 'big')
+    return json.loads(await reader.readexactly(length))
+
+
+STATE = {'title': 'Title', 'time': '05:00', 'speaker': 'Speaker',
+         'foreground': 'green', 'background': 'black'}
+
+
+class TestBroadcastServer(unittest.TestCase):
+    '''Tests the BroadcastServer class'''
+
+    def setUp(self):
+        # collect Tk variables left over by other tests here, not on the
+        # server thread (where their __del__ cannot call into Tcl)
+        gc.collect()
+        self.server = broadcast.BroadcastServer(('localhost', 0), lambda: {'frames': 1})
+        self.server.start()
+        self.server.publish(STATE, STATE.keys())
+
+    def tearDown(self):
+        self.server.close()
+
+    ## TESTS ##
+
+    def test_display_message(self):
+        state = dict(STATE, foreground='rgba(255, 255, 255, 0.5)')
+        self.assertEqual(json.loads(broadcast.display_message(state, ['background'])),
+                         {'foreground': '#808080', 'background': '#000000'}, "translucent text blended")
+        self.assertEqual(json.loads(broadcast.display_message(state, ['time'])), {'time': '05:00'}, "delta only")
+
+    def test_websocket_frame(self):
+        self.assertEqual(broadcast.websocket_frame(b'hi'), b'\x81\x02hi', "short frame")
+        self.assertEqual(broadcast.websocket_frame(b'x'*200)[:4], b'\x81\x7e\x00\xc8', "16-bit length")
+
+    def test_html_client(self):
+        url = 'http://%s:%d/' % self.server.address
+        with urllib.request.urlopen(url, timeout=5) as response:
+            self.assertIn(b'WebSocket', response.read(), "html client served")
+
+    def test_stats(self):
+        url = 'http://%s:%d/stats' % self.server.address
+        with urllib.request.urlopen(url, timeout=5) as response:
+            self.assertEqual(json.load(response), {'frames': 1}, "statistics served")
+
+    def test_snapshot_then_deltas(self):
+        async def run():
+            clients = [await connect(self.server.address) for _ in range(20)]
+            for reader, _ in clients:
+                snapshot = await receive(reader)
+                self.assertEqual(snapshot['time'], '05:00', "current state sent on connect")
+                self.assertEqual(snapshot['foreground'], '#008000', "colours sent in html notation")
+            self.server.publish(dict(STATE, time='04:59'), {'time'})
+            for reader, writer in clients:
+                self.assertEqual(await receive(reader), {'time': '04:59'}, "only changes sent")
+                writer.close()
+        asyncio.run(asyncio.wait_for(run(), 10))
+        self.assertEqual(self.server.messages, 2, "each change serialised once")
+
+
+if __name__ == "__main__":
+    unittest.main()
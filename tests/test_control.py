@@ -0,0 +1,88 @@
+'''
+Unit testing for ControlServer class
+'''
+
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from meeting_timer import control
+from meeting_timer.headless import HeadlessLoop
+
+
+class TestControlServer(unittest.TestCase):
+    '''Tests the ControlServer class'''
+
+    def setUp(self):
+        # collect Tk variables left over by other tests here, not on the
+        # client thread (where their __del__ cannot call into Tcl)
+        gc.collect()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'control.sock')
+        self.loop = HeadlessLoop()
+        self.calls = []
+        self.commits = []
+        commands = {
+            'start': lambda: self.calls.append('start'),
+            'add': lambda seconds: self.calls.append(('add', int(seconds))),
+            'status': lambda: 'running',
+        }
+        self.server = control.ControlServer(self.path, commands, lambda: self.commits.append(len(self.calls)),
+                                            self.loop.createfilehandler, self.loop.deletefilehandler)
+
+    def tearDown(self):
+        self.server.close()
+        self.tmp.cleanup()
+
+    def _send(self, lines):
+        '''Send commands from a client thread while running the event loop'''
+        result = {}
+        def client():
+            try:
+                result['responses'] = control.send_commands(self.path, lines)
+            finally:
+                self.loop.destroy()
+        thread = threading.Thread(target=client)
+        self.loop.after(5000, self.loop.destroy)
+        thread.start()
+        self.loop.mainloop()
+        thread.join()
+        return result['responses']
+
+    ## TESTS ##
+
+    def test_pipelined_batch(self):
+        responses = self._send(['start', 'add 30', 'status'])
+        self.assertEqual(responses, ['ok', 'ok', 'ok running'], "one response per command, in order")
+        self.assertEqual(self.calls, ['start', ('add', 30)], "commands applied in order")
+        self.assertEqual(self.commits, [2], "one commit for the batch")
+        self.assertEqual(self.server.stats.commands, 3, "stats.commands == 3")
+        self.assertLess(self.server.stats.latency_max, 0.05, "applied without waiting on the event loop")
+
+    def test_errors(self):
+        responses = self._send(['bogus', 'add', 'add x'])
+        self.assertTrue(responses[0].startswith('error unknown command'), "unknown command")
+        self.assertTrue(responses[1].startswith('error add'), "missing argument")
+        self.assertTrue(responses[2].startswith('error add'), "invalid argument")
+        self.assertEqual(self.server.stats.errors, 3, "stats.errors == 3")
+
+    def test_close_removes_socket(self):
+        self.server.close()
+        self.assertFalse(os.path.exists(self.path), "socket removed")
+        self.server = control.ControlServer(self.path, {}, lambda: None,
+                                            self.loop.createfilehandler, self.loop.deletefilehandler)
+
+    def test_client_repeat(self):
+        self.assertEqual(control.parse_repeat('3'), 3, "parse_repeat('3') == 3")
+        with contextlib.redirect_stderr(io.StringIO()):
+            for count in ('0', '-1', 'x'):
+                with self.assertRaises(SystemExit):
+                    control.client_main(['--socket', self.path, '--repeat', count, 'status'])
+
+
+if __name__ == "__main__":
+    unittest.main()
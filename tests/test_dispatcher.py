@@ -0,0 +1,49 @@
+'''
+Unit testing for Dispatcher class
+'''
+
+import threading
+import unittest
+
+from meeting_timer.dispatcher import Dispatcher
+from meeting_timer.headless import HeadlessLoop
+
+
+class PollingLoop(HeadlessLoop):
+    '''Event loop without file handler support (as Tk on Windows)'''
+
+    def createfilehandler(self, file, mask, func):
+        raise NotImplementedError
+
+
+class TestDispatcher(unittest.TestCase):
+    '''Tests the Dispatcher class'''
+
+    def _run(self, loop):
+        '''Dispatch a failing call then two more from another thread'''
+        dispatcher = Dispatcher(loop)
+        result = []
+        def fail():
+            raise RuntimeError('callback failed')
+        def calls():
+            dispatcher.call(fail)
+            dispatcher.call(result.append, 1)
+            dispatcher.call(lambda: dispatcher.call(loop.destroy))
+        with self.assertLogs('meeting_timer.dispatcher', 'ERROR'):
+            loop.after(0, threading.Thread(target=calls).start)
+            loop.after(5000, loop.destroy)
+            loop.mainloop()
+        dispatcher.close()
+        return result
+
+    ## TESTS ##
+
+    def test_failing_call(self):
+        self.assertEqual(self._run(HeadlessLoop()), [1], "calls after a failure still run")
+
+    def test_failing_call_polling(self):
+        self.assertEqual(self._run(PollingLoop()), [1], "polling continues after a failure")
+
+
+if __name__ == "__main__":
+    unittest.main()
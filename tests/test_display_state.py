@@ -0,0 +1,62 @@
+'''
+Unit testing for DisplayStateBus class
+'''
+
+import tkinter as tk
+import unittest
+
+from meeting_timer import display_state
+from meeting_timer.application import Application
+
+
+class TestDisplayStateBus(unittest.TestCase):
+    '''Tests the DisplayStateBus class'''
+
+    ## TESTS ##
+
+    def test_flush(self):
+        bus = display_state.DisplayStateBus()
+        calls = []
+        bus.subscribe(lambda state, changed: calls.append((state, changed)))
+        bus.set('title', 'Hello')
+        bus.set('time', '01:00')
+        self.assertEqual(calls, [], "nothing dispatched before flush")
+        bus.flush()
+        self.assertEqual(len(calls), 1, "one dispatch per flush")
+        self.assertEqual(calls[0][0], {'title': 'Hello', 'time': '01:00'})
+        self.assertEqual(calls[0][1], frozenset(('title', 'time')))
+        bus.flush()
+        self.assertEqual(len(calls), 1, "no dispatch without changes")
+
+    def test_unchanged_value(self):
+        bus = display_state.DisplayStateBus()
+        calls = []
+        bus.subscribe(lambda state, changed: calls.append(changed))
+        bus.set('title', 'Hello')
+        bus.flush()
+        bus.set('title', 'Hello')
+        bus.flush()
+        self.assertEqual(len(calls), 1, "re-setting the same value does not dispatch")
+
+    def test_schedule(self):
+        scheduled = []
+        bus = display_state.DisplayStateBus(scheduled.append)
+        bus.set('title', 'Hello')
+        bus.set('speaker', 'Tom')
+        self.assertEqual(scheduled, [bus.flush], "flush scheduled once per batch")
+
+    def test_next_renders_once(self):
+        app = Application()
+        app.init_state()
+        app.master.update()
+        renders = []
+        app.display_state.subscribe(lambda state, changed: renders.append(changed))
+        app.next()
+        app.master.update()
+        self.assertEqual(len(renders), 1, "one dispatch per Application.next()")
+        self.assertTrue({'title', 'speaker', 'time', 'foreground'} >= renders[0])
+        app.master.destroy()
+
+
+if __name__ == '__main__':
+    unittest.main()
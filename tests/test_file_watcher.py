@@ -0,0 +1,132 @@
+'''
+Unit testing for FileWatcher and SettingsReloader classes
+'''
+
+import gc
+import json
+import os
+import queue
+import tempfile
+import threading
+import unittest
+
+from meeting_timer import agenda_import
+from meeting_timer import file_watcher
+from meeting_timer import settings
+from meeting_timer.agenda import AgendaItem
+
+
+def replace_file(filename, content):
+    '''Write a file the way generators do (atomically)'''
+    settings.write_atomic(filename, json.dumps(content).encode('utf-8'))
+
+
+class TestFileWatcher(unittest.TestCase):
+    '''Tests the FileWatcher class'''
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, 'meeting.mt')
+        replace_file(self.filename, {})
+        self.changed = threading.Event()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _check(self, use_inotify):
+        watcher = file_watcher.FileWatcher(lambda: self.filename, lambda f: self.changed.set(),
+                                           interval=0.01, use_inotify=use_inotify)
+        try:
+            if use_inotify and watcher.polling:
+                self.skipTest('inotify not available')
+            self.assertFalse(self.changed.wait(0.1), "existing file is not a change")
+            replace_file(self.filename, {"finished_text": "END"})
+            self.assertTrue(self.changed.wait(5), "replaced file noticed")
+        finally:
+            watcher.stop()
+
+    ## TESTS ##
+
+    def test_polling(self):
+        self._check(False)
+
+    def test_inotify(self):
+        self._check(True)
+
+    def test_other_files_ignored(self):
+        watcher = file_watcher.FileWatcher(lambda: self.filename, lambda f: self.changed.set(), interval=0.01)
+        try:
+            replace_file(os.path.join(self.tmp.name, 'other.mt'), {})
+            self.assertFalse(self.changed.wait(0.2), "other files in the directory ignored")
+        finally:
+            watcher.stop()
+
+
+class TestSettingsReloader(unittest.TestCase):
+    '''Tests the SettingsReloader class'''
+
+    def setUp(self):
+        # collect Tk variables left over by other tests here, not on the
+        # watcher thread (where their __del__ cannot call into Tcl)
+        gc.collect()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, 'meeting.mt')
+        self.settings = settings.Settings(self.filename)
+        self.settings.write()
+        self.calls = queue.Queue()
+        self.imports = []
+        self.reloader = file_watcher.SettingsReloader(self.settings, lambda func, *args: self.calls.put((func, args)),
+                                                      self.imports.append, interval=0.01)
+
+    def tearDown(self):
+        self.reloader.close()
+        self.tmp.cleanup()
+
+    def _run_next(self):
+        '''Run the next dispatched call as the event loop would'''
+        func, args = self.calls.get(timeout=5)
+        func(*args)
+
+    ## TESTS ##
+
+    def test_reload(self):
+        changes = []
+        self.settings.subscribe(changes.append)
+        content = self.settings.dump()
+        content['next']['speaker'] = 'Tom Thumb'
+        content['agenda'] = [AgendaItem('Keynote', 'Jane', 600, 60)]
+        replace_file(self.filename, json.loads(settings.serialise(content)))
+        self._run_next()
+        self.assertEqual(self.settings.next.speaker.get(), 'Tom Thumb', "changed value applied")
+        self.assertEqual(changes, [{'next.speaker'}], "only the changed value notified")
+        self.assertEqual(self.settings.agenda.items, [AgendaItem('Keynote', 'Jane', 600, 60)], "agenda reloaded")
+        self.assertEqual(self.reloader.reloads, 1, "counted")
+
+    def test_imported_agenda_kept(self):
+        path = os.path.join(self.tmp.name, 'agenda.csv')
+        with open(path, 'w') as f:
+            f.write('Title,Speaker,Duration,Warning\nKeynote,Jane,600,60\n')
+        items = agenda_import.AgendaFile(path)
+        self.settings.agenda.load(items)
+        replace_file(self.filename, {"next": {"speaker": "Tom Thumb"}})
+        self._run_next()
+        self.assertEqual(self.settings.next.speaker.get(), 'Tom Thumb', "changed value applied")
+        self.assertIs(self.settings.agenda.items, items, "imported agenda kept")
+        self.assertEqual(len(self.settings.agenda), 1, "len(agenda) == 1")
+
+    def test_agenda_file(self):
+        replace_file(self.filename, {"agenda_file": "agenda.csv"})
+        self._run_next()
+        self.assertEqual(self.imports, [os.path.join(self.tmp.name, 'agenda.csv')], "agenda file imported")
+
+    def test_own_write_ignored(self):
+        self.settings.next.speaker.set('Tom Thumb')
+        self.settings.write()
+        with self.assertRaises(queue.Empty):
+            self.calls.get(timeout=0.2)
+
+    def test_invalid_ignored(self):
+        with open(self.filename, 'w') as f:
+            f.write('{"next": ')
+        with self.assertRaises(queue.Empty):
+            self.calls.get(timeout=0.2)
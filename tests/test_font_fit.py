@@ -0,0 +1,45 @@
+'''
+Unit testing for FontFitter class
+'''
+
+import unittest
+
+from meeting_timer import font_fit
+
+
+def measure(font, size, text):
+    '''Fake font: characters are 0.6 of the size wide, lines 1.2 high'''
+    return int(len(text) * size * 0.6), int(size * 1.2)
+
+
+class TestFontFitter(unittest.TestCase):
+    '''Tests the FontFitter class'''
+
+    ## TESTS ##
+
+    def test_text_shape(self):
+        self.assertEqual(font_fit.text_shape('09:59'), '00:00', "digits share a shape")
+        self.assertEqual(font_fit.text_shape('STOP'), 'STOP', "text unchanged")
+
+    def test_fit(self):
+        fitter = font_fit.FontFitter(measure)
+        self.assertEqual(fitter.fit('time', '09:00', 600, 1000), 200, "limited by width")
+        self.assertEqual(fitter.fit('time', '09:00', 6000, 120), 100, "limited by height")
+        self.assertEqual(fitter.fit('time', '09:00', 1, 1), font_fit.MIN_FONT_SIZE, "never below the minimum")
+        self.assertEqual(fitter.fit('text', '', 6000, 6000), font_fit.MAX_FONT_SIZE, "never above the maximum")
+
+    def test_cached(self):
+        fitter = font_fit.FontFitter(measure)
+        size = fitter.fit('time', '09:00', 600, 1000)
+        measurements = fitter.measurements
+        self.assertLessEqual(measurements, 11, "binary search")
+        self.assertEqual(fitter.fit('time', '08:59', 600, 1000), size, "same shape")
+        self.assertEqual(fitter.fit('time', '08:58', 650, 1000), 216, "other width")
+        resized = fitter.measurements
+        self.assertLess(resized - measurements, measurements, "resized fit reuses measurements")
+        fitter.fit('time', '07:57', 650, 1000)
+        self.assertEqual(fitter.measurements, resized, "repeated fit is not measured")
+
+
+if __name__ == '__main__':
+    unittest.main()
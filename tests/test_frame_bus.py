@@ -0,0 +1,93 @@
+'''
+Unit testing for FrameBus and frame sink classes
+'''
+
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+try:
+    import numpy as np
+    from meeting_timer import frame_bus
+    NUMPY_SUPPORT = True
+except ImportError:
+    NUMPY_SUPPORT = False
+
+
+if NUMPY_SUPPORT:
+    class SlowSink(frame_bus.FrameSink):
+        '''Sink that blocks until released'''
+
+        def __init__(self):
+            frame_bus.FrameSink.__init__(self, 'slow', queue_size=2)
+            self.release = threading.Event()
+            self.written = []
+
+        def write(self, frame, timestamp):
+            self.release.wait()
+            self.written.append(frame)
+
+
+def make_frame(value, width=4, height=2):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+@unittest.skipUnless(NUMPY_SUPPORT, "numpy not installed")
+class TestFrameBus(unittest.TestCase):
+    '''Tests the FrameBus and FrameSink classes'''
+
+    ## TESTS ##
+
+    def test_drop_oldest(self):
+        bus = frame_bus.FrameBus()
+        slow = SlowSink()
+        bus.add(slow)
+        for value in range(10):
+            bus.publish(value, value)
+        slow.release.set()
+        bus.close()
+        self.assertEqual(slow.written[-1], 9, "newest frame always written")
+        self.assertEqual(slow.frames_written + slow.frames_dropped, 10, "every frame written or dropped")
+        self.assertGreaterEqual(slow.frames_dropped, 7, "queue bounded")
+        self.assertEqual(bus.sinks, [], "sinks removed on close")
+
+    def test_y4m_constant_rate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'out.y4m')
+            recorder = frame_bus.Y4MRecorder(path, 4, 2, 10)
+            recorder.start()
+            recorder.push(make_frame(0), 100.0)
+            recorder.push(make_frame(255), 100.5)
+            recorder.close()
+            with open(path, 'rb') as f:
+                data = f.read()
+        header, _, body = data.partition(b'\n')
+        self.assertTrue(header.startswith(b'YUV4MPEG2 W4 H2 F10:1'), "y4m header")
+        frames = body.split(b'FRAME\n')[1:]
+        self.assertEqual(len(frames), 6, "first frame repeated until the second at 10fps")
+        self.assertEqual(frames[0][:8], bytes(8), "black luma")
+        self.assertEqual(frames[5][:8], b'\xff'*8, "white luma")
+        self.assertEqual(frames[5][8:], b'\x80'*16, "white chroma neutral")
+
+    def test_stream(self):
+        sink = frame_bus.StreamSink(('localhost', 0), 4, 2)
+        sink.start()
+        try:
+            sink.push(make_frame(1), 0)
+            client = socket.create_connection(sink.address, timeout=5)
+            reader = client.makefile('rb')
+            self.assertEqual(reader.readline(), b'RGB24 4x2\n', "stream header")
+            self.assertEqual(reader.read(24), b'\x01'*24, "current frame sent on connect")
+            sink.push(make_frame(2), 1)
+            self.assertEqual(reader.read(24), b'\x02'*24, "new frame streamed")
+            self.assertTrue(sink.attached, "client attached")
+            reader.close()
+            client.close()
+        finally:
+            sink.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
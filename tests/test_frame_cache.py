@@ -0,0 +1,77 @@
+'''
+Unit testing for FrameCache and PreRenderer classes
+'''
+
+import gc
+import os
+import tempfile
+import time
+import unittest
+
+try:
+    import numpy as np
+    from meeting_timer import frame_cache
+    RENDER_SUPPORT = True
+except ImportError:
+    RENDER_SUPPORT = False
+
+
+def make_frame(value, size=100):
+    return np.full((size,), value, dtype=np.uint8)
+
+
+@unittest.skipUnless(RENDER_SUPPORT, "numpy/Pillow not installed")
+class TestFrameCache(unittest.TestCase):
+    '''Tests the FrameCache class'''
+
+    ## TESTS ##
+
+    def test_get_put(self):
+        cache = frame_cache.FrameCache(1000)
+        self.assertIsNone(cache.get('a'), "cache.get('a') is None")
+        cache.put('a', make_frame(1))
+        self.assertEqual(cache.get('a')[0], 1, "cache.get('a')[0] == 1")
+        self.assertEqual((cache.hits, cache.misses), (1, 1), "one hit, one miss")
+        self.assertFalse(cache.get('a').flags.writeable, "cached frames are read-only")
+
+    def test_lru_eviction(self):
+        cache = frame_cache.FrameCache(300)
+        for key in 'abc':
+            cache.put(key, make_frame(ord(key)))
+        cache.get('a')
+        cache.put('d', make_frame(4))
+        self.assertIsNone(cache.get('b'), "least recently used frame evicted")
+        self.assertIsNotNone(cache.get('a'), "recently used frame kept")
+        self.assertEqual(cache.nbytes, 300, "cache.nbytes == 300")
+
+    def test_spill(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = frame_cache.FrameCache(200, os.path.join(tmpdir, 'spill'), 1000)
+            for key in 'abcd':
+                cache.put(key, make_frame(ord(key)))
+            self.assertEqual(len(cache), 2, "len(cache) == 2")
+            frame = cache.get('a')
+            self.assertIsNotNone(frame, "evicted frame restored from spill file")
+            self.assertEqual(frame[0], ord('a'), "spilled frame content preserved")
+            cache.clear()
+
+    def test_prerender(self):
+        # collect Tk variables left over by other tests here, not on the
+        # pre-render thread (where their __del__ cannot call into Tcl)
+        gc.collect()
+        cache = frame_cache.FrameCache()
+        prerenderer = frame_cache.PreRenderer(cache, 160, 90, window=3)
+        states = [("Title", f"00:0{i}", "Speaker", "green", "black") for i in range(9, 0, -1)]
+        prerenderer.schedule(states)
+        keys = [frame_cache.mask_key(*state[:3], (160, 90)) for state in states]
+        deadline = time.time() + 10
+        while keys[2] not in cache and time.time() < deadline:
+            time.sleep(0.01)
+        prerenderer.stop()
+        self.assertEqual([k in cache for k in keys[:4]], [True, True, True, False],
+                         "only the look-ahead window is rendered")
+        self.assertEqual(cache.get(keys[0]).shape, (90, 160), "text coverage masks are rendered")
+
+
+if __name__ == '__main__':
+    unittest.main()
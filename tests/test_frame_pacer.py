@@ -0,0 +1,78 @@
+'''
+Unit testing for FramePacer class
+'''
+
+import unittest
+
+from meeting_timer import frame_pacer
+
+
+class FakeClock(object):
+    '''Manually advanced clock'''
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFramePacer(unittest.TestCase):
+    '''Tests the FramePacer class'''
+
+    ## TESTS ##
+
+    def _run(self, pacer, clock, versions, until, step=0.01):
+        '''Poll the pacer every step seconds; versions(now) gives the frame version'''
+        while clock.now < until:
+            if pacer.due(versions(clock.now), clock.now):
+                pacer.sent(clock.now)
+            clock.now += step
+
+    def test_static_frame_keepalive(self):
+        clock = FakeClock()
+        pacer = frame_pacer.FramePacer(10, 1, burst=3, clock=clock)
+        self._run(pacer, clock, lambda now: 1, 10)
+        # burst of 3 at 10fps then 1fps for the remaining ~9.8s
+        self.assertLessEqual(pacer.frames_sent, 14, "static frame sent at keep-alive rate")
+        self.assertGreaterEqual(pacer.frames_sent, 12, "keep-alive frames still sent")
+        self.assertGreater(pacer.frames_skipped(clock.now), 80, "skipped frames counted")
+
+    def test_change_sends_immediately(self):
+        clock = FakeClock()
+        pacer = frame_pacer.FramePacer(10, 1, clock=clock)
+        self._run(pacer, clock, lambda now: 1, 5)
+        sent = pacer.frames_sent
+        self.assertTrue(pacer.due(2, clock.now), "new version is due straight away")
+        pacer.sent(clock.now)
+        self.assertAlmostEqual(pacer.next_due(clock.now), 0.1, 6, "burst continues at full rate")
+        self.assertEqual(pacer.frames_sent, sent + 1)
+
+    def test_counting_down(self):
+        clock = FakeClock()
+        pacer = frame_pacer.FramePacer(10, 1, burst=3, clock=clock)
+        self._run(pacer, clock, lambda now: int(now), 10)
+        # each second: 1 change + 2 repeats in the burst + ~0 keep-alive
+        self.assertLessEqual(pacer.frames_sent, 40, "rate drops between changes")
+        self.assertGreaterEqual(pacer.frames_sent, 30, "every change is sent with a burst")
+
+    def test_configure(self):
+        pacer = frame_pacer.FramePacer(10, 1)
+        pacer.configure(30, 60)
+        self.assertEqual(pacer.fps, 30)
+        self.assertEqual(pacer.keepalive_fps, 30, "keep-alive limited to fps")
+        pacer.configure(0, 0)
+        self.assertEqual(pacer.fps, 30, "invalid rates ignored")
+
+    def test_invalid_rates(self):
+        pacer = frame_pacer.FramePacer(0, 0, clock=lambda: 0.0)
+        self.assertEqual((pacer.fps, pacer.keepalive_fps),
+                         (frame_pacer.DEFAULT_FPS, frame_pacer.DEFAULT_KEEPALIVE_FPS), "defaults used")
+        self.assertTrue(pacer.due(1), "first frame due")
+        pacer.sent()
+        self.assertFalse(pacer.due(1), "repeat not due yet")
+        self.assertGreater(pacer.next_due(), 0, "repeat paced")
+
+
+if __name__ == "__main__":
+    unittest.main()
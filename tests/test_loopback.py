@@ -0,0 +1,116 @@
+'''
+Unit testing for YUYVConverter class and loopback device discovery
+'''
+
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    from meeting_timer import loopback
+    NUMPY_SUPPORT = True
+except ImportError:
+    NUMPY_SUPPORT = False
+
+
+@unittest.skipUnless(NUMPY_SUPPORT, "numpy not installed")
+class TestYUYVConverter(unittest.TestCase):
+    '''Tests the YUYVConverter class'''
+
+    ## TESTS ##
+
+    def test_matches_float_conversion(self):
+        rgb = np.random.default_rng(1).integers(0, 256, (8, 16, 3), dtype=np.uint8)
+        buffer = loopback.YUYVConverter(16, 8).convert(rgb)
+
+        m = np.array([[0.299, 0.587, 0.114],
+                      [-0.168736, -0.331264, 0.5],
+                      [0.5, -0.418688, -0.081312]])
+        yuv = rgb.astype(float) @ m.T + (0, 128, 128)
+        self.assertLessEqual(np.abs(buffer[:, 0::2] - yuv[..., 0]).max(), 1.5, "Y within rounding")
+        self.assertLessEqual(np.abs(buffer[:, 1::4] - np.clip(yuv[:, 0::2, 1], 0, 255)).max(), 1.5, "U within rounding")
+        self.assertLessEqual(np.abs(buffer[:, 3::4] - np.clip(yuv[:, 0::2, 2], 0, 255)).max(), 1.5, "V within rounding")
+
+    def test_extremes(self):
+        converter = loopback.YUYVConverter(2, 1)
+        for colour, expected in (((0, 0, 0), (0, 128, 0, 128)),
+                                 ((255, 255, 255), (255, 128, 255, 128)),
+                                 ((0, 0, 255), (29, 255, 29, 107))):
+            rgb = np.array([[colour, colour]], dtype=np.uint8)
+            self.assertEqual(tuple(converter.convert(rgb)[0]), expected, f"convert({colour})")
+
+    def test_colourise_matches_convert(self):
+        from meeting_timer import renderer
+        mask = np.random.default_rng(2).integers(0, 256, (8, 16), dtype=np.uint8)
+        converter = loopback.YUYVConverter(16, 8)
+        for fg, bg in (((0, 128, 0), (0, 0, 0)), ((255, 165, 0), (16, 32, 48)), ((255, 255, 255), (0, 0, 255))):
+            palette = renderer.Palette(fg, bg)
+            expected = converter.convert(palette.colourise(mask)).copy()
+            self.assertTrue((converter.colourise(mask, palette) == expected).all(), f"colourise() with {fg} on {bg}")
+
+    def test_buffer_reused(self):
+        converter = loopback.YUYVConverter(4, 2)
+        rgb = np.zeros((2, 4, 3), dtype=np.uint8)
+        self.assertIs(converter.convert(rgb), converter.convert(rgb), "preallocated buffer returned")
+
+
+def make_sysfs(root, count=16, loopback=(3, 12)):
+    '''Fake /sys/class/video4linux and /dev with count video nodes'''
+    sysfs = os.path.join(root, 'sys')
+    dev = os.path.join(root, 'dev')
+    os.makedirs(dev)
+    for i in range(count):
+        node = os.path.join(sysfs, f'video{i}')
+        os.makedirs(node)
+        with open(os.path.join(node, 'name'), 'w') as f:
+            f.write('Dummy video device\n' if i in loopback else 'Capture card\n')
+        if i in loopback:
+            with open(os.path.join(node, 'max_openers'), 'w') as f:
+                f.write('10\n')
+        open(os.path.join(dev, f'video{i}'), 'w').close()
+    return sysfs, dev
+
+
+class TestDiscovery(unittest.TestCase):
+    '''Tests the loopback device discovery'''
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sysfs, self.dev = make_sysfs(self.tmp.name)
+        self.cache = os.path.join(self.tmp.name, 'cache', 'device')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _discover(self, device=None):
+        return loopback.discover_loopback(device, self.cache, self.sysfs, self.dev)
+
+    ## TESTS ##
+
+    def test_find(self):
+        self.assertEqual(loopback.find_loopback_devices(self.sysfs, self.dev),
+                         [os.path.join(self.dev, 'video3'), os.path.join(self.dev, 'video12')],
+                         "only loopback devices, in number order")
+        self.assertEqual(loopback.find_loopback_devices(os.path.join(self.tmp.name, 'none')), [], "no sysfs")
+
+    def test_cached(self):
+        self.assertEqual(self._discover(), os.path.join(self.dev, 'video3'), "first loopback device")
+        with open(self.cache, 'w') as f:
+            f.write(os.path.join(self.dev, 'video12'))
+        self.assertEqual(self._discover(), os.path.join(self.dev, 'video12'), "device used last time")
+        with open(self.cache, 'w') as f:
+            f.write(os.path.join(self.dev, 'video5'))
+        self.assertEqual(self._discover(), os.path.join(self.dev, 'video3'), "cached device no longer a loopback")
+
+    def test_explicit(self):
+        self.assertEqual(self._discover('/dev/video7'), '/dev/video7', "explicit device used as given")
+        self.assertFalse(os.path.exists(self.cache), "explicit device not remembered")
+
+    def test_none(self):
+        sysfs, dev = make_sysfs(os.path.join(self.tmp.name, 'empty'), loopback=())
+        self.assertIsNone(loopback.discover_loopback(None, '', sysfs, dev), "no loopback device")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+'''
+Unit testing for Histogram and Metrics classes
+'''
+
+import json
+import unittest
+
+from meeting_timer import metrics
+
+
+class TestHistogram(unittest.TestCase):
+    '''Tests the Histogram class'''
+
+    ## TESTS ##
+
+    def test_record(self):
+        h = metrics.Histogram()
+        for value in (0.0003, 0.0004, 0.004, 0.02):
+            h.record(value)
+        self.assertEqual(h.count, 4, "h.count == 4")
+        self.assertAlmostEqual(h.mean, 0.006175)
+        self.assertEqual(h.max, 0.02, "h.max == 0.02")
+        self.assertEqual(h.percentile(0.5), 0.0005, "median bucket")
+        self.assertEqual(h.percentile(0.99), 0.02, "limited to the maximum")
+
+    def test_overflow(self):
+        h = metrics.Histogram((0.1, 1.0))
+        h.record(0.1)
+        h.record(5.0)
+        self.assertEqual(h.snapshot()['buckets'], {'0.1': 1, '+Inf': 1}, "non-empty buckets")
+        self.assertEqual(h.percentile(0.95), 5.0, "overflow reports the maximum")
+
+    def test_empty(self):
+        h = metrics.Histogram()
+        self.assertEqual((h.mean, h.percentile(0.95)), (0.0, 0.0), "no values")
+
+
+class TestMetrics(unittest.TestCase):
+    '''Tests the Metrics class'''
+
+    ## TESTS ##
+
+    def test_snapshot(self):
+        m = metrics.Metrics()
+        m.record('tick.lateness', 0.002)
+        with m.timer('settings.write'):
+            pass
+        m.count('errors')
+        m.count('errors')
+        snapshot = json.loads(json.dumps(m.snapshot()))
+        self.assertEqual(sorted(snapshot['histograms']), ['settings.write', 'tick.lateness'], "histograms")
+        self.assertEqual(snapshot['histograms']['tick.lateness']['p95'], 0.002, "percentile")
+        self.assertEqual(snapshot['counters'], {'errors': 2}, "counters")
+
+    def test_summary(self):
+        m = metrics.Metrics()
+        self.assertEqual(m.summary(), 'nothing recorded')
+        m.record('render.duration', 0.015)
+        self.assertEqual(m.summary(), 'render.duration p95=15.00ms max=15.00ms')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+'''
+Unit testing for FrameBuffer and RenderWorker classes
+'''
+
+import gc
+import time
+import unittest
+
+try:
+    from meeting_timer import frame_cache
+    from meeting_timer import render_worker
+    from meeting_timer import renderer
+    RENDER_SUPPORT = True
+except ImportError:
+    RENDER_SUPPORT = False
+
+
+def make_state(time_text):
+    return {'title': 'Title', 'time': time_text, 'speaker': 'Speaker',
+            'foreground': 'green', 'background': 'black'}
+
+
+@unittest.skipUnless(RENDER_SUPPORT, "numpy/Pillow not installed")
+class TestFrameBuffer(unittest.TestCase):
+    '''Tests the FrameBuffer class'''
+
+    ## TESTS ##
+
+    def test_swap(self):
+        buffer = render_worker.FrameBuffer()
+        self.assertIsNone(buffer.swap(), "nothing published")
+        buffer.publish('a')
+        self.assertEqual(buffer.swap(), 'a', "buffer.swap() == 'a'")
+        self.assertEqual(buffer.swap(), 'a', "front kept until next publish")
+        self.assertEqual(buffer.version, 1, "buffer.version == 1")
+        buffer.publish('b')
+        buffer.publish('c')
+        self.assertEqual(buffer.swap(), 'c', "newest frame wins")
+        self.assertEqual(buffer.version, 2, "buffer.version == 2")
+
+
+@unittest.skipUnless(RENDER_SUPPORT, "numpy/Pillow not installed")
+class TestRenderWorker(unittest.TestCase):
+    '''Tests the RenderWorker class'''
+
+    def setUp(self):
+        # collect Tk variables left over by other tests here, not on the
+        # render thread (where their __del__ cannot call into Tcl)
+        gc.collect()
+
+    ## TESTS ##
+
+    def test_render(self):
+        cache = frame_cache.FrameCache()
+        buffer = render_worker.FrameBuffer()
+        worker = render_worker.RenderWorker(cache, 160, 90, buffer)
+        worker.submit(make_state('01:00'))
+        frame = wait_for_frame(buffer)
+        self.assertEqual(frame.shape, (90, 160, 3), "frame.shape == (90, 160, 3)")
+
+        # cached frames are re-used rather than re-rendered
+        worker.submit(make_state('00:59'))
+        wait_for_frame(buffer)
+        worker.submit(make_state('01:00'))
+        self.assertIs(wait_for_frame(buffer), frame, "cached frame published")
+        worker.stop()
+        self.assertEqual(worker.render_count, 2, "worker.render_count == 2")
+
+    def test_colour_change(self):
+        cache = frame_cache.FrameCache()
+        buffer = render_worker.FrameBuffer()
+        worker = render_worker.RenderWorker(cache, 160, 90, buffer)
+        worker.submit(make_state('00:10'))
+        green = wait_for_frame(buffer)
+        worker.submit(dict(make_state('00:10'), foreground='orange'))
+        orange = wait_for_frame(buffer)
+        worker.stop()
+        self.assertEqual(worker.render_count, 1, "text rendered once")
+        self.assertIs(orange.mask, green.mask, "frames coloured from the same mask")
+        self.assertFalse((orange == green).all(), "colours differ")
+
+    def test_incremental(self):
+        buffer = render_worker.FrameBuffer()
+        worker = render_worker.RenderWorker(frame_cache.FrameCache(), 160, 90, buffer)
+        for text in ('00:10', '00:09', '00:08', 'STOP'):
+            worker.submit(make_state(text))
+            frame = wait_for_frame(buffer)
+            full = renderer.colourise(renderer.FrameRenderer(160, 90).render_mask('Title', text, 'Speaker'),
+                                      renderer.get_palette('green', 'black'))
+            self.assertTrue((frame == full).all(), f"incremental frame of '{text}' matches colouring the mask")
+        worker.stop()
+        self.assertEqual((worker.render_count, worker.colour_count), (4, 0), "ticks never colour a whole mask")
+
+    def test_cached_mask(self):
+        cache = frame_cache.FrameCache()
+        buffer = render_worker.FrameBuffer()
+        worker = render_worker.RenderWorker(cache, 160, 90, buffer)
+        worker.submit(make_state('00:10'))
+        green = wait_for_frame(buffer)
+        worker.submit(dict(make_state('00:10'), title='Next'))
+        wait_for_frame(buffer)
+        worker.submit(dict(make_state('00:10'), foreground='orange'))
+        orange = wait_for_frame(buffer)
+        worker.stop()
+        self.assertEqual((worker.render_count, worker.colour_count), (2, 1), "switched back by colouring the mask")
+        self.assertIs(orange.mask, green.mask, "frames coloured from the same mask")
+
+    def test_scaled(self):
+        buffer = render_worker.FrameBuffer()
+        worker = render_worker.RenderWorker(frame_cache.FrameCache(), 320, 180, buffer, scale=2)
+        worker.submit(make_state('00:10'))
+        frame = wait_for_frame(buffer)
+        worker.stop()
+        small = renderer.FrameRenderer(160, 90).render('Title', '00:10', 'Speaker', 'green', 'black')
+        self.assertEqual(frame.shape, (180, 320, 3), "full size frame")
+        self.assertTrue((frame[::2, ::2] == small).all(), "scaled up from half size")
+
+    def test_error_logged(self):
+        buffer = render_worker.FrameBuffer()
+        worker = render_worker.RenderWorker(frame_cache.FrameCache(), 160, 90, buffer)
+        with self.assertLogs('meeting_timer.render_worker', 'ERROR'):
+            worker.submit({'title': 'Incomplete state'})
+            while worker.busy:
+                time.sleep(0.005)
+        worker.submit(make_state('00:09'))
+        frame = wait_for_frame(buffer)
+        worker.stop()
+        self.assertEqual(frame.shape, (90, 160, 3), "worker still rendering")
+
+
+def wait_for_frame(buffer, timeout=10):
+    '''Wait for the next published frame'''
+    version = buffer.version
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        frame = buffer.swap()
+        if buffer.version != version:
+            return frame
+        time.sleep(0.005)
+    raise AssertionError("no frame published")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+'''
+Unit testing for FrameRenderer class
+'''
+
+import unittest
+
+try:
+    import numpy as np
+    from meeting_timer import renderer
+    RENDER_SUPPORT = True
+except ImportError:
+    RENDER_SUPPORT = False
+
+
+@unittest.skipUnless(RENDER_SUPPORT, "numpy/Pillow not installed")
+class TestFrameRenderer(unittest.TestCase):
+    '''Tests the FrameRenderer class'''
+
+    ## TESTS ##
+
+    def test_frame_shape(self):
+        r = renderer.FrameRenderer(320, 180)
+        frame = r.render("Title", "09:00", "Speaker", "green", "black")
+        self.assertEqual(frame.shape, (180, 320, 3), "frame.shape == (180, 320, 3)")
+        self.assertEqual(frame.dtype, np.uint8, "frame.dtype == uint8")
+
+    def test_background(self):
+        r = renderer.FrameRenderer(320, 180)
+        frame = r.render("", "", "", "green", "#102030")
+        self.assertTrue((frame == (0x10, 0x20, 0x30)).all(), "blank frame is all background")
+
+    def test_incremental_matches_full(self):
+        r = renderer.FrameRenderer(320, 180)
+        for text in ("10:00", "09:59", "09:58", "STOP", "09:00", "9:00"):
+            incremental = r.render("Title", text, "Speaker", "green", "black").copy()
+            full = renderer.FrameRenderer(320, 180).render("Title", text, "Speaker", "green", "black")
+            self.assertTrue((incremental == full).all(), f"incremental render of '{text}' matches full render")
+
+    def test_colour_change(self):
+        r = renderer.FrameRenderer(320, 180)
+        r.render("Title", "09:59", "Speaker", "green", "black")
+        recoloured = r.render("Title", "09:59", "Speaker", "red", "white").copy()
+        full = renderer.FrameRenderer(320, 180).render("Title", "09:59", "Speaker", "red", "white")
+        self.assertTrue((recoloured == full).all(), "recoloured render matches full render")
+
+    def test_scaled(self):
+        small = renderer.FrameRenderer(320, 180).render("Title", "09:59", "Speaker", "green", "navy")
+        r = renderer.FrameRenderer(641, 361, scale=2)
+        self.assertEqual(renderer.render_scale(3840), 3, "4K rasterised at a third")
+        r.render("Title", "09:59", "Speaker", "red", "navy")
+        frame = r.render("Title", "09:59", "Speaker", "green", "navy")
+        self.assertEqual(frame.shape, (361, 641, 3), "full size frame")
+        self.assertTrue((frame[:360, :640] == np.repeat(np.repeat(small, 2, 0), 2, 1)).all(), "scaled up")
+        self.assertTrue((frame[360:] == (0, 0, 128)).all() and (frame[:, 640:] == (0, 0, 128)).all(),
+                        "remainder is background")
+        mask = r.render_mask("Title", "09:58", "Speaker")
+        small_mask = renderer.FrameRenderer(320, 180).render_mask("Title", "09:58", "Speaker")
+        self.assertTrue((mask[:360:2, :640:2] == small_mask).all(), "incremental mask scaled up")
+
+    def test_clamped(self):
+        self.assertEqual(renderer.clamp_size(10, 3, 50), (renderer.MIN_WIDTH, renderer.MIN_HEIGHT, 1), "minimum size")
+        self.assertEqual(renderer.clamp_size(1280, 64, 10), (1280, 64, 4), "layout at least MIN_HEIGHT high")
+        self.assertEqual(renderer.clamp_size(1280, 720, -1), (1280, 720, None), "automatic scale")
+        r = renderer.FrameRenderer(12800, 20)
+        self.assertEqual(r.scale, 1, "automatic scale limited by the height")
+        frame = renderer.FrameRenderer(64, 6, scale=8).render("Title", "09:59", "Speaker", "green", "black")
+        self.assertEqual(frame.shape, (renderer.MIN_HEIGHT, 64, 3), "tiny frame rendered")
+
+    def test_mask(self):
+        r = renderer.FrameRenderer(320, 180)
+        mask = r.render_mask("Title", "09:59", "Speaker")
+        self.assertEqual((mask.shape, mask.dtype), ((180, 320), np.uint8), "8-bit coverage mask")
+        frame = renderer.colourise(mask.copy(), renderer.get_palette("orange", "navy"))
+        full = renderer.FrameRenderer(320, 180).render("Title", "09:59", "Speaker", "orange", "navy")
+        self.assertTrue((frame == full).all(), "coloured mask matches render")
+        self.assertIsNotNone(frame.mask, "frame keeps its mask")
+        self.assertIsNone(frame[:10].mask, "views are plain frames")
+
+    def test_colourise_coloured(self):
+        r = renderer.FrameRenderer(320, 180)
+        palette = renderer.get_palette("orange", "navy")
+        r.render("Title", "09:59", "Speaker", "orange", "navy")
+        coloured = r.render("Title", "09:58", "Speaker", "orange", "navy")
+        mask = r.mask.copy()
+        frame = renderer.colourise(mask, palette, coloured)
+        self.assertTrue((frame == renderer.colourise(mask, palette)).all(), "incremental frame matches colouring")
+        self.assertIs(frame.mask, mask, "frame keeps its mask")
+        self.assertFalse(np.shares_memory(frame, coloured), "renderer's frame copied")
+
+    def test_palette(self):
+        palette = renderer.get_palette("rgba(255, 255, 255, 0.5)", "black")
+        self.assertIs(palette, renderer.get_palette("rgba(255, 255, 255, 0.5)", "black"), "palettes are cached")
+        self.assertEqual(tuple(palette.rgb[0]), (0, 0, 0), "no coverage is background")
+        self.assertEqual(tuple(palette.rgb[255]), (128, 128, 128), "full coverage is the blended foreground")
+
+    def test_font_cache(self):
+        self.assertIs(renderer.load_font(renderer.TIME_FONT, 42),
+                      renderer.load_font(renderer.TIME_FONT, 42),
+                      "fonts are loaded once")
+
+
+if __name__ == '__main__':
+    unittest.main()
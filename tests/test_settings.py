@@ -1,5 +1,5 @@
 '''
-Unit testing for Settings and SettingsWrapper classes
+Unit testing for Settings, Section and Value classes
 '''
 
 import json
@@ -8,41 +8,79 @@ import tempfile
 import tkinter as tk
 import unittest
 
-from meeting_timer import settings
+from meeting_timer import agenda_import, settings
+from meeting_timer.agenda import AgendaItem
 
 
-class TestSettingsWrapper(unittest.TestCase):
-    '''Tests the SettingsWrapper class'''
+class TestSection(unittest.TestCase):
+    '''Tests the Section classes of the settings model'''
 
     ## TESTS ##
 
     def test_getattr(self):
-        s = settings.SettingsWrapper(None, {"test": "world"})
-        self.assertEqual(s.test, "world", "s.test == 'world'")
-        with self.assertRaises(KeyError):
+        s = settings.Settings()
+        self.assertEqual(s.finished_text.get(), "STOP", "s.finished_text.get() == 'STOP'")
+        with self.assertRaises(AttributeError):
             s.not_such_key
         
     def test_getitem(self):
-        s = settings.SettingsWrapper(None, {"test": "world"})
-        self.assertEqual(s['test'], "world", "s['test'] == 'world'")
+        s = settings.Settings()
+        self.assertIs(s['finished_text'], s.finished_text, "s['finished_text'] is s.finished_text")
         with self.assertRaises(KeyError):
             s['not_such_key']
         
     def test_get(self):
-        s = settings.SettingsWrapper(None, {"test": "world"})
-        self.assertEqual(s.get('test'), "world", "s.get('test') == 'world'")
+        s = settings.Settings()
+        self.assertIs(s.get('finished_text'), s.finished_text, "s.get('finished_text') is s.finished_text")
         self.assertEqual(s.get('no_such_key', 'hello'), "hello", "s.get('no_such_key', 'hello') == 'hello'")
         
     def test_subitem(self):
-        s = settings.SettingsWrapper(None, {"test": {"this": "that"}})
-        self.assertEqual(s.test.this, 'that', "s.test.this == 'that'")
+        s = settings.Settings()
+        self.assertIsInstance(s.display, settings.Section, "sections are Section objects")
+        self.assertIs(s['display']['title'], s.display.title, "s['display']['title'] is s.display.title")
         with self.assertRaises(KeyError):
-            self.assertEqual(s.test.not_such_key, 'that', "s.test.this == 'that'")
+            s.display['not_such_key']
 
-    def test_settings_root(self):
-        s = settings.SettingsWrapper(None, {"test": {"this": "that"}})
-        self.assertEqual(s.settings_root(), s, "s.settings_root == s")
-        self.assertEqual(s.test.settings_root(), s, "s.settings_root == s")
+    def test_items(self):
+        s = settings.Settings()
+        self.assertEqual(set(s.display.keys()), set(settings.DEFAULTS['display']), "keys as the defaults")
+        self.assertEqual(dict(s.display.items())['title'].name, 'display.title', "values named by their path")
+
+
+class TestValue(unittest.TestCase):
+    '''Tests the Value class'''
+
+    ## TESTS ##
+
+    def test_typed(self):
+        v = settings.Value('initial.duration', 540)
+        v.set('60')
+        self.assertEqual(v.get(), 60, "v.get() == 60")
+        with self.assertRaises(ValueError):
+            v.set('abc')
+        self.assertEqual(v.get(), 60, "invalid value not stored")
+
+    def test_trace_on_change(self):
+        v = settings.Value('display.title', '')
+        calls = []
+        v.trace('w', lambda *args: calls.append(args))
+        v.set('Hello')
+        v.set('Hello')
+        self.assertEqual(calls, [('display.title', '', 'write')], "traced once per change")
+
+    def test_variable(self):
+        root = tk.Tk()
+        v = settings.Value('initial.width', 1280)
+        var = v.variable(root)
+        self.assertIs(v.variable(), var, "one variable per value")
+        self.assertEqual(var.get(), 1280, "var.get() == 1280")
+        v.set(640)
+        self.assertEqual(var.get(), 640, "value copied to the variable")
+        var.set(320)
+        self.assertEqual(v.get(), 320, "variable copied to the value")
+        var.set('32a')
+        self.assertEqual(v.get(), 320, "incomplete entry ignored")
+        root.destroy()
 
 
 class TestSettings(unittest.TestCase):
@@ -98,6 +136,78 @@ class TestSettings(unittest.TestCase):
             content = get_json_file(filename)
             self.assertEqual(content['colour']['primary'], "purple", "content['colour']['primary'] == 'purple'")
         
+    def test_attributes(self):
+        s = settings.Settings()
+        self.assertIs(s.display.title, s.display.title, "no per-access allocation")
+        self.assertIs(s.colour.get('warning'), s.colour.warning, "s.colour.get('warning')")
+        self.assertIs(s['finished_text'], s.finished_text, "s['finished_text']")
+        with self.assertRaises(AttributeError):
+            s.display.no_such_key = 1
+
+    def test_batch(self):
+        s = settings.Settings()
+        changes = []
+        s.subscribe(changes.append)
+        with s.batch():
+            s.display.title.set('A')
+            s.display.speaker.set('B')
+            s.display.title.set('C')
+        s.next.duration.set(60)
+        self.assertEqual(changes, [{'display.title', 'display.speaker'}, {'next.duration'}], "one notification per batch")
+
+    def test_read_partial(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'meeting.json')
+            with open(filename, 'w') as f:
+                json.dump({"next": {"speaker": "Tom Thumb", "duration": "abc"}}, f)
+            s = settings.Settings(filename)
+            self.assertEqual(s.next.speaker.get(), "Tom Thumb", "s.next.speaker.get() == 'Tom Thumb'")
+            self.assertEqual(s.next.duration.get(), 540, "invalid and missing values unchanged")
+            self.assertEqual(s.next.warning.get(), 60, "invalid and missing values unchanged")
+
+    def test_apply_changes(self):
+        s = settings.Settings()
+        s.display.title.set('On air')
+        content = {"initial": {"title": "My Webinar", "duration": "600"},
+                   "next": {"speaker": "Tom Thumb", "warning": "abc"},
+                   "display": {"title": "ignored"}}
+        self.assertEqual(s.changes(content), {"initial": {"duration": "600"}, "next": {"speaker": "Tom Thumb"}},
+                         "only differing, valid and saved values")
+        
+        changes = []
+        s.subscribe(changes.append)
+        self.assertFalse(s.apply(content), "no agenda file to import")
+        self.assertEqual(changes, [{'initial.duration', 'next.speaker'}], "only changed values notified")
+        self.assertEqual(s.display.title.get(), 'On air', "display not reloaded")
+        s.apply(content)
+        self.assertEqual(len(changes), 1, "nothing changed the second time")
+
+    def test_imported_agenda_kept(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'agenda.csv')
+            with open(path, 'w') as f:
+                f.write('Title,Speaker,Duration,Warning\nKeynote,Jane,600,60\nQ&A,Tom,300,60\n')
+            filename = os.path.join(tmpdir, 'meeting.json')
+            with open(filename, 'w') as f:
+                json.dump({"next": {"speaker": "Tom Thumb"}}, f)
+            s = settings.Settings()
+            items = agenda_import.AgendaFile(path)
+            s.agenda.load(items)
+            s.apply({"next": {"speaker": "Tom Thumb"}})
+            self.assertIs(s.agenda.items, items, "reload without an agenda keeps the imported one")
+            s.read(filename)
+            self.assertIs(s.agenda.items, items, "read without an agenda keeps the imported one")
+            self.assertEqual(len(items._cache), 0, "imported agenda not parsed")
+            s.apply({"agenda": [AgendaItem('Intro', 'Jane', 60, 10)]})
+            self.assertEqual(list(s.agenda.items), [AgendaItem('Intro', 'Jane', 60, 10)], "reloaded agenda replaces it")
+
+    def test_write_failed(self):
+        s = settings.Settings()
+        s.next.speaker.set('Tom Thumb')
+        with self.assertRaises(OSError):
+            s.write(os.path.join(tempfile.gettempdir(), 'no_such_dir', 'meeting.mt'))
+        self.assertIsNone(s._file_hash, "content not written is not recorded")
+
     def test_write_no_filename(self):
         root = tk.Tk()
         with tempfile.TemporaryDirectory() as tmpdir:
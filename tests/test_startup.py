@@ -0,0 +1,27 @@
+'''
+Unit testing for the startup time budgets (see benchmarks/bench_startup.py)
+'''
+
+import unittest
+
+from benchmarks import bench_startup
+
+
+class TestStartup(unittest.TestCase):
+    '''Tests the startup budgets'''
+
+    ## TESTS ##
+
+    def test_deferred_imports(self):
+        imported = set(bench_startup.DEFERRED_MODULES) & bench_startup.imported_modules()
+        self.assertEqual(imported, set(), "heavy modules are imported after the windows are shown")
+
+    def test_import_budget(self):
+        self.assertLess(bench_startup.import_time(), bench_startup.IMPORT_BUDGET_MS,
+                        "meeting_timer.application imports within budget")
+
+    def test_first_window_budget(self):
+        result = bench_startup.first_window_time()
+        if result is None:
+            self.skipTest('no display')
+        self.assertLess(result[0] * 1000, bench_startup.WINDOW_BUDGET_MS, "control window drawn within budget")
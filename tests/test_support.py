@@ -0,0 +1,72 @@
+'''
+Unit testing for the colour functions in support
+'''
+
+import colorsys
+import random
+import unittest
+
+from meeting_timer import support
+
+
+class TestColours(unittest.TestCase):
+    '''Tests the colour parser against the named colour table'''
+
+    def setUp(self):
+        self.random = random.Random(42)
+
+    ## TESTS ##
+
+    def test_named(self):
+        for name, code in support._named_html_colours.items():
+            rgb = tuple(int(code[i:i+2], 16) for i in (1, 3, 5))
+            self.assertEqual(support.colour_to_html(name), code, f"colour_to_html({name!r})")
+            self.assertEqual(support.colour_to_tuple(name), rgb, f"colour_to_tuple({name!r})")
+            self.assertEqual(support.parse_colour(name.upper()), rgb + (255,), f"{name} is case insensitive")
+            self.assertEqual(support.parse_colour(code[1:]), rgb + (255,), f"{code} without #")
+
+    def test_rgb_round_trip(self):
+        for name, code in support._named_html_colours.items():
+            rgb = support.colour_to_tuple(code)
+            alpha = self.random.randint(0, 255)
+            self.assertEqual(support.parse_colour('rgb(%d, %d, %d)' % rgb), rgb + (255,), f"rgb() of {name}")
+            self.assertEqual(support.parse_colour('rgba(%d,%d,%d,%.6f)' % (rgb + (alpha/255,))), rgb + (alpha,),
+                             f"rgba() of {name}")
+            self.assertEqual(support.parse_colour('rgb(%d %d %d / %.6f%%)' % (rgb + (alpha/2.55,))), rgb + (alpha,),
+                             f"space separated rgb() of {name}")
+            self.assertEqual(support.parse_colour(code + '%02x' % alpha), rgb + (alpha,), f"{code} with alpha")
+
+    def test_hsl_round_trip(self):
+        for name, code in support._named_html_colours.items():
+            rgb = support.colour_to_tuple(code)
+            hue, lightness, saturation = colorsys.rgb_to_hls(*(c / 255 for c in rgb))
+            hue = hue*360 - self.random.choice((0, 360, -360))
+            parsed = support.parse_colour(f'hsl({hue:.6f}deg, {saturation*100:.6f}%, {lightness*100:.6f}%)')
+            self.assertEqual(parsed, rgb + (255,), f"hsl() of {name}")
+
+    def test_short_codes(self):
+        self.assertEqual(support.parse_colour('#abc'), (0xaa, 0xbb, 0xcc, 255), "#rgb")
+        self.assertEqual(support.parse_colour('#abcd'), (0xaa, 0xbb, 0xcc, 0xdd), "#rgba")
+        self.assertEqual(support.colour_to_html('#abc'), '#aabbcc', "expanded to #rrggbb")
+
+    def test_invalid(self):
+        for colour in ('', 'nonsense', '#abcde', 'rgb(1,2)', 'rgb(1,2,3,4,5)', 'hsl(10%,50%,50%)',
+                       'rgb(1,2,x)', 'hsl(10,50,50)', 'rgb(10deg,0,0)'):
+            with self.assertRaises(ValueError, msg=colour):
+                support.parse_colour(colour)
+            self.assertEqual(support.colour_to_tuple(colour), (255, 255, 255), f"{colour!r} uses the default")
+        self.assertEqual(support.colour_to_html('nonsense', 'black'), '#000000', "named default")
+        with self.assertRaises(RuntimeError):
+            support.colour_to_tuple('nonsense', 'nonsense')
+
+    def test_clamped(self):
+        self.assertEqual(support.parse_colour('rgb(300, -5, 128)'), (255, 0, 128, 255), "components clamped")
+        self.assertEqual(support.parse_colour('rgba(0, 0, 0, 2)'), (0, 0, 0, 255), "alpha clamped")
+
+    def test_colour_over(self):
+        self.assertEqual(support.colour_over('red', 'blue'), (255, 0, 0), "opaque colour unchanged")
+        self.assertEqual(support.colour_over('rgba(255, 0, 0, 0)', 'blue'), (0, 0, 255), "transparent colour")
+        self.assertEqual(support.colour_over('rgba(255, 255, 255, 0.5)', 'black'), (128, 128, 128), "half blended")
+
+    def test_cached(self):
+        self.assertIs(support.colour_to_tuple('teal'), support.colour_to_tuple('teal'), "same tuple returned")
@@ -0,0 +1,111 @@
+'''
+Unit testing for TickScheduler class
+'''
+
+import unittest
+
+from meeting_timer import tick_scheduler
+
+
+class FakeLoop(object):
+    '''Simulated event loop whose callbacks fire `delay` seconds late'''
+
+    def __init__(self, delay=0.0):
+        self.now = 0.0
+        self.delay = delay
+        self.timers = {}
+        self._next_id = 0
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, fn):
+        self._next_id += 1
+        self.timers[self._next_id] = (self.now + ms / 1000 + self.delay, fn)
+        return self._next_id
+
+    def after_cancel(self, timer_id):
+        del self.timers[timer_id]
+
+    def run(self, until):
+        while self.timers:
+            timer_id = min(self.timers, key=lambda k: self.timers[k][0])
+            when, fn = self.timers[timer_id]
+            if when > until:
+                break
+            del self.timers[timer_id]
+            self.now = when
+            fn()
+        self.now = until
+
+
+class TestTickScheduler(unittest.TestCase):
+    '''Tests the TickScheduler class'''
+
+    ## TESTS ##
+
+    def test_ticks_at_deadlines(self):
+        loop = FakeLoop()
+        ticks = []
+        def tick(now):
+            ticks.append(now)
+            return int(now) + 1
+        scheduler = tick_scheduler.TickScheduler(loop.after, loop.after_cancel, tick, loop.clock)
+        scheduler.reschedule()
+        loop.run(5.5)
+        self.assertEqual(len(ticks), 6, "one tick at start and one per second")
+        self.assertEqual(scheduler.stats.wakeups, 6, "no wakeups between deadlines")
+        for now in ticks[1:]:
+            self.assertGreaterEqual(now, round(now) - 1e-9, "ticks never fire early")
+
+    def test_lateness_correction(self):
+        loop = FakeLoop(delay=0.004)
+        ticks = []
+        def tick(now):
+            ticks.append(now)
+            return int(now) + 1
+        scheduler = tick_scheduler.TickScheduler(loop.after, loop.after_cancel, tick, loop.clock)
+        scheduler.reschedule()
+        loop.run(30.5)
+        self.assertLess(ticks[-1] - 30, 0.002, "lateness corrected after a few ticks")
+        self.assertGreaterEqual(ticks[-1], 30, "ticks never fire early")
+        self.assertGreater(scheduler.stats.lateness_max, 0.003, "lateness recorded")
+
+    def test_steady_lateness(self):
+        loop = FakeLoop(delay=0.0157)
+        ticks = []
+        def tick(now):
+            ticks.append(now)
+            return int(now) + 1
+        scheduler = tick_scheduler.TickScheduler(loop.after, loop.after_cancel, tick, loop.clock)
+        scheduler.reschedule()
+        loop.run(60.5)
+        self.assertEqual(len(ticks), 61, "one tick at start and one per second")
+        self.assertEqual(scheduler.stats.wakeups, scheduler.stats.ticks, "one wakeup per tick")
+        for second, now in zip(range(51, 61), ticks[-10:]):
+            self.assertAlmostEqual(now, second, 6, "compensated ticks on time")
+
+    def test_idle(self):
+        loop = FakeLoop()
+        scheduler = tick_scheduler.TickScheduler(loop.after, loop.after_cancel, lambda now: None, loop.clock)
+        scheduler.reschedule()
+        loop.run(10)
+        self.assertEqual(scheduler.stats.wakeups, 1, "idle scheduler does not wake up")
+        self.assertIsNone(scheduler.deadline, "scheduler.deadline is None")
+
+    def test_cancel(self):
+        loop = FakeLoop()
+        ticks = []
+        def tick(now):
+            ticks.append(now)
+            return now + 1
+        scheduler = tick_scheduler.TickScheduler(loop.after, loop.after_cancel, tick, loop.clock)
+        scheduler.reschedule()
+        loop.run(2.5)
+        scheduler.cancel()
+        loop.run(10)
+        self.assertEqual(len(ticks), 3, "no ticks after cancel()")
+
+
+if __name__ == '__main__':
+    unittest.main()
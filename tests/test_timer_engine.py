@@ -0,0 +1,79 @@
+'''
+Unit testing for TimerEngine class
+'''
+
+import unittest
+
+from meeting_timer import timer_engine
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTimerEngine(unittest.TestCase):
+    '''Tests the TimerEngine class'''
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.engine = timer_engine.TimerEngine(90, 60, clock=self.clock)
+        self.events = []
+        self.engine.subscribe(lambda event, value: self.events.append((event, value)))
+
+    ## TESTS ##
+
+    def test_seconds_to_display(self):
+        self.assertEqual(timer_engine.seconds_to_display(540), '09:00')
+        self.assertEqual(timer_engine.seconds_to_display(61), '01:01')
+
+    def test_countdown(self):
+        self.assertIsNone(self.engine.tick(), "stopped timer does not tick")
+        self.engine.start()
+        self.clock.now += 0.5
+        deadline = self.engine.tick()
+        self.assertEqual(self.events, [('phase', 'primary'), ('time', '01:29')])
+        self.assertAlmostEqual(deadline, 101.0 + timer_engine.TICK_EPSILON)
+        self.clock.now = deadline
+        self.engine.tick()
+        self.assertEqual(self.events[-1], ('time', '01:28'))
+
+    def test_warning_and_finish(self):
+        self.engine.start()
+        self.clock.now += 30.5
+        self.engine.tick()
+        self.assertIn(('phase', 'warning'), self.events, "warning phase entered")
+        self.clock.now += 60
+        self.assertIsNone(self.engine.tick(), "finished timer does not tick")
+        self.assertEqual(self.events[-1], ('stopped', None))
+        self.assertTrue(self.engine.stopped, "engine.stopped")
+
+    def test_pause(self):
+        self.engine.start()
+        self.clock.now += 10.5
+        self.engine.pause()
+        self.assertIsNone(self.engine.tick(), "paused timer does not tick")
+        self.clock.now += 100
+        self.assertEqual(self.engine.remaining(), 79, "paused time does not count")
+        self.engine.start()
+        self.assertEqual(self.engine.remaining(), 79, "resumed where paused")
+
+    def test_load_and_add(self):
+        self.engine.load(300, 30)
+        self.assertEqual(self.events[-2:], [('phase', 'primary'), ('time', '05:00')])
+        self.engine.add(60)
+        self.assertEqual(self.engine.remaining(), 360, "engine.remaining() == 360")
+
+    def test_drift(self):
+        self.assertIsNone(self.engine.drift(), "no drift unless running")
+        self.engine.start()
+        self.assertEqual(self.engine.drift(), 0.0, "first second began at the start")
+        self.clock.now += 2.25
+        self.assertAlmostEqual(self.engine.drift(), 0.25, msg="quarter of a second into 01:27")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+'''
+Unit testing for Tracer class
+'''
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from meeting_timer import tracing
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class Traced(object):
+    @tracing.traced('test.work')
+    def work(self, value):
+        return value * 2
+
+
+class TestTracer(unittest.TestCase):
+    '''Tests the Tracer class'''
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracer = tracing.Tracer(4, clock=self.clock)
+
+    ## TESTS ##
+
+    def test_span(self):
+        with self.tracer.span('command.start'):
+            self.clock.now += 0.002
+        events = self.tracer.events()
+        self.assertEqual(events[0]['name'], 'thread_name', "thread named")
+        self.assertEqual(events[0]['args']['name'], threading.current_thread().name)
+        span = events[1]
+        self.assertEqual((span['name'], span['cat'], span['ph']), ('command.start', 'command', 'X'))
+        self.assertEqual(span['tid'], events[0]['tid'], "recorded on this thread")
+        self.assertAlmostEqual(span['ts'], 0.0)
+        self.assertAlmostEqual(span['dur'], 2000.0, msg="microseconds")
+
+    def test_ring_buffer(self):
+        for i in range(6):
+            self.tracer.complete(f'span.{i}', self.clock.now)
+            self.clock.now += 1
+        names = [event['name'] for event in self.tracer.events() if event['ph'] == 'X']
+        self.assertEqual(names, ['span.2', 'span.3', 'span.4', 'span.5'], "oldest overwritten, in order")
+        self.assertEqual(self.tracer.recorded, 6, "tracer.recorded == 6")
+
+    def test_dump(self):
+        self.tracer.complete('webcam.render', self.clock.now)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'trace.json')
+            self.assertEqual(self.tracer.dump(filename), 1, "one span written")
+            with open(filename) as f:
+                trace = json.load(f)
+        self.assertEqual([event['name'] for event in trace['traceEvents']], ['thread_name', 'webcam.render'])
+
+    def test_attach(self):
+        self.assertEqual(Traced().work(2), 4, "untraced call")
+        self.assertEqual(self.tracer.recorded, 0, "nothing recorded")
+        traced = Traced()
+        self.tracer.attach(traced)
+        self.assertEqual(traced.work(3), 6, "traced call")
+        self.assertEqual([event['name'] for event in self.tracer.events()], ['thread_name', 'test.work'])
+
+
+if __name__ == '__main__':
+    unittest.main()